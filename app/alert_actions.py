@@ -0,0 +1,61 @@
+import datetime
+from typing import Optional
+from sqlalchemy import update
+from sqlmodel import select
+from app.database import Alert, Parcel, Sensor
+
+ALERT_ACTIONS = ("acknowledge", "resolve")
+
+
+def bulk_update_alerts(
+    session,
+    user_id: int,
+    action: str,
+    alert_ids: Optional[list[int]] = None,
+    sensor_id: Optional[int] = None,
+    parcel_id: Optional[int] = None,
+    level: Optional[str] = None,
+    before: Optional[datetime.datetime] = None,
+) -> list[int]:
+    """Acknowledge or resolve every open alert of the user matching the filters.
+
+    Runs as a single `UPDATE ... WHERE ... RETURNING` whatever the number of
+    alerts, with ownership checked by a subquery on the user's sensors. The
+    filters combine; leaving them all out selects all of the user's open
+    alerts. Resolving also acknowledges. The caller commits.
+
+    Returns:
+        list[int]: Ids of the alerts that changed.
+    """
+    if action not in ALERT_ACTIONS:
+        raise ValueError(f"Unknown alert action: {action}")
+    if alert_ids is not None and not alert_ids:
+        return []
+    owned = select(Sensor.id).join(Parcel).where(Parcel.farmer_id == user_id)
+    if parcel_id is not None:
+        owned = owned.where(Sensor.parcel_id == parcel_id)
+    if sensor_id is not None:
+        owned = owned.where(Sensor.id == sensor_id)
+    conditions = [Alert.sensor_id.in_(owned), Alert.is_active == True]
+    if action == "acknowledge":
+        conditions.append(Alert.acknowledged == False)
+        values = {"acknowledged": True}
+    else:
+        values = {"is_active": False, "acknowledged": True}
+    if alert_ids is not None:
+        conditions.append(Alert.id.in_(alert_ids))
+    if level is not None:
+        conditions.append(Alert.level == level)
+    if before is not None:
+        conditions.append(Alert.created_at <= before)
+    return list(
+        session.execute(
+            update(Alert)
+            .where(*conditions)
+            .values(**values)
+            .returning(Alert.id)
+            .execution_options(synchronize_session=False)
+        )
+        .scalars()
+        .all()
+    )
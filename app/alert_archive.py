@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+import logging
+import os
+import reflex as rx
+import sqlalchemy
+from sqlalchemy import delete, insert
+from sqlmodel import select
+from app.database import Alert, AlertArchive
+
+# Resolved alerts older than this move from `Alert` to `AlertArchive`;
+# archived alerts older than the archive retention are dropped (0 keeps them).
+ALERT_RETENTION_DAYS = int(os.environ.get("ALERT_RETENTION_DAYS", "30"))
+ALERT_ARCHIVE_RETENTION_DAYS = int(
+    os.environ.get("ALERT_ARCHIVE_RETENTION_DAYS", "365")
+)
+ARCHIVE_INTERVAL_SECONDS = 3600
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def archive_resolved_alerts(session, now: datetime.datetime) -> int:
+    """Move one batch of resolved alerts past the retention period to the archive.
+
+    Age is measured from `created_at`. The copy is an `INSERT ... SELECT` and
+    the removal a set-based DELETE on the same ids, committed together.
+
+    Returns:
+        int: Number of alerts archived; 0 once nothing is left to move.
+    """
+    cutoff = now - datetime.timedelta(days=ALERT_RETENTION_DAYS)
+    alert_ids = session.exec(
+        select(Alert.id)
+        .where(Alert.is_active == False, Alert.created_at < cutoff)
+        .order_by(Alert.created_at)
+        .limit(ARCHIVE_BATCH_SIZE)
+    ).all()
+    if not alert_ids:
+        return 0
+    session.execute(
+        insert(AlertArchive).from_select(
+            ["alert_id", "sensor_id", "message", "level", "created_at", "archived_at"],
+            select(
+                Alert.id,
+                Alert.sensor_id,
+                Alert.message,
+                Alert.level,
+                Alert.created_at,
+                sqlalchemy.literal(now, sqlalchemy.DateTime),
+            ).where(Alert.id.in_(alert_ids)),
+        )
+    )
+    session.execute(delete(Alert).where(Alert.id.in_(alert_ids)))
+    session.commit()
+    return len(alert_ids)
+
+
+def purge_archive(session, now: datetime.datetime) -> int:
+    """Delete one batch of archived alerts past the archive retention."""
+    if ALERT_ARCHIVE_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = now - datetime.timedelta(days=ALERT_ARCHIVE_RETENTION_DAYS)
+    batch = (
+        select(AlertArchive.id)
+        .where(AlertArchive.created_at < cutoff)
+        .limit(ARCHIVE_BATCH_SIZE)
+    )
+    result = session.execute(delete(AlertArchive).where(AlertArchive.id.in_(batch)))
+    session.commit()
+    return result.rowcount
+
+
+def _archive() -> tuple[int, int]:
+    with rx.session() as session:
+        archived = purged = 0
+        now = datetime.datetime.utcnow()
+        while moved := archive_resolved_alerts(session, now):
+            archived += moved
+        while dropped := purge_archive(session, now):
+            purged += dropped
+        return archived, purged
+
+
+async def alert_archiver():
+    """Lifespan task: periodically archive old resolved alerts."""
+    while True:
+        try:
+            archived, purged = await asyncio.to_thread(_archive)
+            if archived or purged:
+                logging.info(f"Alert archiver moved {archived} alerts, purged {purged}")
+        except Exception as e:
+            logging.exception(f"Alert archiving failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
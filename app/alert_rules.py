@@ -0,0 +1,172 @@
+import dataclasses
+import datetime
+import threading
+from typing import Optional
+from sqlalchemy import update
+from sqlmodel import select
+from app.database import Alert, Sensor
+
+THRESHOLD_ALERT_LEVEL = "warning"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ThresholdRule:
+    """Threshold settings of one sensor, compiled from its `Sensor` row.
+
+    A value outside `[low, high]` starts a breach. The alert opens once the
+    breach has lasted `duration_s` (0 fires on the first reading), unless an
+    alert for the sensor was resolved less than `cooldown_s` ago. It resolves
+    automatically when a value is back inside the band narrowed by
+    `hysteresis` on both sides, so values hovering at a threshold don't
+    flap between open and resolved.
+    """
+
+    sensor_type: str
+    low: float
+    high: float
+    hysteresis: float
+    duration_s: float
+    cooldown_s: float
+
+    @classmethod
+    def compile(cls, sensor: Sensor) -> "ThresholdRule":
+        hysteresis = max(sensor.alert_hysteresis, 0.0)
+        band = sensor.threshold_high - sensor.threshold_low
+        if band > 0 and hysteresis * 2 >= band:
+            # Such a band never clears; rows saved before `save_sensor`
+            # checked this fall back to a quarter of the band.
+            hysteresis = band / 4
+        return cls(
+            sensor_type=sensor.type,
+            low=sensor.threshold_low,
+            high=sensor.threshold_high,
+            hysteresis=hysteresis,
+            duration_s=max(sensor.alert_duration_s, 0),
+            cooldown_s=max(sensor.alert_cooldown_s, 0),
+        )
+
+    def breach(self, value: float) -> Optional[str]:
+        if value < self.low:
+            return "low"
+        if value > self.high:
+            return "high"
+        return None
+
+    def cleared(self, value: float) -> bool:
+        return self.low + self.hysteresis <= value <= self.high - self.hysteresis
+
+
+class _RuleState:
+    __slots__ = ("rule", "firing", "breach_since", "resolved_at")
+
+    def __init__(self, rule: Optional[ThresholdRule], firing: bool):
+        self.rule = rule
+        self.firing = firing
+        self.breach_since: Optional[datetime.datetime] = None
+        self.resolved_at: Optional[datetime.datetime] = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RuleOutcome:
+    """What the ingest path has to write for one reading."""
+
+    open_message: Optional[str] = None
+    resolve: bool = False
+
+
+class AlertRuleEngine:
+    """In-memory threshold alert state per sensor.
+
+    Readings are evaluated without touching the database: a sensor's state is
+    seeded once per process with a single query for its open threshold alert,
+    after which only opening or resolving an alert writes anything. Call
+    `invalidate` when a sensor's thresholds change so the rule is recompiled.
+    """
+
+    def __init__(self):
+        self._states: dict[int, _RuleState] = {}
+        self._lock = threading.Lock()
+
+    def evaluate(
+        self, session, sensor: Sensor, value: float, timestamp: datetime.datetime
+    ) -> RuleOutcome:
+        with self._lock:
+            state = self._states.get(sensor.id)
+        if state is None:
+            open_alert = session.exec(
+                select(Alert.id).where(
+                    Alert.sensor_id == sensor.id,
+                    Alert.level == THRESHOLD_ALERT_LEVEL,
+                    Alert.is_active == True,
+                )
+            ).first()
+            with self._lock:
+                state = self._states.setdefault(
+                    sensor.id,
+                    _RuleState(ThresholdRule.compile(sensor), open_alert is not None),
+                )
+        with self._lock:
+            if state.rule is None:
+                state.rule = ThresholdRule.compile(sensor)
+            return self._step(state, value, timestamp)
+
+    def _step(
+        self, state: _RuleState, value: float, timestamp: datetime.datetime
+    ) -> RuleOutcome:
+        rule = state.rule
+        if state.firing:
+            if rule.cleared(value):
+                state.firing = False
+                state.breach_since = None
+                state.resolved_at = timestamp
+                return RuleOutcome(resolve=True)
+            return RuleOutcome()
+        side = rule.breach(value)
+        if side is None:
+            state.breach_since = None
+            return RuleOutcome()
+        if state.breach_since is None:
+            state.breach_since = timestamp
+        if (timestamp - state.breach_since).total_seconds() < rule.duration_s:
+            return RuleOutcome()
+        if (
+            state.resolved_at is not None
+            and (timestamp - state.resolved_at).total_seconds() < rule.cooldown_s
+        ):
+            return RuleOutcome()
+        state.firing = True
+        limit = rule.low if side == "low" else rule.high
+        message = (
+            f"{side.capitalize()} {rule.sensor_type} detected: {value:.2f} "
+            f"(Threshold: {limit})"
+        )
+        if rule.duration_s:
+            message += f" for {rule.duration_s / 60:g} min"
+        return RuleOutcome(open_message=message)
+
+    def invalidate(self, sensor_id: int):
+        """Recompile the sensor's rule on its next reading, keeping its state."""
+        with self._lock:
+            state = self._states.get(sensor_id)
+            if state is not None:
+                state.rule = None
+
+    def forget(self, sensor_id: int):
+        with self._lock:
+            self._states.pop(sensor_id, None)
+
+
+def resolve_threshold_alerts(session, sensor_id: int):
+    """Auto-resolve the sensor's open threshold alerts."""
+    session.execute(
+        update(Alert)
+        .where(
+            Alert.sensor_id == sensor_id,
+            Alert.level == THRESHOLD_ALERT_LEVEL,
+            Alert.is_active == True,
+        )
+        .values(is_active=False)
+    )
+
+
+alert_engine = AlertRuleEngine()
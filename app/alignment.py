@@ -0,0 +1,77 @@
+import datetime
+from typing import Optional
+
+GRID_STEPS_S = (60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400)
+MAX_GRID_POINTS = 2000
+GAP_FILLS = ("none", "ffill", "linear")
+
+
+class TimeGrid:
+    """Evenly spaced time slots shared by every sensor in a chart.
+
+    Readings are assigned to the slot containing them, so sensors reporting at
+    slightly different times land in the same row and the row count is
+    bounded by the grid instead of the union of timestamps.
+    """
+
+    __slots__ = ("start", "step_s", "size")
+
+    def __init__(self, start: datetime.datetime, end: datetime.datetime, step_s: int):
+        self.start = start
+        self.step_s = step_s
+        self.size = max(1, -(-int((end - start).total_seconds()) // step_s))
+
+    @classmethod
+    def for_range(
+        cls,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        step_s: Optional[int] = None,
+        max_points: int = MAX_GRID_POINTS,
+    ) -> "TimeGrid":
+        """Grid with a fixed step, or the finest step keeping within `max_points`."""
+        if step_s is None:
+            span = (end - start).total_seconds()
+            step_s = next(
+                (s for s in GRID_STEPS_S if span / s <= max_points), GRID_STEPS_S[-1]
+            )
+        return cls(start, end, step_s)
+
+    def slot(self, timestamp: datetime.datetime) -> int:
+        return int((timestamp - self.start).total_seconds() // self.step_s)
+
+    def labels(self) -> list[str]:
+        fmt = "%Y-%m-%d" if self.step_s % 86400 == 0 else "%Y-%m-%d %H:%M"
+        step = datetime.timedelta(seconds=self.step_s)
+        return [(self.start + step * i).strftime(fmt) for i in range(self.size)]
+
+
+def fill_gaps(values: list, method: str) -> list:
+    """Fill `None` slots of an aligned column.
+
+    `ffill` carries the last value forward; `linear` interpolates between the
+    surrounding values. Slots before the first value and after the last one
+    stay empty either way, so a sensor that stopped reporting is not drawn
+    as flat.
+    """
+    if method == "ffill":
+        end = max((i for i, v in enumerate(values) if v is not None), default=-1)
+        filled, last = list(values), None
+        for i in range(end + 1):
+            if filled[i] is None:
+                filled[i] = last
+            last = filled[i]
+        return filled
+    if method == "linear":
+        filled = list(values)
+        prev = None
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            if prev is not None and i - prev > 1:
+                lo, hi = values[prev], value
+                for j in range(prev + 1, i):
+                    filled[j] = round(lo + (hi - lo) * (j - prev) / (i - prev), 2)
+            prev = i
+        return filled
+    return values
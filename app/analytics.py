@@ -0,0 +1,298 @@
+import csv
+import datetime
+import io
+import json
+import numpy as np
+import reflex as rx
+from sqlalchemy import Float, case, cast
+from sqlmodel import select, func
+from app.alignment import TimeGrid, fill_gaps
+from app.analytics_cache import analytics_cache, analytics_cache_key
+from app.correlation import correlation_pairs
+from app.database import Sensor, SensorData
+from app.jobs import Job
+from app.series import make_series
+from app.sketches import TDigest
+
+FETCH_BATCH_SIZE = 5000
+GRID_STEPS_S = {"hour": 3600, "day": 86400, "hour_bands": 3600, "day_bands": 3600}
+BAND_COLUMNS = (("min", 0.0), ("p10", 0.1), ("p90", 0.9), ("max", 1.0))
+OPERATORS = ("none", "moving_avg", "ewma", "derivative", "gdd")
+MOVING_AVERAGE_POINTS = 12
+EWMA_TIME_CONSTANT_S = 3600.0
+GDD_BASE_TEMP = 10.0
+GDD_SENSOR_TYPE = "temperature"
+
+
+def _epoch_seconds(column, dialect_name: str):
+    if dialect_name == "sqlite":
+        return func.julianday(column) * 86400.0
+    return func.extract("epoch", column)
+
+
+def _operator_queries(operator: str, filters: tuple, dialect_name: str):
+    """Build the `(sensor_id, value, timestamp)` query for `operator` and its count.
+
+    Moving average, derivative and growing degree days are window functions
+    evaluated by the database, partitioned by sensor, so the rows still
+    stream in timestamp order whatever the length of the range. The EWMA
+    query adds each reading's epoch seconds for `_ewma_batch`.
+    """
+    s_id, value, ts = SensorData.sensor_id, SensorData.value, SensorData.timestamp
+    if operator == "gdd":
+        daily = (
+            select(
+                s_id.label("sensor_id"),
+                ((func.min(value) + func.max(value)) / 2).label("mean"),
+                func.min(ts).label("timestamp"),
+            )
+            .where(*filters)
+            .group_by(s_id, func.date(ts))
+            .subquery()
+        )
+        degree_days = case(
+            (daily.c.mean > GDD_BASE_TEMP, daily.c.mean - GDD_BASE_TEMP), else_=0.0
+        )
+        query = select(
+            daily.c.sensor_id,
+            func.sum(degree_days).over(
+                partition_by=daily.c.sensor_id, order_by=daily.c.timestamp
+            ),
+            daily.c.timestamp,
+        ).order_by(daily.c.timestamp)
+        return query, select(func.count()).select_from(daily)
+    by_sensor = {"partition_by": s_id, "order_by": [ts, SensorData.id]}
+    if operator == "ewma":
+        # Epoch seconds for `_ewma_batch`, converted by the database.
+        epoch = cast(_epoch_seconds(ts, dialect_name), Float)
+        query = select(s_id, value, ts, epoch).where(*filters).order_by(ts)
+        return query, select(func.count(SensorData.id)).where(*filters)
+    if operator == "moving_avg":
+        window = (-(MOVING_AVERAGE_POINTS - 1), 0)
+        value = func.avg(value).over(rows=window, **by_sensor)
+    elif operator == "derivative":
+        epoch = _epoch_seconds(ts, dialect_name)
+        hours = (epoch - func.lag(epoch).over(**by_sensor)) / 3600.0
+        value = (value - func.lag(value).over(**by_sensor)) / func.nullif(hours, 0)
+    query = select(s_id, value, ts).where(*filters).order_by(ts)
+    return query, select(func.count(SensorData.id)).where(*filters)
+
+
+def _ewma_batch(batch: list, last: dict) -> list:
+    """Smooth one batch of `(sensor_id, value, timestamp, seconds)` rows.
+
+    The time-weighted EWMA `y[i] = d[i] * y[i - 1] + (1 - d[i]) * x[i]`, with
+    `d[i] = exp(-(t[i] - t[i - 1]) / EWMA_TIME_CONSTANT_S)`, is a linear
+    recurrence, so it is evaluated as a prefix scan: after the pass with
+    shift `w`, `y[i]` holds the recurrence over the last `2 * w` readings and
+    `d[i]` their combined decay. Rows are grouped by sensor with a stable
+    sort and `d` is zeroed at each sensor's first row, so all sensors are
+    smoothed together in O(n log n) vectorized work; the decays only ever
+    shrink, so nothing can overflow.
+
+    `last` carries every sensor's latest `(value, seconds)` into the next
+    batch; a sensor without one starts at its first value. Returns
+    `(sensor_id, value, timestamp)` rows in the batch's order.
+    """
+    n = len(batch)
+    ids, values, stamps, seconds = zip(*batch)
+    id_array = np.fromiter(ids, np.int64, n)
+    order = np.argsort(id_array, kind="stable")
+    sensors = id_array[order]
+    x = np.fromiter(values, float, n)[order]
+    t = np.fromiter(seconds, float, n)[order]
+    starts = np.flatnonzero(np.diff(sensors, prepend=sensors[0] - 1))
+    ends = np.append(starts[1:], n) - 1
+    prev_t = np.concatenate(([t[0]], t[:-1]))
+    level = x[starts]
+    for k, s_id in enumerate(sensors[starts].tolist()):
+        level[k], prev_t[starts[k]] = last.get(s_id, (x[starts[k]], t[starts[k]]))
+    steps = (t - prev_t) / EWMA_TIME_CONSTANT_S
+    decay = np.exp(-steps)
+    y = -np.expm1(-steps) * x
+    y[starts] += decay[starts] * level
+    decay[starts] = 0.0
+    shift = 1
+    while shift < n and decay[shift:].any():
+        y[shift:] = y[shift:] + decay[shift:] * y[:-shift]
+        decay[shift:] = decay[shift:] * decay[:-shift]
+        shift *= 2
+    for s_id, end in zip(sensors[ends].tolist(), ends.tolist()):
+        last[s_id] = (y[end], t[end])
+    smoothed = np.empty(n)
+    smoothed[order] = y
+    return list(zip(ids, smoothed.tolist(), stamps))
+
+
+def _roll_up(buckets: dict, factor: int) -> dict:
+    """Merge the digests of `factor` consecutive grid slots into one coarser slot."""
+    coarse = {}
+    for slot, cells in buckets.items():
+        target = coarse.setdefault(slot // factor, {})
+        for s_id, digest in cells.items():
+            target.setdefault(s_id, TDigest()).merge(digest)
+    return coarse
+
+
+def compute_analytics(
+    job: Job,
+    sensor_ids: list[int],
+    start_dt: datetime.datetime,
+    end_dt: datetime.datetime,
+    aggregation: str,
+    operator: str = "none",
+    gap_fill: str = "none",
+) -> dict:
+    """Load readings for the selected sensors and aggregate them for the chart.
+
+    Readings are streamed in batches so progress can be reported and the job
+    cancelled between batches. The result is stored in `analytics_cache`.
+
+    The `hour_bands` and `day_bands` modes keep a t-digest per bucket and
+    sensor, filled in the same single pass; daily digests are merged from the
+    hourly ones.
+
+    `operator` transforms each sensor's readings before bucketing: a moving
+    average over the last `MOVING_AVERAGE_POINTS` readings, an exponentially
+    weighted average with a time constant of `EWMA_TIME_CONSTANT_S`, the rate
+    of change per hour, or the cumulative growing degree days above
+    `GDD_BASE_TEMP` (one value per day). Stats then describe the transformed
+    values. Growing degree days only apply to `GDD_SENSOR_TYPE` sensors; the
+    others are left out and listed in `skipped`.
+
+    All sensors are resampled onto one `TimeGrid` covering the range: hourly or
+    daily for the averaged modes, and for raw data the finest step that keeps
+    the chart within `MAX_GRID_POINTS` rows. Empty slots are left as gaps or
+    filled according to `gap_fill` (`none`, `ffill` or `linear`).
+
+    Pairwise Pearson, Spearman and lagged correlations are computed on the
+    aligned grid before gap filling, so filled slots don't inflate them.
+
+    Returns:
+        dict: `chart` as a columnar series indexed by bucket `name` with one
+        `sensor_<id>` column per sensor (the mean, or the median in band
+        modes, which add `sensor_<id>_min/_p10/_p90/_max` columns), and
+        per-sensor `stats` (min, max, avg, count) keyed by sensor id, and
+        `correlation` pairs as returned by `correlation_pairs`, and the
+        `skipped` sensor ids the operator does not apply to.
+    """
+    generation = analytics_cache.generation
+    grid = TimeGrid.for_range(start_dt, end_dt, GRID_STEPS_S.get(aggregation))
+    bands = aggregation.endswith("_bands")
+    buckets = {}
+    totals = {}
+    skipped = []
+    with rx.session() as session:
+        if operator == "gdd":
+            skipped = session.exec(
+                select(Sensor.id).where(
+                    Sensor.id.in_(sensor_ids), Sensor.type != GDD_SENSOR_TYPE
+                )
+            ).all()
+        filters = (
+            SensorData.sensor_id.in_(set(sensor_ids).difference(skipped)),
+            SensorData.timestamp >= start_dt,
+            SensorData.timestamp < end_dt,
+        )
+        query, count_query = _operator_queries(
+            operator, filters, session.get_bind().dialect.name
+        )
+        total = session.exec(count_query).one()
+        query = query.execution_options(yield_per=FETCH_BATCH_SIZE)
+        processed = 0
+        smoothed = {}
+        for batch in session.exec(query).partitions():
+            if operator == "ewma":
+                batch = _ewma_batch(batch, smoothed)
+            for s_id, val, ts in batch:
+                if val is None:
+                    continue
+                cells = buckets.setdefault(grid.slot(ts), {})
+                cell = cells.get(s_id)
+                if bands:
+                    if cell is None:
+                        cell = cells[s_id] = TDigest()
+                    cell.add(val)
+                elif cell is None:
+                    cells[s_id] = [val, 1]
+                else:
+                    cell[0] += val
+                    cell[1] += 1
+                acc = totals.get(s_id)
+                if acc is None:
+                    totals[s_id] = [val, val, val, 1]
+                else:
+                    acc[0] = min(acc[0], val)
+                    acc[1] = max(acc[1], val)
+                    acc[2] += val
+                    acc[3] += 1
+            processed += len(batch)
+            job.report(processed / max(total, 1))
+    if aggregation == "day_bands":
+        buckets = _roll_up(buckets, 86400 // grid.step_s)
+        grid = TimeGrid(start_dt, end_dt, 86400)
+    columns = {}
+    if buckets:
+        for s_id in sensor_ids:
+            cells = [buckets.get(slot, {}).get(s_id) for slot in range(grid.size)]
+            if bands:
+                columns[f"sensor_{s_id}"] = [
+                    round(c.quantile(0.5), 2) if c else None for c in cells
+                ]
+                for suffix, q in BAND_COLUMNS:
+                    columns[f"sensor_{s_id}_{suffix}"] = [
+                        round(c.quantile(q), 2) if c else None for c in cells
+                    ]
+            else:
+                columns[f"sensor_{s_id}"] = [
+                    round(c[0] / c[1], 2) if c else None for c in cells
+                ]
+    correlation = correlation_pairs(
+        sensor_ids,
+        [columns.get(f"sensor_{s_id}", []) for s_id in sensor_ids],
+        grid.step_s,
+    )
+    columns = {col: fill_gaps(values, gap_fill) for col, values in columns.items()}
+    chart = make_series("name", grid.labels() if buckets else [], columns)
+    stats = {
+        s_id: {
+            "min": round(lo, 2),
+            "max": round(hi, 2),
+            "avg": round(total_val / count, 2),
+            "count": count,
+        }
+        for s_id, (lo, hi, total_val, count) in totals.items()
+    }
+    result = {
+        "chart": chart,
+        "stats": stats,
+        "correlation": correlation,
+        "skipped": sorted(skipped),
+    }
+    analytics_cache.put(
+        analytics_cache_key(
+            sensor_ids, start_dt, end_dt, aggregation, operator, gap_fill
+        ),
+        result,
+        generation=generation,
+    )
+    return result
+
+
+def build_csv_export(job: Job, legend: list[dict], rows: list[dict]) -> str:
+    """Render chart rows as CSV with one column per legend entry."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Timestamp"] + [item["name"] for item in legend])
+    for idx, row in enumerate(rows):
+        if idx % FETCH_BATCH_SIZE == 0:
+            job.report(idx / max(len(rows), 1))
+        writer.writerow(
+            [row["name"]] + [row.get(item["data_key"], "") for item in legend]
+        )
+    return output.getvalue()
+
+
+def build_json_export(job: Job, export: dict) -> str:
+    """Serialize the JSON export document off the event loop."""
+    return json.dumps(export, indent=2)
@@ -0,0 +1,148 @@
+import datetime
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+CacheKey = tuple[
+    tuple[int, ...], datetime.datetime, datetime.datetime, str, str, str
+]
+
+
+def analytics_cache_key(
+    sensor_ids: Iterable[int],
+    start_dt: datetime.datetime,
+    end_dt: datetime.datetime,
+    aggregation: str,
+    operator: str = "none",
+    gap_fill: str = "none",
+) -> CacheKey:
+    """Build the cache key; sensor order doesn't change the result, so it's sorted."""
+    return (
+        tuple(sorted(set(sensor_ids))),
+        start_dt,
+        end_dt,
+        aggregation,
+        operator,
+        gap_fill,
+    )
+
+
+def estimate_size(value: Any) -> int:
+    """Rough, cheap estimate of the memory held by a nested result."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class AnalyticsCache:
+    """Memory-bounded LRU cache of analytics results.
+
+    Entries are keyed by the sensors, time range and chart parameters.
+    Ranges that ended in the past are kept until evicted or invalidated; ranges
+    reaching into the future also expire after `open_range_ttl` seconds, as a
+    safety net for writes that bypass `invalidate` (e.g. scripts writing to the
+    database directly). New readings invalidate only the entries whose sensors
+    and time range cover them.
+
+    `generation` increases with every invalidation; a result computed from a
+    snapshot taken at an older generation is not stored if one of its sensors
+    was invalidated meanwhile.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, open_range_ttl: float = 60.0):
+        self.max_bytes = max_bytes
+        self.open_range_ttl = open_range_ttl
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: OrderedDict[CacheKey, tuple[Any, int, Optional[float]]] = (
+            OrderedDict()
+        )
+        self._by_sensor: dict[int, set[CacheKey]] = {}
+        self._sensor_generation: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: Any, generation: Optional[int] = None):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        end_dt = key[2]
+        expires_at = None
+        if end_dt > datetime.datetime.utcnow():
+            expires_at = time.monotonic() + self.open_range_ttl
+        with self._lock:
+            if generation is not None and any(
+                self._sensor_generation.get(s, 0) > generation for s in key[0]
+            ):
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, expires_at)
+            self.size_bytes += size
+            for sensor_id in key[0]:
+                self._by_sensor.setdefault(sensor_id, set()).add(key)
+            while self.size_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, sensor_id: int, timestamp: datetime.datetime):
+        """Drop cached results whose range covers a new reading of `sensor_id`."""
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        with self._lock:
+            self._bump(sensor_id)
+            for key in list(self._by_sensor.get(sensor_id, ())):
+                if key[1] <= timestamp < key[2]:
+                    self._drop(key)
+
+    def invalidate_sensors(self, sensor_ids: Iterable[int]):
+        """Drop every cached result involving the given sensors."""
+        with self._lock:
+            for sensor_id in sensor_ids:
+                self._bump(sensor_id)
+                for key in list(self._by_sensor.get(sensor_id, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_sensor.clear()
+            self.size_bytes = 0
+
+    def _bump(self, sensor_id: int):
+        self.generation += 1
+        self._sensor_generation[sensor_id] = self.generation
+
+    def _drop(self, key: CacheKey):
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+        for sensor_id in key[0]:
+            keys = self._by_sensor.get(sensor_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_sensor[sensor_id]
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,260 @@
+import dataclasses
+import datetime
+import math
+import threading
+from typing import Callable, Iterable, Optional
+from sqlalchemy import update
+from sqlmodel import select
+from app.database import Alert
+
+WARMUP_READINGS = 30
+BASELINE_ALPHA = 0.02
+SPIKE_Z = 5.0
+SPIKE_COOLDOWN_READINGS = 20
+LEVEL_TIME_CONSTANT_S = 86400.0
+REFERENCE_TIME_CONSTANT_S = 7 * 86400.0
+DRIFT_SIGMAS = 0.5
+FLATLINE_READINGS = 30
+FLATLINE_EPSILON = 1e-6
+ANOMALY_LEVELS = ("spike", "drift", "flatline")
+
+
+@dataclasses.dataclass(frozen=True)
+class Anomaly:
+    """A detected anomaly; `level` is stored as the `Alert.level`."""
+
+    level: str
+    message: str
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class AnomalyOutcome:
+    """What the ingest path has to write for one reading."""
+
+    anomaly: Optional[Anomaly] = None
+    cleared: tuple[str, ...] = ()
+
+
+class SensorBaseline:
+    """Online anomaly state for one sensor, constant size whatever its history.
+
+    Checks each new reading for:
+
+    - `spike`: more than `SPIKE_Z` standard deviations from an exponentially
+      weighted mean of the last ~`1 / BASELINE_ALPHA` readings.
+    - `drift`: the one-day level (time-weighted average) moving more than
+      `DRIFT_SIGMAS` standard deviations away from the one-week reference.
+      Averaging over a day keeps the daily cycle from looking like drift. The
+      reference then restarts from the current level, so a new plateau is
+      reported once.
+    - `flatline`: `FLATLINE_READINGS` consecutive identical values, typical of a
+      stuck sensor.
+
+    Spikes are clamped before updating the averages so a single outlier does
+    not distort them, while a genuine level change is still absorbed over time.
+
+    Each kind is raised once and then stays `active` until it clears: a spike
+    after `SPIKE_COOLDOWN_READINGS` readings without one, a flatline when the
+    value changes, and drift after a day without a further shift.
+    """
+
+    __slots__ = (
+        "count",
+        "mean",
+        "var",
+        "level",
+        "reference",
+        "reference_var",
+        "first_seen",
+        "last_seen",
+        "last_value",
+        "flat_run",
+        "spike_cooldown",
+        "drift_at",
+        "active",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.level = 0.0
+        self.reference = 0.0
+        self.reference_var = 0.0
+        self.first_seen = 0.0
+        self.last_seen = 0.0
+        self.last_value: Optional[float] = None
+        self.flat_run = 0
+        self.spike_cooldown = 0
+        self.drift_at = 0.0
+        self.active: frozenset[str] = frozenset()
+
+    def restore(self, active: Iterable[str]):
+        """Resume with anomalies still open from before, e.g. after a restart."""
+        self.active = frozenset(active)
+        if "spike" in self.active:
+            self.spike_cooldown = SPIKE_COOLDOWN_READINGS
+
+    def observe(self, value: float, timestamp: datetime.datetime) -> AnomalyOutcome:
+        now = timestamp.timestamp()
+        anomaly = None
+        cleared = []
+        if self.last_value is not None and abs(value - self.last_value) <= (
+            FLATLINE_EPSILON * max(1.0, abs(value))
+        ):
+            self.flat_run += 1
+            if self.flat_run >= FLATLINE_READINGS and "flatline" not in self.active:
+                anomaly = Anomaly(
+                    "flatline",
+                    f"Sensor stuck at {value:.2f} for {FLATLINE_READINGS} readings",
+                )
+        else:
+            if self.last_value is not None and "flatline" in self.active:
+                cleared.append("flatline")
+            self.flat_run = 0
+        self.last_value = value
+        self.count += 1
+        if self.count == 1:
+            self.mean = self.level = self.reference = value
+            self.first_seen = self.last_seen = self.drift_at = now
+            return self._outcome(anomaly, cleared)
+        std = math.sqrt(self.var)
+        spiking = False
+        if self.count > WARMUP_READINGS and std > 0:
+            z = (value - self.mean) / std
+            if abs(z) > SPIKE_Z:
+                spiking = True
+                if not self.spike_cooldown and anomaly is None:
+                    anomaly = Anomaly(
+                        "spike",
+                        f"Sudden spike: {value:.2f} ({z:+.1f}σ from {self.mean:.2f})",
+                    )
+                self.spike_cooldown = SPIKE_COOLDOWN_READINGS
+                value = self.mean + math.copysign(SPIKE_Z * std, z)
+        if not spiking and self.spike_cooldown:
+            self.spike_cooldown -= 1
+            if not self.spike_cooldown and "spike" in self.active:
+                cleared.append("spike")
+        # Plain running averages until there are enough readings for the
+        # exponential weights, so early estimates are not biased to zero.
+        alpha = max(BASELINE_ALPHA, 1.0 / self.count)
+        delta = value - self.mean
+        self.mean += alpha * delta
+        self.var = (1 - alpha) * (self.var + alpha * delta * delta)
+        elapsed = max(now - self.last_seen, 0.0)
+        self.last_seen = max(now, self.last_seen)
+        level_alpha = max(
+            1 - math.exp(-elapsed / LEVEL_TIME_CONSTANT_S), 1.0 / self.count
+        )
+        ref_alpha = max(
+            1 - math.exp(-elapsed / REFERENCE_TIME_CONSTANT_S), 1.0 / self.count
+        )
+        self.level += level_alpha * (value - self.level)
+        ref_delta = value - self.reference
+        self.reference += ref_alpha * ref_delta
+        self.reference_var = (1 - ref_alpha) * (
+            self.reference_var + ref_alpha * ref_delta * ref_delta
+        )
+        ref_std = math.sqrt(self.reference_var)
+        settled = self.last_seen - self.first_seen >= LEVEL_TIME_CONSTANT_S
+        if settled and ref_std > 0:
+            shift = (self.level - self.reference) / ref_std
+            if abs(shift) > DRIFT_SIGMAS:
+                if anomaly is None and "drift" not in self.active:
+                    anomaly = Anomaly(
+                        "drift",
+                        f"Readings drifting {'up' if shift > 0 else 'down'}: "
+                        f"daily level {self.level:.2f} vs baseline "
+                        f"{self.reference:.2f}",
+                    )
+                self.reference = self.level
+                self.drift_at = self.last_seen
+        if (
+            "drift" in self.active
+            and self.last_seen - self.drift_at >= LEVEL_TIME_CONSTANT_S
+        ):
+            cleared.append("drift")
+        return self._outcome(anomaly, cleared)
+
+    def _outcome(
+        self, anomaly: Optional[Anomaly], cleared: list[str]
+    ) -> AnomalyOutcome:
+        if cleared:
+            self.active = self.active.difference(cleared)
+        if anomaly is not None:
+            self.active = self.active | {anomaly.level}
+        return AnomalyOutcome(anomaly, tuple(cleared))
+
+
+class AnomalyDetector:
+    """Per-sensor `SensorBaseline`s, created on a sensor's first reading.
+
+    State lives in process memory: after a restart each sensor goes through
+    the warm-up period again before spikes and drift are reported. Which
+    anomalies are still open is reloaded from the database instead, so they
+    are neither raised twice nor left unresolved.
+    """
+
+    def __init__(self):
+        self._baselines: dict[int, SensorBaseline] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        sensor_id: int,
+        value: float,
+        timestamp: datetime.datetime,
+        load_active: Optional[Callable[[], Iterable[str]]] = None,
+    ) -> AnomalyOutcome:
+        """Feed one reading to the sensor's baseline.
+
+        `load_active` returns the anomaly levels the sensor still has open; it
+        is called once, when the sensor's baseline is created, so those alerts
+        are resolved rather than duplicated.
+        """
+        with self._lock:
+            baseline = self._baselines.get(sensor_id)
+        if baseline is None:
+            fresh = SensorBaseline()
+            if load_active is not None:
+                fresh.restore(load_active())
+            with self._lock:
+                baseline = self._baselines.setdefault(sensor_id, fresh)
+        with self._lock:
+            return baseline.observe(value, timestamp)
+
+    def forget(self, sensor_id: int):
+        with self._lock:
+            self._baselines.pop(sensor_id, None)
+
+    def __len__(self) -> int:
+        return len(self._baselines)
+
+
+def open_anomaly_levels(session, sensor_id: int) -> list[str]:
+    """Anomaly levels the sensor has an active alert for."""
+    return session.exec(
+        select(Alert.level)
+        .where(
+            Alert.sensor_id == sensor_id,
+            Alert.level.in_(ANOMALY_LEVELS),
+            Alert.is_active == True,
+        )
+        .distinct()
+    ).all()
+
+
+def resolve_anomaly_alerts(session, sensor_id: int, level: str):
+    """Auto-resolve the sensor's active alerts of one anomaly level."""
+    session.execute(
+        update(Alert)
+        .where(
+            Alert.sensor_id == sensor_id,
+            Alert.level == level,
+            Alert.is_active == True,
+        )
+        .values(is_active=False)
+    )
+
+
+anomaly_detector = AnomalyDetector()
@@ -1,10 +1,36 @@
 import datetime
 import reflex as rx
 from fastapi import APIRouter, Header, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
 from sqlmodel import Session, select, desc
 from typing import Optional
 from pydantic import BaseModel
-from app.database import Sensor, SensorData, Alert, Parcel, User
+from app.database import Sensor, SensorData, Alert, CompositeRule, Parcel, User
+from app.analytics_cache import analytics_cache
+from app.alert_actions import ALERT_ACTIONS, bulk_update_alerts
+from app.alert_rules import (
+    THRESHOLD_ALERT_LEVEL,
+    alert_engine,
+    resolve_threshold_alerts,
+)
+from app.anomaly import (
+    Anomaly,
+    anomaly_detector,
+    open_anomaly_levels,
+    resolve_anomaly_alerts,
+)
+from app.composite_rules import (
+    COMPOSITE_ALERT_LEVEL,
+    CONDITION_OPERATORS,
+    composite_engine,
+    resolve_rule_alerts,
+)
+from app.heartbeat import next_due
+from app.notifications import AlertNotice, notifier
+from app.queries import ALERT_PERIODS, count_alerts_by_period, fetch_alert_history_page
+from app.exports import iter_arrow_chunks, iter_csv_chunks, iter_parquet_chunks
+from app.series import make_series
 
 
 class SensorDataPayload(BaseModel):
@@ -12,6 +38,12 @@ class SensorDataPayload(BaseModel):
     timestamp: Optional[datetime.datetime] = None
 
 
+class BatchReading(BaseModel):
+    sensor_id: int
+    value: float
+    timestamp: Optional[datetime.datetime] = None
+
+
 class SensorResponse(BaseModel):
     id: int
     name: str
@@ -29,6 +61,55 @@ class ParcelResponse(BaseModel):
     crop_type: str
 
 
+class RuleCondition(BaseModel):
+    sensor_id: Optional[int] = None
+    sensor_type: Optional[str] = None
+    op: str
+    value: float
+
+
+class CompositeRulePayload(BaseModel):
+    name: str
+    conditions: list[RuleCondition]
+    duration_s: int = 0
+
+
+class CompositeRuleResponse(BaseModel):
+    id: int
+    name: str
+    conditions: list[RuleCondition]
+    duration_s: int
+    is_enabled: bool
+
+
+class BulkAlertPayload(BaseModel):
+    action: str
+    alert_ids: Optional[list[int]] = None
+    sensor_id: Optional[int] = None
+    parcel_id: Optional[int] = None
+    level: Optional[str] = None
+    before: Optional[datetime.datetime] = None
+
+
+class AlertHistoryItem(BaseModel):
+    id: int
+    sensor_id: int
+    sensor: str
+    parcel_id: int
+    parcel: str
+    message: str
+    level: str
+    created_at: datetime.datetime
+    status: str
+
+
+class AlertHistoryPage(BaseModel):
+    alerts: list[AlertHistoryItem]
+    next_before: Optional[datetime.datetime] = None
+    next_before_id: Optional[int] = None
+    next_before_source: Optional[int] = None
+
+
 class DashboardSummary(BaseModel):
     total_parcels: int
     total_sensors: int
@@ -36,6 +117,7 @@ class DashboardSummary(BaseModel):
 
 
 api_router = APIRouter(tags=["agrotech"])
+MAX_BATCH_READINGS = 5000
 
 
 def get_db():
@@ -52,6 +134,131 @@ def verify_api_key(
     return user
 
 
+def process_reading(
+    session: Session, sensor: Sensor, value: float, timestamp: datetime.datetime
+) -> tuple[list[Alert], Optional[Anomaly]]:
+    """Apply one reading to its sensor's status and alert rules.
+
+    Thresholds are evaluated by the in-memory `alert_engine`, which applies
+    the sensor's duration, hysteresis and cooldown and auto-resolves the alert
+    once values are back to normal; the parcel's composite rules that mention
+    the sensor or its type are re-evaluated by `composite_engine`. Each
+    reading is also fed to the sensor's online anomaly detector; spikes,
+    drift and flat-lines raise one alert with that level, resolved once the
+    detector clears it.
+
+    The reading row itself is not written here. New alerts are added to the
+    session before returning, so a later reading of the same batch can
+    resolve them: the resolve UPDATEs only see rows the session has flushed.
+
+    Returns:
+        tuple: The new alerts and the anomaly if one was found.
+    """
+    sensor_id = sensor.id
+    reading_time = timestamp
+    if reading_time.tzinfo is not None:
+        reading_time = reading_time.astimezone(datetime.timezone.utc).replace(
+            tzinfo=None
+        )
+    if sensor.last_reading_time is None or reading_time > sensor.last_reading_time:
+        sensor.last_reading_time = reading_time
+    # Late or replayed readings still prove the sensor is alive now, but must
+    # not pull its heartbeat back into the past.
+    due = next_due(
+        max(reading_time, datetime.datetime.utcnow()), sensor.expected_interval_s
+    )
+    if sensor.next_due_at is None or due > sensor.next_due_at:
+        sensor.next_due_at = due
+    if sensor.status == "offline":
+        sensor.status = "active"
+        session.execute(
+            update(Alert)
+            .where(
+                Alert.sensor_id == sensor_id,
+                Alert.level == "offline",
+                Alert.is_active == True,
+            )
+            .values(is_active=False)
+        )
+    session.add(sensor)
+    new_alerts = []
+    outcome = alert_engine.evaluate(session, sensor, value, timestamp)
+    if outcome.open_message is not None:
+        new_alerts.append(
+            Alert(
+                sensor_id=sensor_id,
+                message=outcome.open_message,
+                level=THRESHOLD_ALERT_LEVEL,
+                is_active=True,
+                acknowledged=False,
+                created_at=timestamp,
+            )
+        )
+    elif outcome.resolve:
+        resolve_threshold_alerts(session, sensor_id)
+    for composite in composite_engine.evaluate(session, sensor, value, timestamp):
+        if composite.open_message:
+            new_alerts.append(
+                Alert(
+                    sensor_id=sensor_id,
+                    rule_id=composite.rule_id,
+                    message=composite.open_message,
+                    level=COMPOSITE_ALERT_LEVEL,
+                    is_active=True,
+                    acknowledged=False,
+                    created_at=timestamp,
+                )
+            )
+        elif composite.resolve:
+            resolve_rule_alerts(session, composite.rule_id)
+    anomaly_outcome = anomaly_detector.observe(
+        sensor_id,
+        value,
+        timestamp,
+        load_active=lambda: open_anomaly_levels(session, sensor_id),
+    )
+    for level in anomaly_outcome.cleared:
+        resolve_anomaly_alerts(session, sensor_id, level)
+    anomaly = anomaly_outcome.anomaly
+    if anomaly:
+        new_alerts.append(
+            Alert(
+                sensor_id=sensor_id,
+                message=anomaly.message,
+                level=anomaly.level,
+                is_active=True,
+                acknowledged=False,
+                created_at=timestamp,
+            )
+        )
+    session.add_all(new_alerts)
+    return new_alerts, anomaly
+
+
+def notices_by_owner(
+    session: Session, alerts: list[Alert]
+) -> dict[int, list[AlertNotice]]:
+    """Notifications for new alerts, grouped by the owner of each sensor.
+
+    Call before committing, while the alert objects are still loaded.
+    """
+    if not alerts:
+        return {}
+    owners = dict(
+        session.exec(
+            select(Sensor.id, Parcel.farmer_id)
+            .join(Parcel)
+            .where(Sensor.id.in_({alert.sensor_id for alert in alerts}))
+        ).all()
+    )
+    by_owner: dict[int, list[AlertNotice]] = {}
+    for alert in alerts:
+        by_owner.setdefault(owners[alert.sensor_id], []).append(
+            AlertNotice(alert.sensor_id, alert.level, alert.message, alert.created_at)
+        )
+    return by_owner
+
+
 @api_router.post("/sensors/{sensor_id}/data")
 async def ingest_sensor_data(
     sensor_id: int,
@@ -59,53 +266,108 @@ async def ingest_sensor_data(
     user: User = Depends(verify_api_key),
     session: Session = Depends(get_db),
 ):
-    """Ingest data for a specific sensor and check for alerts."""
+    """Ingest data for a specific sensor and check for alerts.
+
+    See `process_reading` for the alert rules applied. New alerts are handed
+    to the notification pipeline, which delivers them in the background.
+    """
     sensor = session.get(Sensor, sensor_id)
     if not sensor:
         raise HTTPException(status_code=404, detail="Sensor not found")
     timestamp = payload.timestamp or datetime.datetime.utcnow()
     new_data = SensorData(sensor_id=sensor_id, value=payload.value, timestamp=timestamp)
     session.add(new_data)
-    sensor.last_reading_time = timestamp
-    session.add(sensor)
-    alert_triggered = False
-    alert_msg = ""
-    if payload.value < sensor.threshold_low:
-        alert_triggered = True
-        alert_msg = f"Low {sensor.type} detected: {payload.value:.2f} (Threshold: {sensor.threshold_low})"
-    elif payload.value > sensor.threshold_high:
-        alert_triggered = True
-        alert_msg = f"High {sensor.type} detected: {payload.value:.2f} (Threshold: {sensor.threshold_high})"
-    if alert_triggered:
-        existing_alert = session.exec(
-            select(Alert).where(
-                Alert.sensor_id == sensor_id,
-                Alert.is_active == True,
-                Alert.acknowledged == False,
-            )
-        ).first()
-        if not existing_alert:
-            new_alert = Alert(
-                sensor_id=sensor_id,
-                message=alert_msg,
-                level="warning",
-                is_active=True,
-                acknowledged=False,
-                created_at=timestamp,
+    new_alerts, anomaly = process_reading(session, sensor, payload.value, timestamp)
+    alert_triggered = any(
+        alert.level in (THRESHOLD_ALERT_LEVEL, COMPOSITE_ALERT_LEVEL)
+        for alert in new_alerts
+    )
+    notices = notices_by_owner(session, new_alerts)
+    session.commit()
+    analytics_cache.invalidate(sensor_id, timestamp)
+    for owner_id, owner_notices in notices.items():
+        notifier.publish(owner_id, owner_notices)
+    return {
+        "status": "success",
+        "alert_triggered": alert_triggered,
+        "anomaly": anomaly.level if anomaly else None,
+    }
+
+
+@api_router.post("/sensors/data/batch")
+async def ingest_sensor_data_batch(
+    payload: list[BatchReading],
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Ingest readings for many sensors in one request and one transaction.
+
+    Readings are written with a single multi-row insert and then run through
+    the same alert rules as single readings, in the order given. Unknown
+    sensor ids and sensors of other users are skipped and counted as rejected.
+    """
+    if len(payload) > MAX_BATCH_READINGS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_READINGS} readings per batch",
+        )
+    sensors = {
+        sensor.id: sensor
+        for sensor in session.exec(
+            select(Sensor)
+            .join(Parcel, Sensor.parcel_id == Parcel.id)
+            .where(
+                Sensor.id.in_({r.sensor_id for r in payload}),
+                Parcel.farmer_id == user.id,
             )
-            session.add(new_alert)
+        ).all()
+    }
+    now = datetime.datetime.utcnow()
+    accepted = [
+        (r.sensor_id, r.value, r.timestamp or now)
+        for r in payload
+        if r.sensor_id in sensors
+    ]
+    if accepted:
+        session.execute(
+            insert(SensorData),
+            [
+                {"sensor_id": s_id, "value": value, "timestamp": timestamp}
+                for s_id, value, timestamp in accepted
+            ],
+        )
+    new_alerts = []
+    for s_id, value, timestamp in accepted:
+        alerts, _ = process_reading(session, sensors[s_id], value, timestamp)
+        new_alerts.extend(alerts)
+    alert_count = len(new_alerts)
+    notices = notices_by_owner(session, new_alerts)
     session.commit()
-    return {"status": "success", "alert_triggered": alert_triggered}
+    for s_id, _, timestamp in accepted:
+        analytics_cache.invalidate(s_id, timestamp)
+    for owner_id, owner_notices in notices.items():
+        notifier.publish(owner_id, owner_notices)
+    return {
+        "status": "success",
+        "accepted": len(accepted),
+        "rejected": len(payload) - len(accepted),
+        "alerts": alert_count,
+    }
 
 
 @api_router.get("/sensors/{sensor_id}/data")
 async def get_sensor_history(
     sensor_id: int,
     limit: int = 100,
+    format: str = "rows",
     user: User = Depends(verify_api_key),
     session: Session = Depends(get_db),
 ):
-    """Get historical data for a sensor."""
+    """Get historical data for a sensor.
+
+    `format=columnar` returns `{"key", "index", "columns"}` with timestamps
+    as the index and `value`/`id` arrays instead of one object per reading.
+    """
     sensor = session.get(Sensor, sensor_id)
     if not sensor:
         raise HTTPException(status_code=404, detail="Sensor not found")
@@ -116,6 +378,12 @@ async def get_sensor_history(
         .limit(limit)
     )
     data = session.exec(query).all()
+    if format == "columnar":
+        return make_series(
+            "timestamp",
+            [d.timestamp for d in data],
+            {"value": [d.value for d in data], "id": [d.id for d in data]},
+        )
     return [{"timestamp": d.timestamp, "value": d.value, "id": d.id} for d in data]
 
 
@@ -170,6 +438,186 @@ async def list_parcel_sensors(
     return results
 
 
+def get_owned_parcel(session: Session, user: User, parcel_id: int) -> Parcel:
+    parcel = session.get(Parcel, parcel_id)
+    if not parcel or parcel.farmer_id != user.id:
+        raise HTTPException(status_code=404, detail="Parcel not found or access denied")
+    return parcel
+
+
+@api_router.get(
+    "/parcels/{parcel_id}/rules", response_model=list[CompositeRuleResponse]
+)
+async def list_parcel_rules(
+    parcel_id: int,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """List the composite alert rules of a parcel."""
+    get_owned_parcel(session, user, parcel_id)
+    rules = session.exec(
+        select(CompositeRule).where(CompositeRule.parcel_id == parcel_id)
+    ).all()
+    return [CompositeRuleResponse(**r.model_dump()) for r in rules]
+
+
+@api_router.post("/parcels/{parcel_id}/rules", response_model=CompositeRuleResponse)
+async def create_parcel_rule(
+    parcel_id: int,
+    payload: CompositeRulePayload,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Create a rule that alerts when all conditions hold in the parcel.
+
+    Each condition targets either a `sensor_id` of the parcel or a
+    `sensor_type`, in which case any sensor of that type satisfies it.
+    """
+    get_owned_parcel(session, user, parcel_id)
+    if not payload.conditions:
+        raise HTTPException(status_code=400, detail="At least one condition is required")
+    parcel_sensors = set(
+        session.exec(select(Sensor.id).where(Sensor.parcel_id == parcel_id)).all()
+    )
+    for condition in payload.conditions:
+        if condition.op not in CONDITION_OPERATORS:
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported operator: {condition.op}"
+            )
+        if (condition.sensor_id is None) == (condition.sensor_type is None):
+            raise HTTPException(
+                status_code=400,
+                detail="Each condition needs exactly one of sensor_id or sensor_type",
+            )
+        if condition.sensor_id is not None and condition.sensor_id not in parcel_sensors:
+            raise HTTPException(status_code=400, detail="Sensor is not in this parcel")
+    rule = CompositeRule(
+        parcel_id=parcel_id,
+        name=payload.name,
+        conditions=[c.model_dump(exclude_none=True) for c in payload.conditions],
+        duration_s=max(payload.duration_s, 0),
+    )
+    session.add(rule)
+    session.commit()
+    session.refresh(rule)
+    composite_engine.invalidate_parcel(parcel_id)
+    return CompositeRuleResponse(**rule.model_dump())
+
+
+@api_router.delete("/parcels/{parcel_id}/rules/{rule_id}")
+async def delete_parcel_rule(
+    parcel_id: int,
+    rule_id: int,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Delete a composite rule and resolve the alerts it left open."""
+    get_owned_parcel(session, user, parcel_id)
+    rule = session.get(CompositeRule, rule_id)
+    if not rule or rule.parcel_id != parcel_id:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    resolve_rule_alerts(session, rule_id)
+    session.delete(rule)
+    session.commit()
+    composite_engine.invalidate_parcel(parcel_id)
+    return {"status": "success"}
+
+
+@api_router.post("/alerts/bulk")
+async def bulk_update_alerts_endpoint(
+    payload: BulkAlertPayload,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Acknowledge or resolve many open alerts with one set-based update.
+
+    Filters (ids, sensor, parcel, level, created before) combine; with none
+    given every open alert of the user is affected.
+    """
+    if payload.action not in ALERT_ACTIONS:
+        raise HTTPException(
+            status_code=400, detail=f"action must be one of {', '.join(ALERT_ACTIONS)}"
+        )
+    changed = bulk_update_alerts(
+        session,
+        user.id,
+        payload.action,
+        alert_ids=payload.alert_ids,
+        sensor_id=payload.sensor_id,
+        parcel_id=payload.parcel_id,
+        level=payload.level,
+        before=payload.before,
+    )
+    session.commit()
+    return {"status": "success", "updated": len(changed), "alert_ids": changed}
+
+
+@api_router.get("/alerts/history", response_model=AlertHistoryPage)
+async def get_alert_history(
+    level: Optional[str] = None,
+    parcel_id: Optional[int] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    before: Optional[datetime.datetime] = None,
+    before_id: Optional[int] = None,
+    before_source: Optional[int] = None,
+    limit: int = 50,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Page through acknowledged, resolved and archived alerts, newest first.
+
+    Pass the `next_before` / `next_before_id` / `next_before_source` of a
+    response as `before` / `before_id` / `before_source` to get the following
+    page.
+    """
+    cursor = (before, before_id, before_source)
+    if any(part is None for part in cursor) and any(
+        part is not None for part in cursor
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="before, before_id and before_source must be given together",
+        )
+    rows, has_more = fetch_alert_history_page(
+        session,
+        user.id,
+        level=level,
+        parcel_id=parcel_id,
+        start=start,
+        end=end,
+        before=cursor if before is not None else None,
+        page_size=max(1, min(limit, 500)),
+    )
+    page = AlertHistoryPage(alerts=[AlertHistoryItem(**row._mapping) for row in rows])
+    if has_more:
+        page.next_before = rows[-1].created_at
+        page.next_before_id = rows[-1].key
+        page.next_before_source = rows[-1].source
+    return page
+
+
+@api_router.get("/alerts/counts")
+async def get_alert_counts(
+    period: str = "day",
+    level: Optional[str] = None,
+    parcel_id: Optional[int] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Number of alerts raised per day, week or month, archived ones included."""
+    if period not in ALERT_PERIODS:
+        raise HTTPException(
+            status_code=400, detail=f"period must be one of {', '.join(ALERT_PERIODS)}"
+        )
+    counts = count_alerts_by_period(
+        session, user.id, period, level, parcel_id, start, end
+    )
+    return [{"period": key, "count": count} for key, count in counts]
+
+
 @api_router.get("/dashboard", response_model=DashboardSummary)
 async def get_dashboard_summary(
     user: User = Depends(verify_api_key), session: Session = Depends(get_db)
@@ -200,4 +648,81 @@ async def get_dashboard_summary(
         total_parcels=len(total_parcels),
         total_sensors=len(total_sensors),
         active_alerts=active_alerts,
-    )
\ No newline at end of file
+    )
+
+
+def resolve_sensor_ids(session: Session, user: User, sensor_ids: Optional[str]) -> list[int]:
+    """Parse a comma-separated sensor id list and check the user owns every sensor.
+
+    An empty list selects all of the user's sensors.
+    """
+    owned = set(
+        session.exec(
+            select(Sensor.id).join(Parcel).where(Parcel.farmer_id == user.id)
+        ).all()
+    )
+    if not sensor_ids:
+        return sorted(owned)
+    try:
+        requested = [int(part) for part in sensor_ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="sensor_ids must be integers")
+    if not set(requested) <= owned:
+        raise HTTPException(status_code=404, detail="Sensor not found or access denied")
+    return requested
+
+
+@api_router.get("/export/readings.csv")
+async def export_readings_csv(
+    sensor_ids: Optional[str] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Stream raw readings as CSV for a set of sensors and an optional time range.
+
+    Rows are read through a server-side cursor and sent with chunked transfer
+    encoding, so memory use stays constant and the first bytes arrive
+    immediately.
+    """
+    ids = resolve_sensor_ids(session, user, sensor_ids)
+    return StreamingResponse(
+        iter_csv_chunks(ids, start, end),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="readings.csv"'},
+    )
+
+
+@api_router.get("/export/readings.arrow")
+async def export_readings_arrow(
+    sensor_ids: Optional[str] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Stream raw readings as an Arrow IPC stream (columnar, zero-parse reads)."""
+    ids = resolve_sensor_ids(session, user, sensor_ids)
+    return StreamingResponse(
+        iter_arrow_chunks(ids, start, end),
+        media_type="application/vnd.apache.arrow.stream",
+        headers={"Content-Disposition": 'attachment; filename="readings.arrow"'},
+    )
+
+
+@api_router.get("/export/readings.parquet")
+async def export_readings_parquet(
+    sensor_ids: Optional[str] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    user: User = Depends(verify_api_key),
+    session: Session = Depends(get_db),
+):
+    """Stream raw readings as a zstd-compressed Parquet file."""
+    ids = resolve_sensor_ids(session, user, sensor_ids)
+    return StreamingResponse(
+        iter_parquet_chunks(ids, start, end),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": 'attachment; filename="readings.parquet"'},
+    )
@@ -13,10 +13,19 @@ def index():
 from app.pages.parcels import parcels_page
 from app.pages.parcel_detail import parcel_detail_page
 from app.states.parcel_state import ParcelState
+from app.alert_archive import alert_archiver
 from app.api import api_router
+from app.database import ensure_schema
+from app.heartbeat import heartbeat_sweeper
+from app.notifications import notification_worker
 from fastapi import FastAPI
 
 
+def upgrade_schema():
+    """Create tables, columns and indexes missing from an existing database."""
+    ensure_schema(rx.model.get_engine())
+
+
 def api_config(api_app):
     custom_api = FastAPI()
     custom_api.include_router(api_router)
@@ -35,6 +44,10 @@ app = rx.App(
         ),
     ],
 )
+app.register_lifespan_task(upgrade_schema)
+app.register_lifespan_task(heartbeat_sweeper)
+app.register_lifespan_task(alert_archiver)
+app.register_lifespan_task(notification_worker)
 from app.states.dashboard_state import DashboardState
 from app.pages.analytics import analytics_page
 from app.states.analytics_state import AnalyticsState
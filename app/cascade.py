@@ -0,0 +1,78 @@
+from typing import Iterator
+from sqlalchemy import delete
+from sqlmodel import Session, select, func
+from app.database import (
+    Alert,
+    AlertArchive,
+    CompositeRule,
+    Parcel,
+    Sensor,
+    SensorData,
+)
+
+DELETE_BATCH_SIZE = 5000
+
+
+def parcel_sensor_ids(parcel_id: int):
+    """Subquery selecting the ids of every sensor in a parcel."""
+    return select(Sensor.id).where(Sensor.parcel_id == parcel_id)
+
+
+def count_dependent_rows(session: Session, sensor_ids) -> int:
+    """Count the readings and alerts, archived ones included, of the given sensors."""
+    readings = session.exec(
+        select(func.count(SensorData.id)).where(SensorData.sensor_id.in_(sensor_ids))
+    ).one()
+    alerts = session.exec(
+        select(func.count(Alert.id)).where(Alert.sensor_id.in_(sensor_ids))
+    ).one()
+    archived = session.exec(
+        select(func.count(AlertArchive.id)).where(
+            AlertArchive.sensor_id.in_(sensor_ids)
+        )
+    ).one()
+    return readings + alerts + archived
+
+
+def iter_delete_dependents(
+    session: Session, sensor_ids, batch_size: int = DELETE_BATCH_SIZE
+) -> Iterator[int]:
+    """Delete readings and (archived) alerts of the given sensors in committed batches.
+
+    Each batch is a single set-based DELETE followed by a commit, so the write
+    lock is released between batches and other writers (e.g. ingest) can run.
+
+    Args:
+        session: Open database session.
+        sensor_ids: List or subquery of sensor ids.
+        batch_size: Maximum rows removed per statement.
+
+    Yields:
+        int: Running total of rows deleted so far.
+    """
+    deleted = 0
+    for model in (SensorData, Alert, AlertArchive):
+        while True:
+            batch = (
+                select(model.id).where(model.sensor_id.in_(sensor_ids)).limit(batch_size)
+            )
+            result = session.execute(delete(model).where(model.id.in_(batch)))
+            session.commit()
+            if not result.rowcount:
+                break
+            deleted += result.rowcount
+            yield deleted
+
+
+def delete_sensors(session: Session, sensor_ids) -> None:
+    """Delete the sensor rows themselves once their dependents are gone."""
+    session.execute(delete(Sensor).where(Sensor.id.in_(sensor_ids)))
+    session.commit()
+
+
+def delete_parcel_rows(session: Session, parcel_id: int) -> None:
+    """Delete a parcel, its sensors and rules once their dependents are gone."""
+    delete_sensors(session, parcel_sensor_ids(parcel_id))
+    session.execute(delete(CompositeRule).where(CompositeRule.parcel_id == parcel_id))
+    session.execute(delete(Parcel).where(Parcel.id == parcel_id))
+    session.commit()
@@ -2,6 +2,23 @@ import reflex as rx
 from typing import Any
 from app.states.dashboard_state import DashboardState
 
+
+def series_rows(series: rx.Var) -> rx.Var:
+    """Expand a columnar series (see `app.series`) into recharts rows client-side.
+
+    The state only ships one index array and one array per column over the
+    websocket; the row objects recharts expects are built in the browser.
+    """
+    return rx.Var(
+        _js_expr=(
+            f"((s) => (s?.index ?? []).map((x, i) => Object.fromEntries("
+            f"[[s.key, x], ...Object.entries(s.columns ?? {{}}).map(([k, v]) => [k, v[i]])]"
+            f")))({series!s})"
+        ),
+        _var_type=list[dict[str, Any]],
+        _var_data=series._get_all_var_data(),
+    )
+
 TOOLTIP_PROPS = {
     "content_style": {
         "background": "white",
@@ -46,7 +63,7 @@ def sensor_area_chart() -> rx.Component:
             class_name="flex justify-between items-center mb-6",
         ),
         rx.cond(
-            DashboardState.chart_data,
+            DashboardState.has_chart_data,
             rx.recharts.area_chart(
                 rx.recharts.cartesian_grid(
                     stroke_dasharray="3 3", vertical=False, class_name="stroke-gray-200"
@@ -74,7 +91,7 @@ def sensor_area_chart() -> rx.Component:
                     fill_opacity=0.3,
                     active_dot={"r": 6, "strokeWidth": 0},
                 ),
-                data=DashboardState.chart_data,
+                data=series_rows(DashboardState.chart_series),
                 height=300,
                 width="100%",
             ),
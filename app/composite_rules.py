@@ -0,0 +1,212 @@
+import dataclasses
+import datetime
+import operator
+import threading
+from typing import Optional
+from sqlalchemy import update
+from sqlmodel import select
+from app.database import Alert, CompositeRule, Sensor
+
+COMPOSITE_ALERT_LEVEL = "composite"
+MAX_VALUE_AGE_S = 3600
+CONDITION_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Condition:
+    """One clause of a composite rule, targeting a sensor or a sensor type."""
+
+    sensor_id: Optional[int]
+    sensor_type: Optional[str]
+    op: str
+    value: float
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Condition":
+        return cls(
+            sensor_id=data.get("sensor_id"),
+            sensor_type=data.get("sensor_type"),
+            op=data["op"],
+            value=float(data["value"]),
+        )
+
+    def holds(self, bucket: "_ParcelRules", now: datetime.datetime) -> bool:
+        """True if the target's latest fresh value satisfies the clause.
+
+        For a sensor type, any sensor of that type in the parcel will do.
+        """
+        compare = CONDITION_OPERATORS[self.op]
+        if self.sensor_id is not None:
+            readings = [bucket.latest.get(self.sensor_id)]
+        else:
+            readings = bucket.latest_by_type.get(self.sensor_type, {}).values()
+        return any(
+            reading is not None
+            and (now - reading[1]).total_seconds() <= MAX_VALUE_AGE_S
+            and compare(reading[0], self.value)
+            for reading in readings
+        )
+
+    def describe(self) -> str:
+        target = self.sensor_type or f"sensor {self.sensor_id}"
+        return f"{target} {self.op} {self.value:g}"
+
+
+class _CompiledRule:
+    __slots__ = ("id", "name", "conditions", "duration_s", "holding_since", "firing")
+
+    def __init__(self, rule: CompositeRule, firing: bool):
+        self.id = rule.id
+        self.name = rule.name
+        self.conditions = tuple(Condition.from_dict(c) for c in rule.conditions)
+        self.duration_s = rule.duration_s
+        self.holding_since: Optional[datetime.datetime] = None
+        self.firing = firing
+
+
+class _ParcelRules:
+    """Rules of one parcel indexed by the sensors and types they reference."""
+
+    __slots__ = ("by_sensor", "by_type", "latest", "latest_by_type")
+
+    def __init__(self):
+        self.by_sensor: Optional[dict[int, list[_CompiledRule]]] = None
+        self.by_type: dict[str, list[_CompiledRule]] = {}
+        self.latest: dict[int, tuple[float, datetime.datetime]] = {}
+        self.latest_by_type: dict[str, dict[int, tuple[float, datetime.datetime]]] = {}
+
+    def load(self, rules: list[CompositeRule], firing_ids: set[int]):
+        self.by_sensor, self.by_type = {}, {}
+        for rule in rules:
+            compiled = _CompiledRule(rule, rule.id in firing_ids)
+            for condition in compiled.conditions:
+                if condition.sensor_id is not None:
+                    self.by_sensor.setdefault(condition.sensor_id, []).append(compiled)
+                else:
+                    self.by_type.setdefault(condition.sensor_type, []).append(compiled)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CompositeOutcome:
+    rule_id: int
+    open_message: Optional[str] = None
+    resolve: bool = False
+
+
+class CompositeRuleEngine:
+    """Evaluates composite rules against the latest value of every sensor.
+
+    Rules are loaded per parcel on that parcel's first reading (two queries)
+    and indexed by the sensor ids and types their conditions mention. A
+    reading only re-evaluates the rules of its own parcel that reference its
+    sensor or its type, so ingest cost does not grow with the total number of
+    rules. Call `invalidate_parcel` after rules are created or deleted.
+    """
+
+    def __init__(self):
+        self._parcels: dict[int, _ParcelRules] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, session, parcel_id: int) -> _ParcelRules:
+        with self._lock:
+            bucket = self._parcels.setdefault(parcel_id, _ParcelRules())
+            if bucket.by_sensor is not None:
+                return bucket
+        rules = session.exec(
+            select(CompositeRule).where(
+                CompositeRule.parcel_id == parcel_id,
+                CompositeRule.is_enabled == True,
+            )
+        ).all()
+        firing_ids = set()
+        if rules:
+            firing_ids = set(
+                session.exec(
+                    select(Alert.rule_id).where(
+                        Alert.rule_id.in_([r.id for r in rules]),
+                        Alert.is_active == True,
+                    )
+                ).all()
+            )
+        with self._lock:
+            if bucket.by_sensor is None:
+                bucket.load(rules, firing_ids)
+        return bucket
+
+    def evaluate(
+        self, session, sensor: Sensor, value: float, timestamp: datetime.datetime
+    ) -> list[CompositeOutcome]:
+        bucket = self._bucket(session, sensor.parcel_id)
+        with self._lock:
+            reading = (value, timestamp)
+            bucket.latest[sensor.id] = reading
+            bucket.latest_by_type.setdefault(sensor.type, {})[sensor.id] = reading
+            candidates = {
+                id(rule): rule
+                for rule in bucket.by_sensor.get(sensor.id, [])
+                + bucket.by_type.get(sensor.type, [])
+            }
+            outcomes = []
+            for rule in candidates.values():
+                outcome = self._step(bucket, rule, timestamp)
+                if outcome is not None:
+                    outcomes.append(outcome)
+            return outcomes
+
+    def _step(
+        self, bucket: _ParcelRules, rule: _CompiledRule, now: datetime.datetime
+    ) -> Optional[CompositeOutcome]:
+        if not all(c.holds(bucket, now) for c in rule.conditions):
+            rule.holding_since = None
+            if rule.firing:
+                rule.firing = False
+                return CompositeOutcome(rule.id, resolve=True)
+            return None
+        if rule.firing:
+            return None
+        if rule.holding_since is None:
+            rule.holding_since = now
+        if (now - rule.holding_since).total_seconds() < rule.duration_s:
+            return None
+        rule.firing = True
+        clauses = " AND ".join(c.describe() for c in rule.conditions)
+        message = f"Rule '{rule.name}' triggered: {clauses}"
+        if rule.duration_s:
+            message += f" for {rule.duration_s / 60:g} min"
+        return CompositeOutcome(rule.id, open_message=message)
+
+    def invalidate_parcel(self, parcel_id: int):
+        """Reload the parcel's rules on its next reading, keeping latest values."""
+        with self._lock:
+            bucket = self._parcels.get(parcel_id)
+            if bucket is not None:
+                bucket.by_sensor = None
+
+    def forget_parcel(self, parcel_id: int):
+        with self._lock:
+            self._parcels.pop(parcel_id, None)
+
+    def forget_sensor(self, sensor_id: int):
+        """Drop a deleted or retyped sensor's latest value from type conditions."""
+        with self._lock:
+            for bucket in self._parcels.values():
+                bucket.latest.pop(sensor_id, None)
+                for readings in bucket.latest_by_type.values():
+                    readings.pop(sensor_id, None)
+
+
+def resolve_rule_alerts(session, rule_id: int):
+    """Auto-resolve the open alerts raised by a composite rule."""
+    session.execute(
+        update(Alert)
+        .where(Alert.rule_id == rule_id, Alert.is_active == True)
+        .values(is_active=False)
+    )
+
+
+composite_engine = CompositeRuleEngine()
@@ -0,0 +1,126 @@
+import numpy as np
+from typing import Optional
+
+MIN_OVERLAP = 3
+MAX_LAG_STEPS = 24
+
+
+def to_matrix(columns: list[list[Optional[float]]]) -> np.ndarray:
+    """Stack aligned columns into a (slots, sensors) array with NaN for gaps."""
+    return np.array(
+        [[np.nan if v is None else v for v in col] for col in columns], dtype=float
+    ).T.reshape(-1, len(columns))
+
+
+def _pairwise_pearson(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson r between every column of `a` and every column of `b`.
+
+    Uses pairwise-complete observations: each pair only counts the slots where
+    both series have a value. Everything reduces to a handful of matrix
+    products, so the cost is one BLAS call per moment rather than a Python
+    loop per pair.
+
+    Returns:
+        tuple: (r, n) matrices of shape (a columns, b columns); `r` is NaN
+        where fewer than `MIN_OVERLAP` slots overlap or a series is constant.
+    """
+    ma, mb = ~np.isnan(a), ~np.isnan(b)
+    a0, b0 = np.where(ma, a, 0.0), np.where(mb, b, 0.0)
+    fa, fb = ma.astype(float), mb.astype(float)
+    n = fa.T @ fb
+    sum_a = a0.T @ fb
+    sum_b = fa.T @ b0
+    sum_aa = (a0 * a0).T @ fb
+    sum_bb = fa.T @ (b0 * b0)
+    sum_ab = a0.T @ b0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_ab - sum_a * sum_b / n
+        var_a = sum_aa - sum_a**2 / n
+        var_b = sum_bb - sum_b**2 / n
+        r = cov / np.sqrt(var_a * var_b)
+    r[(n < MIN_OVERLAP) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _ranks(matrix: np.ndarray) -> np.ndarray:
+    """Average ranks of each column's values, ties sharing their mean rank."""
+    ranked = np.full(matrix.shape, np.nan)
+    for j in range(matrix.shape[1]):
+        valid = ~np.isnan(matrix[:, j])
+        if not valid.any():
+            continue
+        _, inverse, counts = np.unique(
+            matrix[valid, j], return_inverse=True, return_counts=True
+        )
+        ends = np.cumsum(counts)
+        ranked[valid, j] = (ends - (counts - 1) / 2.0)[inverse]
+    return ranked
+
+
+def correlation_matrices(matrix: np.ndarray) -> dict[str, np.ndarray]:
+    """Pearson and Spearman matrices plus overlap counts for aligned series.
+
+    Spearman ranks each series over all of its values rather than re-ranking
+    per pair, which keeps it a single Pearson pass over the ranks.
+    """
+    pearson, n = _pairwise_pearson(matrix, matrix)
+    spearman, _ = _pairwise_pearson(_ranks(matrix), _ranks(matrix))
+    return {"pearson": pearson, "spearman": spearman, "n": n}
+
+
+def best_lags(matrix: np.ndarray, max_lag: int = MAX_LAG_STEPS) -> tuple:
+    """Lag (in grid slots) with the strongest cross-correlation for every pair.
+
+    For lag `k`, entry `[i, j]` correlates series `i` at slot `t` with series
+    `j` at slot `t + k`; negative lags are the transposes of positive ones, so
+    only `0..max_lag` is computed.
+
+    Returns:
+        tuple: (lag, r) matrices; `lag[i, j] > 0` means `j` follows `i`.
+    """
+    size = matrix.shape[1]
+    best_r = np.full((size, size), np.nan)
+    best_lag = np.zeros((size, size), dtype=int)
+    for lag in range(0, min(max_lag, matrix.shape[0] - MIN_OVERLAP) + 1):
+        r, _ = _pairwise_pearson(matrix[: matrix.shape[0] - lag], matrix[lag:])
+        for candidate, k in ((r, lag), (r.T, -lag)):
+            better = np.abs(candidate) > np.nan_to_num(np.abs(best_r), nan=-1.0)
+            best_r = np.where(better, candidate, best_r)
+            best_lag = np.where(better, k, best_lag)
+    return best_lag, best_r
+
+
+def correlation_pairs(
+    sensor_ids: list[int], columns: list[list[Optional[float]]], step_s: int
+) -> list[dict]:
+    """Pairwise correlation summary of aligned sensor columns.
+
+    Returns:
+        list[dict]: One entry per sensor pair with `a`, `b` (sensor ids),
+        `pearson`, `spearman`, `overlap`, `lag_s` and `lag_r` (the strongest
+        lagged correlation), strongest Pearson first. Pairs without enough
+        overlapping slots are omitted.
+    """
+    if len(sensor_ids) < 2:
+        return []
+    matrix = to_matrix(columns)
+    stats = correlation_matrices(matrix)
+    lags, lag_r = best_lags(matrix)
+    pairs = []
+    for i in range(len(sensor_ids)):
+        for j in range(i + 1, len(sensor_ids)):
+            if np.isnan(stats["pearson"][i, j]):
+                continue
+            pairs.append(
+                {
+                    "a": sensor_ids[i],
+                    "b": sensor_ids[j],
+                    "pearson": round(float(stats["pearson"][i, j]), 3),
+                    "spearman": round(float(np.nan_to_num(stats["spearman"][i, j])), 3),
+                    "overlap": int(stats["n"][i, j]),
+                    "lag_s": int(lags[i, j]) * step_s,
+                    "lag_r": round(float(np.nan_to_num(lag_r[i, j])), 3),
+                }
+            )
+    pairs.sort(key=lambda p: abs(p["pearson"]), reverse=True)
+    return pairs
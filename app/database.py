@@ -1,8 +1,13 @@
 import reflex as rx
 import datetime
+import sqlalchemy
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from typing import Optional
 
+OPEN_ALERT_SQLITE = "is_active = 1 AND acknowledged = 0"
+OPEN_ALERT_POSTGRESQL = "is_active = true AND acknowledged = false"
+
 
 class User(SQLModel, table=True):
     """User model for authentication and role management."""
@@ -13,6 +18,8 @@ class User(SQLModel, table=True):
     password_hash: str
     role: str = "farmer"
     api_key: Optional[str] = Field(default=None, index=True)
+    notifications_enabled: bool = True
+    webhook_url: Optional[str] = None
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     parcels: list["Parcel"] = Relationship(back_populates="farmer")
 
@@ -20,12 +27,18 @@ class User(SQLModel, table=True):
 class Parcel(SQLModel, table=True):
     """Represents a land parcel owned by a farmer."""
 
+    __table_args__ = (
+        Index("ix_parcel_farmer_name", "farmer_id", "name"),
+        Index("ix_parcel_farmer_location", "farmer_id", "location"),
+        Index("ix_parcel_farmer_crop_type", "farmer_id", "crop_type"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     size: float
     crop_type: str
     location: str
-    farmer_id: int = Field(foreign_key="user.id")
+    farmer_id: int = Field(foreign_key="user.id", index=True)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     farmer: Optional[User] = Relationship(back_populates="parcels")
     sensors: list["Sensor"] = Relationship(back_populates="parcel")
@@ -38,10 +51,15 @@ class Sensor(SQLModel, table=True):
     name: str
     type: str
     status: str = "active"
-    parcel_id: int = Field(foreign_key="parcel.id")
+    parcel_id: int = Field(foreign_key="parcel.id", index=True)
     last_reading_time: Optional[datetime.datetime] = None
+    expected_interval_s: int = 900
+    next_due_at: Optional[datetime.datetime] = Field(default=None, index=True)
     threshold_low: float = 0.0
     threshold_high: float = 100.0
+    alert_hysteresis: float = 0.0
+    alert_duration_s: int = 0
+    alert_cooldown_s: int = 0
     parcel: Optional[Parcel] = Relationship(back_populates="sensors")
     readings: list["SensorData"] = Relationship(back_populates="sensor")
     alerts: list["Alert"] = Relationship(back_populates="sensor")
@@ -50,6 +68,12 @@ class Sensor(SQLModel, table=True):
 class SensorData(SQLModel, table=True):
     """Historical data readings from sensors."""
 
+    __table_args__ = (
+        # Per-sensor range scans: history, exports, analytics and the batched
+        # deletes of a sensor's readings.
+        Index("ix_sensordata_sensor_timestamp", "sensor_id", "timestamp"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     sensor_id: int = Field(foreign_key="sensor.id")
     value: float
@@ -60,11 +84,140 @@ class SensorData(SQLModel, table=True):
 class Alert(SQLModel, table=True):
     """System alerts triggered by sensor thresholds."""
 
+    __table_args__ = (
+        Index("ix_alert_sensor_created", "sensor_id", "created_at"),
+        Index("ix_alert_created_id", "created_at", "id"),
+        # Partial indexes over open alerts only, so the dashboard, the alerts
+        # page and rule evaluation stay O(open alerts) whatever the history
+        # size. Each dialect gets the predicate exactly as SQLAlchemy renders
+        # it in queries, so the planners can match it.
+        Index(
+            "ix_alert_open_sensor",
+            "sensor_id",
+            "created_at",
+            sqlite_where=sqlalchemy.text(OPEN_ALERT_SQLITE),
+            postgresql_where=sqlalchemy.text(OPEN_ALERT_POSTGRESQL),
+        ),
+        Index(
+            "ix_alert_open_created",
+            "created_at",
+            sqlite_where=sqlalchemy.text(OPEN_ALERT_SQLITE),
+            postgresql_where=sqlalchemy.text(OPEN_ALERT_POSTGRESQL),
+        ),
+        Index(
+            "ix_alert_active_level_sensor",
+            "level",
+            "sensor_id",
+            sqlite_where=sqlalchemy.text("is_active = 1"),
+            postgresql_where=sqlalchemy.text("is_active = true"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     sensor_id: int = Field(foreign_key="sensor.id")
     message: str
     level: str = "warning"
     is_active: bool = True
     acknowledged: bool = False
+    rule_id: Optional[int] = Field(default=None, index=True)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    sensor: Optional[Sensor] = Relationship(back_populates="alerts")
+
+
+class AlertArchive(SQLModel, table=True):
+    """Resolved alert moved out of `Alert` once past the retention period.
+
+    Keeps only the columns history needs. `id` is the archive's own key:
+    SQLite reuses `Alert` ids once the newest alerts are archived, so the
+    original id, kept in `alert_id`, is not unique here.
+    """
+
+    __table_args__ = (
+        Index("ix_alertarchive_sensor_created", "sensor_id", "created_at"),
+        Index("ix_alertarchive_created_id", "created_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    alert_id: Optional[int] = None
+    sensor_id: int = Field(foreign_key="sensor.id")
+    message: str
+    level: str
+    created_at: datetime.datetime
+    archived_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+
+
+class CompositeRule(SQLModel, table=True):
+    """Alert rule combining the latest readings of several sensors in a parcel.
+
+    `conditions` is a list of `{"sensor_id" | "sensor_type", "op", "value"}`
+    objects that must all hold for `duration_s` seconds.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    parcel_id: int = Field(foreign_key="parcel.id", index=True)
+    name: str
+    conditions: list[dict] = Field(
+        default_factory=list, sa_column=sqlalchemy.Column(sqlalchemy.JSON)
+    )
+    duration_s: int = 0
+    is_enabled: bool = True
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
-    sensor: Optional[Sensor] = Relationship(back_populates="alerts")
\ No newline at end of file
+
+
+# Statements filling a column `ensure_schema` just added to an existing table.
+_BACKFILLS = {
+    # Archives made before `alert_id` existed kept the alert id as their key.
+    ("alertarchive", "alert_id"): "UPDATE alertarchive SET alert_id = id",
+}
+
+
+# Indexes replaced by a differently named one, dropped by `ensure_schema`.
+_RETIRED_INDEXES = {
+    # Led by sensor_id, it competed with ix_alert_open_sensor for open alerts.
+    "alert": ("ix_alert_active_sensor",),
+}
+
+
+def _add_column(conn, table, column) -> None:
+    """`ALTER TABLE ... ADD COLUMN`, using the model's scalar default if it has one."""
+    quote = conn.dialect.identifier_preparer.quote
+    ddl = (
+        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+        f"{column.type.compile(dialect=conn.dialect)}"
+    )
+    default = column.default
+    if default is not None and default.is_scalar and default.arg is not None:
+        literal = sqlalchemy.literal(default.arg, column.type).compile(
+            dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+        )
+        ddl += f" DEFAULT {literal}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+    conn.execute(sqlalchemy.text(ddl))
+
+
+def ensure_schema(engine) -> None:
+    """Bring an existing database up to date with the models.
+
+    `create_all` only creates missing tables, so columns and indexes declared
+    on tables that already exist are added here as well. New columns on
+    existing tables must be nullable or have a scalar default.
+    """
+    SQLModel.metadata.create_all(engine)
+    inspector = sqlalchemy.inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    _add_column(conn, table, column)
+                    backfill = _BACKFILLS.get((table.name, column.name))
+                    if backfill:
+                        conn.execute(sqlalchemy.text(backfill))
+            existing = {i["name"] for i in inspector.get_indexes(table.name)}
+            for name in _RETIRED_INDEXES.get(table.name, ()):
+                if name in existing:
+                    conn.execute(sqlalchemy.text(f"DROP INDEX {name}"))
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
@@ -0,0 +1,154 @@
+import csv
+import datetime
+import io
+import reflex as rx
+from typing import Iterator, Optional
+from sqlmodel import select
+from app.database import SensorData
+
+EXPORT_BATCH_SIZE = 10000
+
+
+def iter_reading_batches(
+    sensor_ids: list[int],
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[list]:
+    """Stream raw readings in timestamp order, `batch_size` rows at a time.
+
+    Uses a server-side cursor (`stream_results`) so only one batch is held in
+    memory regardless of how many rows match. Opens its own session because
+    it outlives the request's dependency-managed one when used for streaming.
+
+    Yields:
+        list: Rows of (timestamp, sensor_id, value).
+    """
+    filters = [SensorData.sensor_id.in_(sensor_ids)]
+    if start is not None:
+        filters.append(SensorData.timestamp >= start)
+    if end is not None:
+        filters.append(SensorData.timestamp < end)
+    query = (
+        select(SensorData.timestamp, SensorData.sensor_id, SensorData.value)
+        .where(*filters)
+        .order_by(SensorData.timestamp, SensorData.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    with rx.session() as session:
+        for batch in session.exec(query).partitions(batch_size):
+            yield batch
+
+
+def iter_csv_chunks(
+    sensor_ids: list[int],
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Iterator[bytes]:
+    """Encode readings as CSV, one chunk per batch, starting with the header."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["timestamp", "sensor_id", "value"])
+    yield buffer.getvalue().encode("utf-8")
+    for batch in iter_reading_batches(sensor_ids, start, end):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((ts.isoformat(), s_id, value) for ts, s_id, value in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since last drain.
+
+    Lets pyarrow writers stream into a response generator instead of a file.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("timestamp", pa.timestamp("us")),
+            ("sensor_id", pa.int64()),
+            ("value", pa.float64()),
+        ]
+    )
+
+
+def _to_record_batch(batch: list, schema):
+    import pyarrow as pa
+
+    timestamps, sensor_ids, values = zip(*batch)
+    return pa.record_batch(
+        [
+            pa.array(timestamps, type=schema.field("timestamp").type),
+            pa.array(sensor_ids, type=schema.field("sensor_id").type),
+            pa.array(values, type=schema.field("value").type),
+        ],
+        schema=schema,
+    )
+
+
+def iter_arrow_chunks(
+    sensor_ids: list[int],
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Iterator[bytes]:
+    """Encode readings as an Arrow IPC stream, one record batch per cursor batch."""
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for batch in iter_reading_batches(sensor_ids, start, end):
+            writer.write_batch(_to_record_batch(batch, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet_chunks(
+    sensor_ids: list[int],
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Iterator[bytes]:
+    """Encode readings as Parquet, writing one row group per cursor batch.
+
+    The footer is only known at the end, but every completed row group is
+    sent as soon as it is written.
+    """
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in iter_reading_batches(sensor_ids, start, end):
+            writer.write_batch(_to_record_batch(batch, schema))
+            yield sink.drain()
+    yield sink.drain()
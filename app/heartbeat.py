@@ -0,0 +1,134 @@
+import asyncio
+import datetime
+import logging
+import reflex as rx
+from sqlalchemy import insert, update
+from sqlmodel import select
+from app.database import Alert, Parcel, Sensor
+from app.notifications import AlertNotice, notifier
+
+HEARTBEAT_GRACE = 2.0
+SWEEP_INTERVAL_SECONDS = 30
+SWEEP_BATCH_SIZE = 5000
+
+
+def next_due(timestamp: datetime.datetime, interval_s: int) -> datetime.datetime:
+    """When a sensor that reported at `timestamp` counts as missing."""
+    return timestamp + datetime.timedelta(seconds=interval_s * HEARTBEAT_GRACE)
+
+
+def seed_due_times(session) -> int:
+    """Give active sensors without a due time one based on their last reading.
+
+    Covers sensors created before heartbeats were tracked. Sensors that never
+    reported are due one grace period from now.
+    """
+    now = datetime.datetime.utcnow()
+    rows = session.exec(
+        select(Sensor.id, Sensor.last_reading_time, Sensor.expected_interval_s).where(
+            Sensor.next_due_at == None, Sensor.status != "offline"
+        )
+    ).all()
+    if rows:
+        session.execute(
+            update(Sensor),
+            [
+                {"id": s_id, "next_due_at": next_due(last or now, interval)}
+                for s_id, last, interval in rows
+            ],
+        )
+        session.commit()
+    return len(rows)
+
+
+def sweep_overdue(session, now: datetime.datetime) -> list[int]:
+    """Mark sensors whose next reading is overdue as offline and alert on them.
+
+    `Sensor.next_due_at` is indexed and cleared once a sensor goes offline, so
+    the sweep is a range scan over just the overdue sensors, however many
+    sensors there are. Ingest sets a new due time on every reading.
+
+    Returns:
+        list[int]: Ids of the sensors marked offline.
+    """
+    candidates = session.exec(
+        select(Sensor.id)
+        .where(Sensor.next_due_at < now)
+        .order_by(Sensor.next_due_at)
+        .limit(SWEEP_BATCH_SIZE)
+    ).all()
+    if not candidates:
+        return []
+    # Re-checking the due time skips sensors that reported since the select.
+    sensor_ids = (
+        session.execute(
+            update(Sensor)
+            .where(Sensor.id.in_(candidates), Sensor.next_due_at < now)
+            .values(status="offline", next_due_at=None)
+            .returning(Sensor.id)
+            .execution_options(synchronize_session=False)
+        )
+        .scalars()
+        .all()
+    )
+    if not sensor_ids:
+        session.commit()
+        return []
+    message = "Sensor offline: no reading within its expected interval"
+    session.execute(
+        insert(Alert),
+        [
+            {
+                "sensor_id": s_id,
+                "message": message,
+                "level": "offline",
+                "is_active": True,
+                "acknowledged": False,
+                "created_at": now,
+            }
+            for s_id in sensor_ids
+        ],
+    )
+    owners = session.exec(
+        select(Sensor.id, Parcel.farmer_id)
+        .join(Parcel)
+        .where(Sensor.id.in_(sensor_ids))
+    ).all()
+    session.commit()
+    by_owner: dict[int, list[AlertNotice]] = {}
+    for s_id, owner_id in owners:
+        by_owner.setdefault(owner_id, []).append(
+            AlertNotice(s_id, "offline", message, now)
+        )
+    for owner_id, notices in by_owner.items():
+        notifier.publish(owner_id, notices)
+    return list(sensor_ids)
+
+
+def _seed() -> int:
+    with rx.session() as session:
+        return seed_due_times(session)
+
+
+def _sweep() -> int:
+    with rx.session() as session:
+        total = 0
+        while True:
+            now = datetime.datetime.utcnow()
+            marked = sweep_overdue(session, now)
+            total += len(marked)
+            if not marked:
+                return total
+
+
+async def heartbeat_sweeper():
+    """Lifespan task: periodically mark silent sensors offline."""
+    await asyncio.to_thread(_seed)
+    while True:
+        try:
+            marked = await asyncio.to_thread(_sweep)
+            if marked:
+                logging.info(f"Heartbeat sweep marked {marked} sensors offline")
+        except Exception as e:
+            logging.exception(f"Heartbeat sweep failed: {e}")
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,187 @@
+import asyncio
+import dataclasses
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its job has been cancelled."""
+
+
+class JobQueueFull(Exception):
+    """Raised by `JobRunner.submit` when too many jobs are already waiting."""
+
+
+@dataclasses.dataclass
+class Job:
+    """A unit of work executed by the `JobRunner` thread pool.
+
+    Job functions receive the job as their first argument and call
+    `report(fraction)` to publish progress; `report` raises `JobCancelled`
+    once the job has been cancelled, which stops the work at the next
+    checkpoint.
+    """
+
+    id: str
+    key: Optional[Hashable] = None
+    status: str = "queued"
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+    _waiters: set = dataclasses.field(default_factory=set, repr=False)
+    _cancel_event: threading.Event = dataclasses.field(
+        default_factory=threading.Event, repr=False
+    )
+    _future: Optional[Future] = dataclasses.field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report(self, progress: float):
+        """Publish progress (0.0-1.0) and stop if the job was cancelled."""
+        self.progress = max(0.0, min(1.0, progress))
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.id)
+
+
+class JobRunner:
+    """Bounded thread pool for long-running work triggered from event handlers.
+
+    Event handlers submit work and poll the returned `Job` from a background
+    event, so the client's event queue stays free while the job runs.
+    Finished jobs submitted with a `key` are kept for `result_ttl` seconds and
+    returned as-is to later submissions with the same key.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queued: int = 64,
+        result_ttl: float = 30.0,
+    ):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="agrotech-job"
+        )
+        self._jobs: dict[str, Job] = {}
+        self._by_key: dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        key: Optional[Hashable] = None,
+        submitter: Optional[Hashable] = None,
+        **kwargs,
+    ) -> Job:
+        """Queue `fn(job, *args, **kwargs)` and return its job.
+
+        If a job with the same key is still running, or finished successfully
+        within the result TTL, that job is returned instead of starting a new
+        one. `submitter` identifies the caller for `cancel`; callers that
+        share keyed jobs should pass a value unique to them.
+        """
+        submitter = submitter if submitter is not None else uuid.uuid4().hex
+        with self._lock:
+            self._prune()
+            if key is not None:
+                existing = self._jobs.get(self._by_key.get(key, ""))
+                if (
+                    existing
+                    and not existing.cancelled
+                    and existing.status not in ("failed", "cancelled")
+                ):
+                    if not existing.done:
+                        existing._waiters.add(submitter)
+                    return existing
+            queued = sum(1 for j in self._jobs.values() if j.status == "queued")
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs already waiting")
+            job = Job(id=uuid.uuid4().hex, key=key, _waiters={submitter})
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+            job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str, submitter: Optional[Hashable] = None) -> bool:
+        """Request cancellation; queued jobs never start, running ones stop at
+        their next `report` call.
+
+        A keyed job shared by several submitters is only cancelled once every
+        one of them has cancelled it; cancelling twice for the same submitter
+        is a no-op. Without `submitter` the job is cancelled outright.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.done:
+                return False
+            if submitter is None:
+                job._waiters.clear()
+            else:
+                job._waiters.discard(submitter)
+            if job._waiters:
+                return False
+        job._cancel_event.set()
+        if job._future and job._future.cancel():
+            self._finish(job, "cancelled")
+        return True
+
+    async def wait(self, job: Job, poll_interval: float = 0.2) -> Job:
+        """Wait for a job to finish from async code without blocking the loop."""
+        while not job.done:
+            await asyncio.sleep(poll_interval)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict):
+        if job.cancelled:
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        try:
+            job.result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            logging.exception(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            self._finish(job, "failed")
+        else:
+            job.progress = 1.0
+            self._finish(job, "done")
+
+    def _finish(self, job: Job, status: str):
+        job.finished_at = time.monotonic()
+        job.status = status
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL."""
+        cutoff = time.monotonic() - self.result_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.done and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if job.key is not None and self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+
+job_runner = JobRunner()
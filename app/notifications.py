@@ -0,0 +1,370 @@
+import abc
+import asyncio
+import dataclasses
+import datetime
+import ipaddress
+import logging
+import os
+import random
+import smtplib
+import socket
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+import reflex as rx
+import requests
+from app.database import User
+
+NOTIFY_WINDOW_S = float(os.environ.get("NOTIFY_WINDOW_S", "60"))
+NOTIFY_QUEUE_SIZE = 10000
+NOTIFY_MAX_ATTEMPTS = 5
+NOTIFY_BACKOFF_S = 2.0
+NOTIFY_BACKOFF_MAX_S = 300.0
+FLUSH_TICK_S = 1.0
+SMTP_HOST = os.environ.get("SMTP_HOST", "")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "25"))
+SMTP_SENDER = os.environ.get("SMTP_SENDER", "alerts@agrotech.local")
+EMAIL_RATE_PER_MINUTE = float(os.environ.get("EMAIL_RATE_PER_MINUTE", "30"))
+WEBHOOK_RATE_PER_MINUTE = float(os.environ.get("WEBHOOK_RATE_PER_MINUTE", "120"))
+# Client errors worth retrying; any other 4xx answer drops the batch.
+WEBHOOK_RETRY_STATUSES = (408, 429)
+# Hosts that may receive webhooks even though they resolve to a loopback,
+# link-local or private address, e.g. an on-premise alert relay.
+WEBHOOK_ALLOWED_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.environ.get("WEBHOOK_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class AlertNotice:
+    """What a notification says about one new alert."""
+
+    sensor_id: int
+    level: str
+    message: str
+    created_at: datetime.datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "sensor_id": self.sensor_id,
+            "level": self.level,
+            "message": self.message,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Recipient:
+    user_id: int
+    username: str
+    email: Optional[str]
+    webhook_url: Optional[str]
+
+
+class RateLimiter:
+    """Token bucket allowing `rate_per_minute` sends, in bursts of up to `burst`."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 5):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class PermanentDeliveryError(Exception):
+    """A delivery that can't succeed on retry, e.g. a refused URL or a 4xx."""
+
+
+def webhook_url_error(
+    url: str, allowed_hosts: frozenset[str] = WEBHOOK_ALLOWED_HOSTS
+) -> Optional[str]:
+    """Why `url` can't be used as a webhook, or None if it can.
+
+    Resolves the host, so call it off the event loop. Hosts resolving to
+    loopback, link-local, private or otherwise non-public addresses are
+    refused unless listed in `allowed_hosts`, so a webhook can't be used to
+    reach services inside the server's network.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return "Webhook URL must start with http:// or https://"
+    host = (parts.hostname or "").lower()
+    if not host:
+        return "Webhook URL must include a host"
+    if host in allowed_hosts:
+        return None
+    try:
+        infos = socket.getaddrinfo(host, parts.port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError, ValueError):
+        return f"Webhook host {host} could not be resolved"
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            return f"Webhook host {host} is not a public address"
+    return None
+
+
+class Sink(abc.ABC):
+    """A notification channel. Subclasses pick the address and deliver a batch."""
+
+    name = "sink"
+
+    def __init__(self, rate_per_minute: float):
+        self.limiter = RateLimiter(rate_per_minute)
+
+    @abc.abstractmethod
+    def address(self, recipient: Recipient) -> Optional[str]:
+        """Where this channel reaches the recipient, or None to skip them."""
+
+    @abc.abstractmethod
+    async def send(
+        self, address: str, recipient: Recipient, notices: list[AlertNotice]
+    ):
+        """Deliver the batch; raise to have it retried.
+
+        Raise `PermanentDeliveryError` when retrying can't help.
+        """
+
+
+class WebhookSink(Sink):
+    """POSTs the batch as JSON to the user's webhook URL.
+
+    Internal hosts are refused unless listed in `allowed_hosts`.
+    """
+
+    name = "webhook"
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        allowed_hosts: frozenset[str] = WEBHOOK_ALLOWED_HOSTS,
+    ):
+        super().__init__(rate_per_minute)
+        self.allowed_hosts = frozenset(host.lower() for host in allowed_hosts)
+
+    def address(self, recipient: Recipient) -> Optional[str]:
+        return recipient.webhook_url
+
+    async def send(
+        self, address: str, recipient: Recipient, notices: list[AlertNotice]
+    ):
+        error = await asyncio.to_thread(
+            webhook_url_error, address, self.allowed_hosts
+        )
+        if error:
+            raise PermanentDeliveryError(error)
+        body = {
+            "user_id": recipient.user_id,
+            "alerts": [notice.to_dict() for notice in notices],
+        }
+        response = await asyncio.to_thread(
+            requests.post, address, json=body, timeout=10, allow_redirects=False
+        )
+        status = response.status_code
+        if 400 <= status < 500 and status not in WEBHOOK_RETRY_STATUSES:
+            raise PermanentDeliveryError(f"Webhook answered {status} {response.reason}")
+        response.raise_for_status()
+
+
+class SmtpSink(Sink):
+    """Emails the batch to the user's address; disabled without an SMTP host."""
+
+    name = "email"
+
+    def __init__(self, host: str, port: int, sender: str, rate_per_minute: float):
+        super().__init__(rate_per_minute)
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def address(self, recipient: Recipient) -> Optional[str]:
+        return recipient.email if self.host else None
+
+    async def send(
+        self, address: str, recipient: Recipient, notices: list[AlertNotice]
+    ):
+        message = EmailMessage()
+        noun = "alert" if len(notices) == 1 else "alerts"
+        message["Subject"] = f"[Agrotech] {len(notices)} new {noun}"
+        message["From"] = self.sender
+        message["To"] = address
+        message.set_content(
+            f"Hello {recipient.username},\n\n"
+            + "\n".join(
+                f"{n.created_at:%Y-%m-%d %H:%M} [{n.level}] sensor {n.sensor_id}: "
+                f"{n.message}"
+                for n in notices
+            )
+            + "\n"
+        )
+        await asyncio.to_thread(self._deliver, message)
+
+    def _deliver(self, message: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+
+def load_recipient(user_id: int) -> Optional[Recipient]:
+    """The user's channels, or None if they turned notifications off."""
+    with rx.session() as session:
+        user = session.get(User, user_id)
+        if not user or not user.notifications_enabled:
+            return None
+        return Recipient(user.id, user.username, user.email, user.webhook_url)
+
+
+class NotificationDispatcher:
+    """Fans new alerts out to every sink, batched per user and time window.
+
+    `publish` only appends to an in-memory inbox, so alert producers such as
+    ingest never wait on a mail server or webhook. The `run` loop groups
+    notices per user, flushes a user's batch `window_s` after its first
+    notice, and delivers it to each sink in its own task, retrying with
+    exponential backoff and jitter under the sink's rate limit. A notice
+    counts against `max_queue` from `publish` until every sink has finished
+    with its batch, retries included; further notices are dropped, with a
+    warning, while `max_queue` are pending.
+    """
+
+    def __init__(
+        self,
+        sinks: list[Sink],
+        window_s: float = NOTIFY_WINDOW_S,
+        max_queue: int = NOTIFY_QUEUE_SIZE,
+        recipient_loader: Callable[[int], Optional[Recipient]] = load_recipient,
+    ):
+        self.sinks = sinks
+        self.window_s = window_s
+        self.max_queue = max_queue
+        self.recipient_loader = recipient_loader
+        self._inbox: deque[tuple[int, list[AlertNotice]]] = deque()
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._batches: dict[int, tuple[float, list[AlertNotice]]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def publish(self, user_id: int, notices: list[AlertNotice]):
+        """Queue notices for a user; safe to call from any thread, never blocks."""
+        if not notices:
+            return
+        with self._lock:
+            if self._queued + len(notices) > self.max_queue:
+                logging.warning(f"Notification queue full, dropped {len(notices)}")
+                return
+            self._queued += len(notices)
+            self._inbox.append((user_id, list(notices)))
+
+    def _collect(self, now: float):
+        with self._lock:
+            items, self._inbox = self._inbox, deque()
+        for user_id, notices in items:
+            self._batches.setdefault(user_id, (now, []))[1].extend(notices)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, force: bool = False):
+        """Dispatch the batches whose window has passed, or all of them."""
+        now = time.monotonic()
+        self._collect(now)
+        due = [
+            user_id
+            for user_id, (opened, _) in self._batches.items()
+            if force or now - opened >= self.window_s
+        ]
+        for user_id in due:
+            _, notices = self._batches.pop(user_id)
+            self._spawn(self._deliver(user_id, notices))
+
+    async def drain(self):
+        """Flush everything and wait for deliveries, retries included."""
+        await self.flush(force=True)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def _deliver(self, user_id: int, notices: list[AlertNotice]):
+        try:
+            recipient = await asyncio.to_thread(self.recipient_loader, user_id)
+            if recipient is None:
+                return
+            sends = []
+            for sink in self.sinks:
+                address = sink.address(recipient)
+                if address:
+                    sends.append(
+                        self._send_with_retry(sink, address, recipient, notices)
+                    )
+            await asyncio.gather(*sends)
+        finally:
+            with self._lock:
+                self._queued -= len(notices)
+
+    async def _send_with_retry(
+        self, sink: Sink, address: str, recipient: Recipient, notices: list[AlertNotice]
+    ):
+        for attempt in range(1, NOTIFY_MAX_ATTEMPTS + 1):
+            await sink.limiter.acquire()
+            try:
+                await sink.send(address, recipient, notices)
+                return
+            except PermanentDeliveryError as e:
+                logging.error(
+                    f"Dropping {sink.name} notification to user "
+                    f"{recipient.user_id}: {e}"
+                )
+                return
+            except Exception as e:
+                if attempt == NOTIFY_MAX_ATTEMPTS:
+                    logging.error(
+                        f"Giving up {sink.name} notification to user "
+                        f"{recipient.user_id} after {attempt} attempts: {e}"
+                    )
+                    return
+                delay = min(NOTIFY_BACKOFF_S * 2 ** (attempt - 1), NOTIFY_BACKOFF_MAX_S)
+                delay *= random.uniform(0.5, 1.0)
+                logging.warning(
+                    f"{sink.name} notification failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def run(self):
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.exception(f"Notification flush failed: {e}")
+            await asyncio.sleep(min(FLUSH_TICK_S, self.window_s))
+
+
+notifier = NotificationDispatcher(
+    [
+        WebhookSink(WEBHOOK_RATE_PER_MINUTE),
+        SmtpSink(SMTP_HOST, SMTP_PORT, SMTP_SENDER, EMAIL_RATE_PER_MINUTE),
+    ]
+)
+
+
+async def notification_worker():
+    """Lifespan task: deliver queued alert notifications."""
+    await notifier.run()
@@ -1,21 +1,44 @@
 import reflex as rx
+from app.components.charts import TOOLTIP_PROPS, series_rows
 from app.states.alert_state import AlertState
 from app.states.auth_state import AuthState
 from app.components.navbar import navbar
 
 
+def alert_icon(icon: str, color: str, background: str) -> rx.Component:
+    return rx.el.div(
+        rx.icon(icon, class_name=f"h-6 w-6 {color}"),
+        class_name=f"p-3 rounded-full {background} mr-4",
+    )
+
+
 def alert_card(alert: dict, is_active: bool = True) -> rx.Component:
     return rx.el.div(
         rx.el.div(
-            rx.el.div(
-                rx.cond(
-                    alert["level"] == "critical",
-                    rx.icon("octagon_alert", class_name="h-6 w-6 text-red-500"),
-                    rx.icon(
-                        "flag_triangle_right", class_name="h-6 w-6 text-orange-500"
-                    ),
+            rx.cond(
+                is_active,
+                rx.el.input(
+                    type="checkbox",
+                    checked=AlertState.selected_ids.contains(alert["id"]),
+                    on_change=lambda c: AlertState.toggle_selected(alert["id"], c),
+                    class_name="rounded border-gray-300 text-blue-600 focus:ring-blue-500 h-4 w-4 mt-4 mr-4",
                 ),
-                class_name=f"p-3 rounded-full bg-{(alert['level'] == 'critical') & 'red' | 'orange'}-100 mr-4",
+            ),
+            rx.match(
+                alert["level"],
+                (
+                    "critical",
+                    alert_icon("octagon_alert", "text-red-500", "bg-red-100"),
+                ),
+                ("spike", alert_icon("zap", "text-purple-500", "bg-purple-100")),
+                ("drift", alert_icon("trending-up", "text-blue-500", "bg-blue-100")),
+                ("flatline", alert_icon("minus", "text-gray-500", "bg-gray-100")),
+                ("offline", alert_icon("wifi-off", "text-red-500", "bg-red-100")),
+                (
+                    "composite",
+                    alert_icon("git-merge", "text-indigo-500", "bg-indigo-100"),
+                ),
+                alert_icon("flag_triangle_right", "text-orange-500", "bg-orange-100"),
             ),
             rx.el.div(
                 rx.el.h4(
@@ -45,6 +68,22 @@ def alert_card(alert: dict, is_active: bool = True) -> rx.Component:
                         on_click=lambda: AlertState.resolve_alert(alert["id"]),
                         class_name="px-4 py-2 text-sm font-medium text-green-600 bg-green-50 rounded-lg hover:bg-green-100 transition-colors",
                     ),
+                    rx.el.button(
+                        "Resolve sensor",
+                        title="Resolve every open alert of this sensor",
+                        on_click=lambda: AlertState.resolve_sensor_alerts(
+                            alert["sensor_id"]
+                        ),
+                        class_name="px-3 py-2 text-xs font-medium text-gray-500 hover:text-gray-700 ml-2",
+                    ),
+                    rx.el.button(
+                        "Resolve parcel",
+                        title="Resolve every open alert in this parcel",
+                        on_click=lambda: AlertState.resolve_parcel_alerts(
+                            alert["parcel_id"]
+                        ),
+                        class_name="px-3 py-2 text-xs font-medium text-gray-500 hover:text-gray-700",
+                    ),
                     class_name="flex items-center",
                 ),
                 rx.el.span(
@@ -58,6 +97,156 @@ def alert_card(alert: dict, is_active: bool = True) -> rx.Component:
     )
 
 
+def bulk_actions() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            rx.cond(
+                AlertState.selected_count == AlertState.active_alerts.length(),
+                "Clear selection",
+                "Select all",
+            ),
+            on_click=AlertState.toggle_select_all,
+            class_name="px-3 py-2 text-sm font-medium text-gray-500 hover:text-gray-700",
+        ),
+        rx.cond(
+            AlertState.selected_count > 0,
+            rx.el.div(
+                rx.el.button(
+                    f"Acknowledge {AlertState.selected_count}",
+                    on_click=AlertState.acknowledge_selected,
+                    class_name="px-4 py-2 text-sm font-medium text-blue-600 bg-blue-50 rounded-lg hover:bg-blue-100 transition-colors mr-2",
+                ),
+                rx.el.button(
+                    f"Resolve {AlertState.selected_count}",
+                    on_click=AlertState.resolve_selected,
+                    class_name="px-4 py-2 text-sm font-medium text-green-600 bg-green-50 rounded-lg hover:bg-green-100 transition-colors",
+                ),
+                class_name="flex items-center",
+            ),
+            rx.el.div(
+                rx.el.button(
+                    "Acknowledge all",
+                    on_click=AlertState.acknowledge_all,
+                    class_name="px-4 py-2 text-sm font-medium text-blue-600 bg-blue-50 rounded-lg hover:bg-blue-100 transition-colors mr-2",
+                ),
+                rx.el.button(
+                    "Resolve all",
+                    on_click=AlertState.resolve_all,
+                    class_name="px-4 py-2 text-sm font-medium text-green-600 bg-green-50 rounded-lg hover:bg-green-100 transition-colors",
+                ),
+                class_name="flex items-center",
+            ),
+        ),
+        class_name="flex items-center gap-2",
+    )
+
+
+def history_filters() -> rx.Component:
+    return rx.el.div(
+        rx.el.select(
+            rx.el.option("All levels", value="all"),
+            rx.el.option("Warning", value="warning"),
+            rx.el.option("Critical", value="critical"),
+            rx.el.option("Spike", value="spike"),
+            rx.el.option("Drift", value="drift"),
+            rx.el.option("Flatline", value="flatline"),
+            rx.el.option("Offline", value="offline"),
+            rx.el.option("Composite", value="composite"),
+            value=AlertState.history_level,
+            on_change=AlertState.set_history_level,
+            class_name="text-sm border-gray-300 rounded-md shadow-sm focus:border-blue-500 focus:ring-blue-500",
+        ),
+        rx.el.select(
+            rx.el.option("All parcels", value="all"),
+            rx.foreach(
+                AlertState.parcel_options,
+                lambda p: rx.el.option(p["name"], value=p["id"]),
+            ),
+            value=AlertState.history_parcel,
+            on_change=AlertState.set_history_parcel,
+            class_name="text-sm border-gray-300 rounded-md shadow-sm focus:border-blue-500 focus:ring-blue-500",
+        ),
+        rx.el.input(
+            type="date",
+            default_value=AlertState.history_start,
+            on_change=AlertState.set_history_start,
+            class_name="text-sm border-gray-300 rounded-md shadow-sm focus:border-blue-500 focus:ring-blue-500",
+        ),
+        rx.el.span("to", class_name="text-sm text-gray-500"),
+        rx.el.input(
+            type="date",
+            default_value=AlertState.history_end,
+            on_change=AlertState.set_history_end,
+            class_name="text-sm border-gray-300 rounded-md shadow-sm focus:border-blue-500 focus:ring-blue-500",
+        ),
+        class_name="flex flex-wrap items-center gap-3 mb-4",
+    )
+
+
+def period_counts_chart() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h3(
+                "Alerts per period", class_name="text-sm font-semibold text-gray-700"
+            ),
+            rx.el.select(
+                rx.el.option("Day", value="day"),
+                rx.el.option("Week", value="week"),
+                rx.el.option("Month", value="month"),
+                value=AlertState.count_period,
+                on_change=AlertState.set_count_period,
+                class_name="text-sm border-gray-300 rounded-md shadow-sm focus:border-blue-500 focus:ring-blue-500",
+            ),
+            class_name="flex justify-between items-center mb-4",
+        ),
+        rx.recharts.bar_chart(
+            rx.recharts.cartesian_grid(
+                stroke_dasharray="3 3", vertical=False, class_name="stroke-gray-200"
+            ),
+            rx.recharts.graphing_tooltip(**TOOLTIP_PROPS),
+            rx.recharts.x_axis(
+                data_key="period",
+                axis_line=False,
+                tick_line=False,
+                tick={"fontSize": 12, "fill": "#6B7280"},
+            ),
+            rx.recharts.y_axis(
+                axis_line=False,
+                tick_line=False,
+                allow_decimals=False,
+                tick={"fontSize": 12, "fill": "#6B7280"},
+            ),
+            rx.recharts.bar(data_key="alerts", fill="#F97316", radius=[4, 4, 0, 0]),
+            data=series_rows(AlertState.period_counts),
+            height=180,
+            width="100%",
+        ),
+        class_name="bg-white p-6 rounded-xl border border-gray-200 shadow-sm mb-6",
+    )
+
+
+def history_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            rx.icon("chevron-left", class_name="h-4 w-4"),
+            on_click=AlertState.prev_history_page,
+            disabled=AlertState.history_page <= 1,
+            class_name="p-2 text-gray-600 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-40",
+        ),
+        rx.el.span(
+            f"Page {AlertState.history_page}",
+            class_name="text-sm text-gray-700 mx-3",
+        ),
+        rx.el.button(
+            rx.icon("chevron-right", class_name="h-4 w-4"),
+            on_click=AlertState.next_history_page,
+            disabled=~AlertState.history_has_more,
+            class_name="p-2 text-gray-600 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-40",
+        ),
+        class_name="flex justify-end items-center mt-6",
+    )
+
+
 def alerts_page() -> rx.Component:
     return rx.el.div(
         navbar(),
@@ -73,9 +262,16 @@ def alerts_page() -> rx.Component:
                 class_name="mb-8",
             ),
             rx.el.div(
-                rx.el.h2(
-                    "Active Alerts",
-                    class_name="text-xl font-bold text-gray-800 mb-4 flex items-center gap-2",
+                rx.el.div(
+                    rx.el.h2(
+                        "Active Alerts",
+                        class_name="text-xl font-bold text-gray-800 flex items-center gap-2",
+                    ),
+                    rx.cond(
+                        AlertState.active_alerts,
+                        bulk_actions(),
+                    ),
+                    class_name="flex items-center justify-between mb-4",
                 ),
                 rx.cond(
                     AlertState.active_alerts,
@@ -102,6 +298,8 @@ def alerts_page() -> rx.Component:
                 rx.el.h2(
                     "Alert History", class_name="text-xl font-bold text-gray-800 mb-4"
                 ),
+                history_filters(),
+                period_counts_chart(),
                 rx.cond(
                     AlertState.alert_history,
                     rx.el.div(
@@ -114,6 +312,7 @@ def alerts_page() -> rx.Component:
                         "No alert history found.", class_name="text-gray-500 italic"
                     ),
                 ),
+                history_pagination(),
             ),
             class_name="max-w-5xl mx-auto px-4 sm:px-6 lg:px-8 py-8",
         ),
@@ -1,6 +1,7 @@
 import reflex as rx
 from app.states.analytics_state import AnalyticsState
 from app.components.navbar import navbar
+from app.components.charts import series_rows
 
 
 def sidebar_sensor_select() -> rx.Component:
@@ -99,12 +100,46 @@ def controls_bar() -> rx.Component:
                     rx.el.option("Raw Data", value="raw"),
                     rx.el.option("Hourly Avg", value="hour"),
                     rx.el.option("Daily Avg", value="day"),
+                    rx.el.option("Hourly Bands", value="hour_bands"),
+                    rx.el.option("Daily Bands", value="day_bands"),
                     value=AnalyticsState.aggregation,
                     on_change=AnalyticsState.set_aggregation_val,
                     class_name="block w-32 rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
                 ),
                 class_name="mr-4",
             ),
+            rx.el.div(
+                rx.el.label(
+                    "Operator",
+                    class_name="block text-xs font-medium text-gray-700 mb-1",
+                ),
+                rx.el.select(
+                    rx.el.option("None", value="none"),
+                    rx.el.option("Moving Avg (12 pts)", value="moving_avg"),
+                    rx.el.option("Exp. Weighted Avg", value="ewma"),
+                    rx.el.option("Rate of Change (/h)", value="derivative"),
+                    rx.el.option("Growing Degree Days", value="gdd"),
+                    value=AnalyticsState.operator,
+                    on_change=AnalyticsState.set_operator_val,
+                    class_name="block w-44 rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
+                ),
+                class_name="mr-4",
+            ),
+            rx.el.div(
+                rx.el.label(
+                    "Gaps",
+                    class_name="block text-xs font-medium text-gray-700 mb-1",
+                ),
+                rx.el.select(
+                    rx.el.option("Leave Empty", value="none"),
+                    rx.el.option("Forward Fill", value="ffill"),
+                    rx.el.option("Interpolate", value="linear"),
+                    value=AnalyticsState.gap_fill,
+                    on_change=AnalyticsState.set_gap_fill_val,
+                    class_name="block w-32 rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
+                ),
+                class_name="mr-4",
+            ),
             rx.el.div(
                 rx.el.label(
                     "Chart Type",
@@ -180,7 +215,7 @@ TOOLTIP_PROPS = {
 def custom_legend() -> rx.Component:
     return rx.el.div(
         rx.foreach(
-            AnalyticsState.current_sensors_legend,
+            AnalyticsState.chart_legend,
             lambda item: rx.el.div(
                 rx.el.span(
                     class_name="w-3 h-3 rounded-full mr-2",
@@ -190,21 +225,58 @@ def custom_legend() -> rx.Component:
                 class_name="flex items-center mr-6",
             ),
         ),
+        rx.cond(
+            AnalyticsState.chart_is_truncated,
+            rx.el.span(
+                "Only the first 5 sensors are drawn; all are used for the tables below.",
+                class_name="text-xs text-gray-400",
+            ),
+        ),
         class_name="flex flex-wrap items-center justify-center mt-4 px-4",
     )
 
 
+def band_lines(key: str, label: str, dash: str, opacity: float) -> rx.Component:
+    """Thin percentile or extreme lines drawn around each median in band mode."""
+    return rx.cond(
+        AnalyticsState.is_band_mode,
+        rx.foreach(
+            AnalyticsState.chart_legend,
+            lambda item: rx.recharts.line(
+                data_key=item[key],
+                stroke=item["color"],
+                stroke_width=1,
+                stroke_dasharray=dash,
+                stroke_opacity=opacity,
+                dot=False,
+                type_="monotone",
+                connect_nulls=True,
+                name=f"{item['name']} {label}",
+                legend_type="none",
+            ),
+        ),
+    )
+
+
 def analytics_chart() -> rx.Component:
     return rx.el.div(
         rx.cond(
             AnalyticsState.is_loading,
             rx.el.div(
                 rx.spinner(size="3"),
-                rx.el.p("Loading data...", class_name="text-gray-500 mt-4"),
+                rx.el.p(
+                    f"Loading data... {AnalyticsState.job_progress}%",
+                    class_name="text-gray-500 mt-4",
+                ),
+                rx.el.button(
+                    "Cancel",
+                    on_click=AnalyticsState.cancel_fetch,
+                    class_name="mt-3 px-3 py-1.5 text-sm font-medium text-gray-600 bg-gray-100 rounded-md hover:bg-gray-200",
+                ),
                 class_name="flex flex-col items-center justify-center h-[400px]",
             ),
             rx.cond(
-                AnalyticsState.chart_data,
+                AnalyticsState.has_chart_data,
                 rx.el.div(
                     rx.recharts.composed_chart(
                         rx.recharts.cartesian_grid(
@@ -227,7 +299,7 @@ def analytics_chart() -> rx.Component:
                             dx=-10,
                         ),
                         rx.foreach(
-                            AnalyticsState.current_sensors_legend,
+                            AnalyticsState.chart_legend,
                             lambda item: rx.match(
                                 AnalyticsState.chart_type,
                                 (
@@ -238,6 +310,7 @@ def analytics_chart() -> rx.Component:
                                         stroke_width=2,
                                         dot=False,
                                         type_="monotone",
+                                        connect_nulls=True,
                                         name=item["name"],
                                     ),
                                 ),
@@ -249,6 +322,7 @@ def analytics_chart() -> rx.Component:
                                         fill=item["color"],
                                         fill_opacity=0.2,
                                         type_="monotone",
+                                        connect_nulls=True,
                                         name=item["name"],
                                     ),
                                 ),
@@ -266,7 +340,11 @@ def analytics_chart() -> rx.Component:
                                 ),
                             ),
                         ),
-                        data=AnalyticsState.chart_data,
+                        band_lines("min_key", "min", "2 4", 0.4),
+                        band_lines("p10_key", "p10", "6 3", 0.7),
+                        band_lines("p90_key", "p90", "6 3", 0.7),
+                        band_lines("max_key", "max", "2 4", 0.4),
+                        data=series_rows(AnalyticsState.chart_series),
                         height=400,
                         width="100%",
                     ),
@@ -374,6 +452,98 @@ def stats_table() -> rx.Component:
     )
 
 
+def correlation_table() -> rx.Component:
+    return rx.cond(
+        AnalyticsState.correlations.length() > 0,
+        rx.el.div(
+            rx.el.h3(
+                "Sensor Correlations",
+                class_name="text-lg font-semibold text-gray-900 mb-1",
+            ),
+            rx.el.p(
+                "Strongest pairs first. Lag is how far the second sensor trails the first.",
+                class_name="text-sm text-gray-500 mb-4",
+            ),
+            rx.el.div(
+                rx.el.table(
+                    rx.el.thead(
+                        rx.el.tr(
+                            rx.el.th(
+                                "Sensor A",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.th(
+                                "Sensor B",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.th(
+                                "Pearson",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.th(
+                                "Spearman",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.th(
+                                "Best Lag",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.th(
+                                "Lagged r",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.th(
+                                "Overlap",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
+                        ),
+                        class_name="bg-gray-50",
+                    ),
+                    rx.el.tbody(
+                        rx.foreach(
+                            AnalyticsState.correlations,
+                            lambda pair: rx.el.tr(
+                                rx.el.td(
+                                    pair["a"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900",
+                                ),
+                                rx.el.td(
+                                    pair["b"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900",
+                                ),
+                                rx.el.td(
+                                    pair["pearson"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm font-bold text-gray-900",
+                                ),
+                                rx.el.td(
+                                    pair["spearman"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-900",
+                                ),
+                                rx.el.td(
+                                    pair["lag"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+                                ),
+                                rx.el.td(
+                                    pair["lag_r"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-900",
+                                ),
+                                rx.el.td(
+                                    pair["overlap"],
+                                    class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+                                ),
+                            ),
+                        ),
+                        class_name="bg-white divide-y divide-gray-200",
+                    ),
+                    class_name="min-w-full divide-y divide-gray-200",
+                ),
+                class_name="overflow-x-auto border border-gray-200 rounded-lg",
+            ),
+            class_name="bg-white p-6 rounded-xl border border-gray-200 shadow-sm mt-6",
+        ),
+    )
+
+
 def analytics_page() -> rx.Component:
     return rx.el.div(
         navbar(),
@@ -392,6 +562,7 @@ def analytics_page() -> rx.Component:
                     controls_bar(),
                     analytics_chart(),
                     stats_table(),
+                    correlation_table(),
                     class_name="flex-1 min-w-0",
                 ),
                 class_name="flex flex-col md:flex-row gap-8",
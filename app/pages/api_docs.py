@@ -119,6 +119,21 @@ def api_docs_page() -> rx.Component:
                         """{
   "status": "success",
   "alert_triggered": false
+}""",
+                    ),
+                    endpoint_doc(
+                        "POST",
+                        "/api/sensors/data/batch",
+                        "Ingest up to 5000 readings from any of your sensors in one request, stored in a single transaction. Readings for unknown sensors are rejected and counted; the rest are checked against alert rules as usual.",
+                        """[
+  {"sensor_id": 5, "value": 25.4, "timestamp": "2023-10-27T10:00:00Z"},
+  {"sensor_id": 6, "value": 41.0}
+]""",
+                        """{
+  "status": "success",
+  "accepted": 2,
+  "rejected": 0,
+  "alerts": 0
 }""",
                     ),
                     endpoint_doc(
@@ -150,6 +165,76 @@ def api_docs_page() -> rx.Component:
   }
 ]""",
                     ),
+                    endpoint_doc(
+                        "POST",
+                        "/api/parcels/{id}/rules",
+                        "Create a composite alert rule. An alert is raised when every condition holds for duration_s seconds and resolves when one stops holding. Conditions target a sensor_id of the parcel or a sensor_type (any sensor of that type). List rules with GET and remove them with DELETE /api/parcels/{id}/rules/{rule_id}.",
+                        """{
+  "name": "Heat stress",
+  "conditions": [
+    {"sensor_type": "soil_humidity", "op": "<", "value": 30},
+    {"sensor_type": "temperature", "op": ">", "value": 32}
+  ],
+  "duration_s": 1200
+}""",
+                        """{
+  "id": 3,
+  "name": "Heat stress",
+  "conditions": [...],
+  "duration_s": 1200,
+  "is_enabled": true
+}""",
+                    ),
+                    endpoint_doc(
+                        "POST",
+                        "/api/alerts/bulk",
+                        "Acknowledge or resolve open alerts in one request. action is acknowledge or resolve; the optional filters alert_ids, sensor_id, parcel_id, level and before (created at or before) combine, and omitting them all affects every open alert you own.",
+                        """{
+  "action": "resolve",
+  "parcel_id": 1,
+  "level": "warning"
+}""",
+                        """{
+  "status": "success",
+  "updated": 42,
+  "alert_ids": [101, 102, ...]
+}""",
+                    ),
+                    endpoint_doc(
+                        "GET",
+                        "/api/alerts/history?level=warning&parcel_id=1&start=...&end=...",
+                        "Page through acknowledged, resolved and archived alerts, newest first. Pass next_before and next_before_id back as before and before_id for the next page. GET /api/alerts/counts?period=day|week|month takes the same filters and returns alert counts per period.",
+                        "",
+                        """{
+  "alerts": [
+    {
+      "id": 812,
+      "sensor": "Temp Sensor 1",
+      "parcel": "North Field",
+      "level": "warning",
+      "created_at": "2024-05-20T10:30:00",
+      "status": "Resolved",
+      ...
+    }
+  ],
+  "next_before": "2024-05-18T07:15:00",
+  "next_before_id": 640
+}""",
+                    ),
+                    endpoint_doc(
+                        "GET",
+                        "/api/export/readings.csv?sensor_ids=1,2&start=...&end=...",
+                        "Stream raw readings as CSV. All parameters are optional; without sensor_ids every sensor you own is exported. Large ranges are streamed, so downloads start immediately.",
+                        "",
+                        """timestamp,sensor_id,value
+2023-10-27T10:00:00,1,24.5
+2023-10-27T10:00:00,2,61.2""",
+                    ),
+                    endpoint_doc(
+                        "GET",
+                        "/api/export/readings.arrow | /api/export/readings.parquet",
+                        "Same parameters as the CSV export, returned as an Arrow IPC stream or a Parquet file with columns timestamp, sensor_id and value. Recommended for bulk reads, e.g. pyarrow.ipc.open_stream(...).read_all() or pandas.read_parquet(...).",
+                    ),
                     class_name="bg-white p-6 rounded-xl border border-gray-200 shadow-sm",
                 ),
                 class_name="w-full",
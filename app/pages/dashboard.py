@@ -194,6 +194,14 @@ def dashboard_page() -> rx.Component:
                                     class_name="bg-orange-100 text-orange-700 text-xs font-bold px-2 py-1 rounded-full ml-2",
                                 ),
                             ),
+                            rx.cond(
+                                DashboardState.active_alerts_count > 1,
+                                rx.el.button(
+                                    "Dismiss all",
+                                    on_click=DashboardState.acknowledge_all_alerts,
+                                    class_name="text-xs font-medium text-gray-400 hover:text-gray-600 ml-auto",
+                                ),
+                            ),
                             class_name="flex items-center p-6 border-b border-gray-200",
                         ),
                         rx.cond(
@@ -1,7 +1,8 @@
 import reflex as rx
 from app.states.parcel_state import ParcelState
 from app.components.navbar import navbar
-from app.database import Sensor
+from app.pages.parcels import delete_progress_banner
+from app.read_models import SensorView
 
 
 def get_sensor_icon(sensor_type: str):
@@ -16,7 +17,7 @@ def get_sensor_icon(sensor_type: str):
     )
 
 
-def sensor_card(sensor: Sensor) -> rx.Component:
+def sensor_card(sensor: SensorView) -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.div(
@@ -25,9 +26,16 @@ def sensor_card(sensor: Sensor) -> rx.Component:
                 rx.el.div(
                     rx.el.span(
                         sensor.status,
-                        class_name=rx.cond(
-                            sensor.status == "active",
-                            "bg-green-100 text-green-700 text-xs font-bold px-2 py-0.5 rounded-full uppercase",
+                        class_name=rx.match(
+                            sensor.status,
+                            (
+                                "active",
+                                "bg-green-100 text-green-700 text-xs font-bold px-2 py-0.5 rounded-full uppercase",
+                            ),
+                            (
+                                "offline",
+                                "bg-red-100 text-red-700 text-xs font-bold px-2 py-0.5 rounded-full uppercase",
+                            ),
                             "bg-gray-100 text-gray-700 text-xs font-bold px-2 py-0.5 rounded-full uppercase",
                         ),
                     ),
@@ -64,7 +72,7 @@ def sensor_card(sensor: Sensor) -> rx.Component:
             rx.el.div(
                 rx.el.button(
                     rx.icon("pencil", class_name="h-4 w-4"),
-                    on_click=ParcelState.open_edit_sensor_modal(sensor),
+                    on_click=ParcelState.open_edit_sensor_modal(sensor.id),
                     class_name="p-2 text-gray-400 hover:text-blue-600 transition-colors",
                 ),
                 rx.el.button(
@@ -165,7 +173,87 @@ def sensor_modal() -> rx.Component:
                             class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none",
                         ),
                     ),
-                    class_name="grid grid-cols-2 gap-4 mb-6",
+                    class_name="grid grid-cols-2 gap-4 mb-4",
+                ),
+                rx.el.div(
+                    rx.el.div(
+                        rx.el.label(
+                            "Hysteresis",
+                            class_name="block text-sm font-medium text-gray-700 mb-1",
+                        ),
+                        rx.el.input(
+                            name="alert_hysteresis",
+                            type="number",
+                            step="0.1",
+                            min="0",
+                            placeholder="0.0",
+                            default_value=rx.cond(
+                                ParcelState.editing_sensor,
+                                ParcelState.editing_sensor.alert_hysteresis.to_string(),
+                                "0.0",
+                            ),
+                            class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none",
+                        ),
+                    ),
+                    rx.el.div(
+                        rx.el.label(
+                            "Alert After (min)",
+                            class_name="block text-sm font-medium text-gray-700 mb-1",
+                        ),
+                        rx.el.input(
+                            name="alert_duration_min",
+                            type="number",
+                            step="1",
+                            min="0",
+                            placeholder="0",
+                            default_value=rx.cond(
+                                ParcelState.editing_sensor,
+                                (ParcelState.editing_sensor.alert_duration_s / 60).to_string(),
+                                "0",
+                            ),
+                            class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none",
+                        ),
+                    ),
+                    rx.el.div(
+                        rx.el.label(
+                            "Cooldown (min)",
+                            class_name="block text-sm font-medium text-gray-700 mb-1",
+                        ),
+                        rx.el.input(
+                            name="alert_cooldown_min",
+                            type="number",
+                            step="1",
+                            min="0",
+                            placeholder="0",
+                            default_value=rx.cond(
+                                ParcelState.editing_sensor,
+                                (ParcelState.editing_sensor.alert_cooldown_s / 60).to_string(),
+                                "0",
+                            ),
+                            class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none",
+                        ),
+                    ),
+                    class_name="grid grid-cols-3 gap-4 mb-4",
+                ),
+                rx.el.div(
+                    rx.el.label(
+                        "Reporting Interval (min)",
+                        class_name="block text-sm font-medium text-gray-700 mb-1",
+                    ),
+                    rx.el.input(
+                        name="expected_interval_min",
+                        type="number",
+                        step="1",
+                        min="1",
+                        placeholder="15",
+                        default_value=rx.cond(
+                            ParcelState.editing_sensor,
+                            (ParcelState.editing_sensor.expected_interval_s / 60).to_string(),
+                            "15",
+                        ),
+                        class_name="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none",
+                    ),
+                    class_name="mb-6",
                 ),
                 rx.el.div(
                     rx.el.button(
@@ -263,6 +351,7 @@ def parcel_detail_page() -> rx.Component:
                             ),
                             class_name="flex justify-between items-center mb-6 border-b border-gray-200 pb-4",
                         ),
+                        delete_progress_banner(),
                         rx.cond(
                             ParcelState.parcel_sensors,
                             rx.el.div(
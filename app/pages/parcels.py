@@ -2,10 +2,10 @@ import reflex as rx
 from app.states.parcel_state import ParcelState
 from app.states.auth_state import AuthState
 from app.components.navbar import navbar
-from app.database import Parcel
+from app.read_models import ParcelView
 
 
-def parcel_card(parcel: Parcel) -> rx.Component:
+def parcel_card(parcel: ParcelView) -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.div(
@@ -38,6 +38,22 @@ def parcel_card(parcel: Parcel) -> rx.Component:
                     ),
                     class_name="flex items-center mt-1",
                 ),
+                rx.el.div(
+                    rx.el.span(
+                        rx.icon("activity", class_name="h-3 w-3 mr-1"),
+                        f"{parcel.sensor_count} sensors",
+                        class_name="flex items-center text-xs font-medium text-gray-600 bg-gray-100 px-2 py-0.5 rounded-full",
+                    ),
+                    rx.cond(
+                        parcel.active_alerts > 0,
+                        rx.el.span(
+                            rx.icon("bell", class_name="h-3 w-3 mr-1"),
+                            f"{parcel.active_alerts} alerts",
+                            class_name="flex items-center text-xs font-medium text-orange-700 bg-orange-100 px-2 py-0.5 rounded-full ml-2",
+                        ),
+                    ),
+                    class_name="flex items-center mt-3",
+                ),
                 class_name="mb-4",
             ),
             rx.el.div(
@@ -48,7 +64,7 @@ def parcel_card(parcel: Parcel) -> rx.Component:
                 ),
                 rx.el.button(
                     rx.icon("pencil", class_name="h-4 w-4"),
-                    on_click=ParcelState.open_edit_parcel_modal(parcel),
+                    on_click=ParcelState.open_edit_parcel_modal(parcel.id),
                     class_name="p-2 text-gray-400 hover:text-blue-600 transition-colors",
                 ),
                 rx.el.button(
@@ -169,6 +185,103 @@ def parcel_modal() -> rx.Component:
     )
 
 
+def delete_progress_banner() -> rx.Component:
+    return rx.cond(
+        ParcelState.is_deleting,
+        rx.el.div(
+            rx.el.div(
+                rx.spinner(size="1"),
+                rx.el.span(
+                    f"Deleting data... {ParcelState.delete_progress}%",
+                    class_name="text-sm font-medium text-gray-700 ml-2",
+                ),
+                class_name="flex items-center mb-2",
+            ),
+            rx.el.div(
+                rx.el.div(
+                    class_name="h-2 bg-red-500 rounded-full transition-all",
+                    style={"width": f"{ParcelState.delete_progress}%"},
+                ),
+                class_name="w-full h-2 bg-gray-100 rounded-full overflow-hidden",
+            ),
+            class_name="bg-white p-4 rounded-xl border border-gray-200 shadow-sm mb-6",
+        ),
+    )
+
+
+def parcel_toolbar() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.icon(
+                "search",
+                class_name="h-4 w-4 text-gray-400 absolute left-3 top-1/2 -translate-y-1/2",
+            ),
+            rx.debounce_input(
+                rx.el.input(
+                    placeholder="Search by name, location or crop",
+                    value=ParcelState.search_query,
+                    on_change=ParcelState.set_search_query,
+                    class_name="w-full pl-9 pr-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none text-sm",
+                ),
+                debounce_timeout=300,
+            ),
+            class_name="relative flex-1",
+        ),
+        rx.el.div(
+            rx.el.select(
+                rx.el.option("Name", value="name"),
+                rx.el.option("Location", value="location"),
+                rx.el.option("Crop", value="crop_type"),
+                rx.el.option("Size", value="size"),
+                rx.el.option("Created", value="created_at"),
+                value=ParcelState.sort_by,
+                on_change=ParcelState.set_sort_by,
+                class_name="text-sm border-gray-300 rounded-md shadow-sm focus:border-blue-500 focus:ring-blue-500",
+            ),
+            rx.el.button(
+                rx.cond(
+                    ParcelState.sort_desc,
+                    rx.icon("arrow-down-wide-narrow", class_name="h-4 w-4"),
+                    rx.icon("arrow-up-narrow-wide", class_name="h-4 w-4"),
+                ),
+                on_click=ParcelState.toggle_sort_direction,
+                class_name="p-2 ml-2 text-gray-500 bg-white border border-gray-300 rounded-md hover:text-gray-700",
+            ),
+            class_name="flex items-center",
+        ),
+        class_name="flex flex-col sm:flex-row gap-4 mb-6",
+    )
+
+
+def parcel_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.p(
+            f"Showing {ParcelState.page_start}-{ParcelState.page_end} of {ParcelState.total_parcels}",
+            class_name="text-sm text-gray-500",
+        ),
+        rx.el.div(
+            rx.el.button(
+                rx.icon("chevron-left", class_name="h-4 w-4"),
+                on_click=ParcelState.prev_page,
+                disabled=ParcelState.page <= 1,
+                class_name="p-2 text-gray-600 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-40",
+            ),
+            rx.el.span(
+                f"Page {ParcelState.page} of {ParcelState.total_pages}",
+                class_name="text-sm text-gray-700 mx-3",
+            ),
+            rx.el.button(
+                rx.icon("chevron-right", class_name="h-4 w-4"),
+                on_click=ParcelState.next_page,
+                disabled=ParcelState.page >= ParcelState.total_pages,
+                class_name="p-2 text-gray-600 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-40",
+            ),
+            class_name="flex items-center",
+        ),
+        class_name="flex justify-between items-center mt-6",
+    )
+
+
 def parcels_page() -> rx.Component:
     return rx.el.div(
         navbar(),
@@ -190,19 +303,33 @@ def parcels_page() -> rx.Component:
                 ),
                 class_name="flex justify-between items-center mb-8",
             ),
+            delete_progress_banner(),
+            parcel_toolbar(),
             rx.cond(
                 ParcelState.parcels,
                 rx.el.div(
-                    rx.foreach(ParcelState.parcels, parcel_card),
-                    class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6",
+                    rx.el.div(
+                        rx.foreach(ParcelState.parcels, parcel_card),
+                        class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6",
+                    ),
+                    parcel_pagination(),
                 ),
                 rx.el.div(
                     rx.icon("sprout", class_name="h-16 w-16 text-gray-200 mb-4"),
                     rx.el.h3(
-                        "No parcels yet", class_name="text-lg font-medium text-gray-900"
+                        rx.cond(
+                            ParcelState.search_query,
+                            "No matching parcels",
+                            "No parcels yet",
+                        ),
+                        class_name="text-lg font-medium text-gray-900",
                     ),
                     rx.el.p(
-                        "Get started by adding your first parcel.",
+                        rx.cond(
+                            ParcelState.search_query,
+                            "Try a different search term.",
+                            "Get started by adding your first parcel.",
+                        ),
                         class_name="text-gray-500 mt-2",
                     ),
                     class_name="flex flex-col items-center justify-center py-16 bg-white rounded-2xl border border-dashed border-gray-300",
@@ -213,7 +340,7 @@ def parcels_page() -> rx.Component:
                 rx.alert_dialog.content(
                     rx.alert_dialog.title("Confirm Deletion"),
                     rx.alert_dialog.description(
-                        "Are you sure you want to delete this parcel? This action cannot be undone and will remove all associated sensors.",
+                        "Are you sure you want to delete this parcel? This action cannot be undone and will remove all associated sensors, readings and alerts.",
                         class_name="mb-4",
                     ),
                     rx.el.div(
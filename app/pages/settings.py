@@ -131,6 +131,55 @@ def api_tab() -> rx.Component:
     )
 
 
+def notifications_tab() -> rx.Component:
+    return rx.el.div(
+        rx.el.h3("Notifications", class_name="text-lg font-medium text-gray-900"),
+        rx.el.p(
+            "New alerts are sent by email and webhook, batched into short digests",
+            class_name="text-sm text-gray-500 mb-6",
+        ),
+        rx.el.div(
+            rx.el.label(
+                rx.el.input(
+                    type="checkbox",
+                    checked=SettingsState.notifications_enabled,
+                    on_change=SettingsState.toggle_notifications,
+                    class_name="rounded border-gray-300 text-blue-600 focus:ring-blue-500 h-4 w-4 mr-3",
+                ),
+                "Send alert notifications",
+                class_name="flex items-center text-sm font-medium text-gray-700 col-span-6",
+            ),
+            rx.el.div(
+                rx.el.label(
+                    "Webhook URL", class_name="block text-sm font-medium text-gray-700"
+                ),
+                rx.el.input(
+                    placeholder="https://example.com/hooks/alerts",
+                    on_change=SettingsState.set_webhook_url,
+                    default_value=SettingsState.webhook_url,
+                    key=SettingsState.webhook_url,
+                    class_name="mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:ring-blue-500 focus:border-blue-500 sm:text-sm",
+                ),
+                rx.el.p(
+                    "Alert batches are POSTed here as JSON. Leave empty to disable.",
+                    class_name="mt-2 text-sm text-gray-500",
+                ),
+                class_name="col-span-6 sm:col-span-4",
+            ),
+            rx.el.div(
+                rx.el.button(
+                    "Save Webhook",
+                    on_click=SettingsState.save_webhook_url,
+                    class_name="inline-flex justify-center py-2 px-4 border border-transparent shadow-sm text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-blue-500",
+                ),
+                class_name="col-span-6",
+            ),
+            class_name="grid grid-cols-6 gap-6",
+        ),
+        class_name="space-y-6",
+    )
+
+
 def settings_page() -> rx.Component:
     return rx.el.div(
         navbar(),
@@ -185,7 +234,14 @@ def settings_page() -> rx.Component:
                         rx.el.button(
                             rx.icon("bell", class_name="h-5 w-5 mr-3 text-gray-500"),
                             "Notifications",
-                            class_name="border-l-4 border-transparent text-gray-400 cursor-not-allowed flex items-center px-3 py-3 text-sm font-medium w-full",
+                            on_click=lambda: SettingsState.set_active_tab_val(
+                                "notifications"
+                            ),
+                            class_name=rx.cond(
+                                SettingsState.active_tab == "notifications",
+                                "bg-blue-50 border-l-4 border-blue-600 text-blue-700 flex items-center px-3 py-3 text-sm font-medium w-full",
+                                "border-l-4 border-transparent text-gray-900 hover:bg-gray-50 hover:text-gray-900 flex items-center px-3 py-3 text-sm font-medium w-full",
+                            ),
                         ),
                         class_name="space-y-1",
                     ),
@@ -198,7 +254,11 @@ def settings_page() -> rx.Component:
                         rx.cond(
                             SettingsState.active_tab == "security",
                             security_tab(),
-                            api_tab(),
+                            rx.cond(
+                                SettingsState.active_tab == "notifications",
+                                notifications_tab(),
+                                api_tab(),
+                            ),
                         ),
                     ),
                     class_name="col-span-12 md:col-span-9 bg-white shadow rounded-lg p-6",
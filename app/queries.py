@@ -0,0 +1,248 @@
+import datetime
+from typing import Optional
+from sqlalchemy import and_, case, literal, union_all
+from sqlmodel import Session, select, func, or_, asc, desc
+from app.database import Alert, AlertArchive, Parcel, Sensor
+
+PARCEL_SORT_FIELDS = ("name", "location", "crop_type", "size", "created_at")
+# `source` of alert history rows; among rows with the same `created_at`, live
+# alerts come first.
+HISTORY_ARCHIVED = 0
+HISTORY_LIVE = 1
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _parcel_filters(user_id: int, search: str) -> list:
+    filters = [Parcel.farmer_id == user_id]
+    search = search.strip()
+    if search:
+        pattern = _like_pattern(search)
+        filters.append(
+            or_(
+                Parcel.name.ilike(pattern, escape="\\"),
+                Parcel.location.ilike(pattern, escape="\\"),
+                Parcel.crop_type.ilike(pattern, escape="\\"),
+            )
+        )
+    return filters
+
+
+def parcel_open_alert_count():
+    """Correlated subquery counting the open alerts of the enclosing parcel."""
+    return (
+        select(func.count(Alert.id))
+        .join(Sensor, Alert.sensor_id == Sensor.id)
+        .where(
+            Sensor.parcel_id == Parcel.id,
+            Alert.is_active == True,
+            Alert.acknowledged == False,
+        )
+        .correlate(Parcel)
+        .scalar_subquery()
+    )
+
+
+def fetch_parcel_page(
+    session: Session,
+    user_id: int,
+    search: str = "",
+    sort_by: str = "name",
+    descending: bool = False,
+    page: int = 1,
+    page_size: int = 24,
+) -> tuple[list, int]:
+    """Fetch one page of a farmer's parcels with per-parcel aggregates.
+
+    The sensor and open-alert counts are correlated subqueries, so they are
+    only evaluated for the rows on the requested page.
+
+    Returns:
+        tuple[list, int]: Rows of (id, name, location, crop_type, size,
+        sensor_count, active_alerts) and the total number of matching parcels.
+    """
+    filters = _parcel_filters(user_id, search)
+    total = session.exec(select(func.count(Parcel.id)).where(*filters)).one()
+    sensor_count = (
+        select(func.count(Sensor.id))
+        .where(Sensor.parcel_id == Parcel.id)
+        .correlate(Parcel)
+        .scalar_subquery()
+    )
+    active_alerts = parcel_open_alert_count()
+    if sort_by not in PARCEL_SORT_FIELDS:
+        sort_by = "name"
+    order = desc if descending else asc
+    query = (
+        select(
+            Parcel.id,
+            Parcel.name,
+            Parcel.location,
+            Parcel.crop_type,
+            Parcel.size,
+            sensor_count.label("sensor_count"),
+            active_alerts.label("active_alerts"),
+        )
+        .where(*filters)
+        .order_by(order(getattr(Parcel, sort_by)), order(Parcel.id))
+        .offset(max(page - 1, 0) * page_size)
+        .limit(page_size)
+    )
+    return session.exec(query).all(), total
+
+
+ALERT_PERIODS = ("day", "week", "month")
+
+
+def _alert_filters(
+    model,
+    level: Optional[str],
+    parcel_id: Optional[int],
+    start: Optional[datetime.datetime],
+    end: Optional[datetime.datetime],
+) -> list:
+    filters = []
+    if level:
+        filters.append(model.level == level)
+    if parcel_id is not None:
+        filters.append(Sensor.parcel_id == parcel_id)
+    if start is not None:
+        filters.append(model.created_at >= start)
+    if end is not None:
+        filters.append(model.created_at < end)
+    return filters
+
+
+def fetch_alert_history_page(
+    session: Session,
+    user_id: int,
+    level: Optional[str] = None,
+    parcel_id: Optional[int] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    before: Optional[tuple[datetime.datetime, int, int]] = None,
+    page_size: int = 50,
+) -> tuple[list, bool]:
+    """Fetch one page of a farmer's past alerts, newest first, archive included.
+
+    Keyset pagination on `(created_at, source, key)`, where `source` is
+    `HISTORY_LIVE` or `HISTORY_ARCHIVED` and `key` the row's primary key in
+    that table (alert ids alone can repeat between the two). `before` is the
+    key of the last row of the previous page, so a page costs the same however
+    deep it is. Live and archived alerts are each read through their
+    `(created_at, id)` index, limited, and merged.
+
+    Returns:
+        tuple[list, bool]: Rows of (id, sensor_id, sensor, parcel_id, parcel,
+        message, level, created_at, status, source, key) and whether more rows
+        follow. `id` is the original alert id.
+    """
+    branches = []
+    for model, source, alert_id, status, extra in (
+        (
+            Alert,
+            HISTORY_LIVE,
+            Alert.id,
+            case((Alert.is_active == False, "Resolved"), else_="Acknowledged"),
+            [(Alert.acknowledged == True) | (Alert.is_active == False)],
+        ),
+        (
+            AlertArchive,
+            HISTORY_ARCHIVED,
+            AlertArchive.alert_id,
+            literal("Resolved"),
+            [],
+        ),
+    ):
+        filters = extra + _alert_filters(model, level, parcel_id, start, end)
+        if before is not None:
+            created_at, before_source, before_key = before
+            if source < before_source:
+                filters.append(model.created_at <= created_at)
+            elif source > before_source:
+                filters.append(model.created_at < created_at)
+            else:
+                filters.append(
+                    or_(
+                        model.created_at < created_at,
+                        and_(model.created_at == created_at, model.id < before_key),
+                    )
+                )
+        branch = (
+            select(
+                alert_id.label("id"),
+                Sensor.id.label("sensor_id"),
+                Sensor.name.label("sensor"),
+                Parcel.id.label("parcel_id"),
+                Parcel.name.label("parcel"),
+                model.message.label("message"),
+                model.level.label("level"),
+                model.created_at.label("created_at"),
+                status.label("status"),
+                literal(source).label("source"),
+                model.id.label("key"),
+            )
+            .join(Sensor, model.sensor_id == Sensor.id)
+            .join(Parcel, Sensor.parcel_id == Parcel.id)
+            .where(Parcel.farmer_id == user_id, *filters)
+            .order_by(desc(model.created_at), desc(model.id))
+            .limit(page_size + 1)
+            .subquery()
+        )
+        branches.append(select(*branch.c))
+    merged = union_all(*branches).subquery()
+    rows = session.execute(
+        select(*merged.c)
+        .order_by(
+            desc(merged.c.created_at), desc(merged.c.source), desc(merged.c.key)
+        )
+        .limit(page_size + 1)
+    ).all()
+    return rows[:page_size], len(rows) > page_size
+
+
+def count_alerts_by_period(
+    session: Session,
+    user_id: int,
+    period: str = "day",
+    level: Optional[str] = None,
+    parcel_id: Optional[int] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> list[tuple[str, int]]:
+    """Count a farmer's alerts, open and archived included, per day, week or month.
+
+    The database groups by calendar day; days are then rolled up into ISO weeks
+    (keyed by their Monday) or months.
+
+    Returns:
+        list[tuple[str, int]]: `(period, count)` pairs in chronological order.
+    """
+    counts: dict[str, int] = {}
+    for model in (Alert, AlertArchive):
+        day = func.date(model.created_at)
+        rows = session.execute(
+            select(day, func.count(model.id))
+            .join(Sensor, model.sensor_id == Sensor.id)
+            .join(Parcel, Sensor.parcel_id == Parcel.id)
+            .where(
+                Parcel.farmer_id == user_id,
+                *_alert_filters(model, level, parcel_id, start, end),
+            )
+            .group_by(day)
+        ).all()
+        for value, count in rows:
+            key = _period_key(datetime.date.fromisoformat(str(value)[:10]), period)
+            counts[key] = counts.get(key, 0) + count
+    return sorted(counts.items())
+
+
+def _period_key(day: datetime.date, period: str) -> str:
+    if period == "month":
+        return day.strftime("%Y-%m")
+    if period == "week":
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    return day.isoformat()
@@ -0,0 +1,85 @@
+import dataclasses
+from app.database import Parcel, Sensor
+
+
+@dataclasses.dataclass(slots=True)
+class ParcelView:
+    """Compact read model of a `Parcel` holding only the fields the pages render.
+
+    Kept in UI state instead of the SQLModel instance so that state pickling
+    and delta serialization don't carry SQLAlchemy instance state along.
+    """
+
+    id: int
+    name: str
+    location: str
+    crop_type: str
+    size: float
+    sensor_count: int = 0
+    active_alerts: int = 0
+
+    @classmethod
+    def from_row(cls, row) -> "ParcelView":
+        """Build from a `fetch_parcel_page` row, aggregates included."""
+        return cls(*row)
+
+    @classmethod
+    def from_model(cls, parcel: Parcel) -> "ParcelView":
+        return cls(
+            id=parcel.id,
+            name=parcel.name,
+            location=parcel.location,
+            crop_type=parcel.crop_type,
+            size=parcel.size,
+        )
+
+
+@dataclasses.dataclass(slots=True)
+class SensorView:
+    """Compact read model of a `Sensor` for the parcel detail page."""
+
+    id: int
+    name: str
+    type: str
+    status: str
+    threshold_low: float
+    threshold_high: float
+    expected_interval_s: int
+    alert_hysteresis: float
+    alert_duration_s: int
+    alert_cooldown_s: int
+
+    @classmethod
+    def columns(cls) -> tuple:
+        """Columns to select so rows can be fed straight into `from_row`."""
+        return (
+            Sensor.id,
+            Sensor.name,
+            Sensor.type,
+            Sensor.status,
+            Sensor.threshold_low,
+            Sensor.threshold_high,
+            Sensor.expected_interval_s,
+            Sensor.alert_hysteresis,
+            Sensor.alert_duration_s,
+            Sensor.alert_cooldown_s,
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "SensorView":
+        return cls(*row)
+
+    @classmethod
+    def from_model(cls, sensor: Sensor) -> "SensorView":
+        return cls(
+            id=sensor.id,
+            name=sensor.name,
+            type=sensor.type,
+            status=sensor.status,
+            threshold_low=sensor.threshold_low,
+            threshold_high=sensor.threshold_high,
+            expected_interval_s=sensor.expected_interval_s,
+            alert_hysteresis=sensor.alert_hysteresis,
+            alert_duration_s=sensor.alert_duration_s,
+            alert_cooldown_s=sensor.alert_cooldown_s,
+        )
@@ -0,0 +1,75 @@
+import sys
+import os
+import math
+import time
+import random
+import argparse
+import datetime
+import tracemalloc
+
+sys.path.append(os.getcwd())
+from app.anomaly import AnomalyDetector
+
+
+def build_readings(sensors, readings, seed):
+    """Interleaved (sensor_id, value, timestamp) readings every 15 minutes.
+
+    Noisy daily cycles, with injected spikes, level shifts and stuck values on
+    a few sensors.
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    steps = readings // sensors
+    stream = []
+    for i in range(readings):
+        s_id = i % sensors
+        t = i // sensors
+        value = 20 + 5 * math.sin(t / 96 * 2 * math.pi) + rng.gauss(0, 0.3)
+        if s_id % 50 == 1 and t % 500 == 250:
+            value += 25
+        if s_id % 50 == 2 and t > steps // 2:
+            value += 4
+        if s_id % 50 == 3 and t > steps // 2:
+            value = 18.0
+        stream.append((s_id, value, start + datetime.timedelta(minutes=15 * t)))
+    return stream
+
+
+def run_benchmark(sensors, readings):
+    stream = build_readings(sensors, readings, seed=42)
+    detector = AnomalyDetector()
+    counts = {}
+    t0 = time.perf_counter()
+    for s_id, value, ts in stream:
+        anomaly = detector.observe(s_id, value, ts).anomaly
+        if anomaly:
+            counts[anomaly.level] = counts.get(anomaly.level, 0) + 1
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fresh = AnomalyDetector()
+    for s_id, value, ts in stream[:sensors]:
+        fresh.observe(s_id, value, ts)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_reading_us = elapsed / len(stream) * 1e6
+    print(f"{len(stream)} readings over {sensors} sensors")
+    print(f"  {per_reading_us:.2f} us/reading ({len(stream) / elapsed:,.0f} readings/s)")
+    print(f"  detector state: {memory / sensors:.0f} B/sensor")
+    print(f"  anomalies: {counts}")
+    return {
+        "readings": len(stream),
+        "sensors": sensors,
+        "us_per_reading": round(per_reading_us, 3),
+        "bytes_per_sensor": round(memory / sensors),
+        "anomalies": counts,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the per-reading overhead of the ingest anomaly detector"
+    )
+    parser.add_argument("--sensors", type=int, default=1000, help="Distinct sensors")
+    parser.add_argument("--readings", type=int, default=1_000_000, help="Total readings")
+    args = parser.parse_args()
+    run_benchmark(args.sensors, args.readings)
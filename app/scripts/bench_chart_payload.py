@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+import zlib
+import math
+import random
+import argparse
+import datetime
+
+sys.path.append(os.getcwd())
+from app.series import rows_to_series, series_to_rows
+
+
+def build_rows(sensors, days, step_minutes, seed):
+    """Chart rows in the previous list-of-dicts format, one key per sensor."""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    rows = []
+    for i in range(days * 24 * 60 // step_minutes):
+        ts = start + datetime.timedelta(minutes=i * step_minutes)
+        row = {"name": ts.strftime("%Y-%m-%d %H:%M")}
+        for s_id in range(1, sensors + 1):
+            if rng.random() < 0.97:
+                row[f"sensor_{s_id}"] = round(
+                    20 + 8 * math.sin(i / 12 + s_id) + rng.uniform(-1, 1), 2
+                )
+        rows.append(row)
+    return rows
+
+
+def payload_sizes(payload):
+    encoded = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return len(encoded), len(zlib.compress(encoded, 6))
+
+
+def run_benchmark(sensors, days, step_minutes):
+    rows = build_rows(sensors, days, step_minutes, seed=42)
+    series = rows_to_series(rows, "name", [f"sensor_{i}" for i in range(1, sensors + 1)])
+    assert series_to_rows(series) == rows
+    rows_raw, rows_deflated = payload_sizes(rows)
+    series_raw, series_deflated = payload_sizes(series)
+    print(f"{len(rows)} points x {sensors} sensors ({days} days @ {step_minutes} min)")
+    print(f"  rows:     {rows_raw:>10} B json  {rows_deflated:>9} B deflated")
+    print(f"  columnar: {series_raw:>10} B json  {series_deflated:>9} B deflated")
+    print(
+        f"  reduction: {100 * (1 - series_raw / rows_raw):.1f}% json, "
+        f"{100 * (1 - series_deflated / rows_deflated):.1f}% deflated"
+    )
+    return {
+        "points": len(rows),
+        "rows_bytes": rows_raw,
+        "columnar_bytes": series_raw,
+        "rows_deflated_bytes": rows_deflated,
+        "columnar_deflated_bytes": series_deflated,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure chart payload size: list of dicts vs columnar series"
+    )
+    parser.add_argument("--sensors", type=int, default=5, help="Series in the chart")
+    parser.add_argument("--days", type=int, default=90, help="Days covered")
+    parser.add_argument("--step", type=int, default=60, help="Minutes per point")
+    args = parser.parse_args()
+    run_benchmark(args.sensors, args.days, args.step)
@@ -0,0 +1,111 @@
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import datetime
+
+sys.path.append(os.getcwd())
+import reflex as rx
+from sqlmodel import select
+from app.database import Sensor
+from app.exports import (
+    iter_arrow_chunks,
+    iter_csv_chunks,
+    iter_parquet_chunks,
+    iter_reading_batches,
+)
+
+
+def iter_json_chunks(sensor_ids, start, end):
+    """Row-oriented JSON, shaped like `GET /api/sensors/{id}/data`."""
+    rows = [
+        {"timestamp": ts.isoformat(), "sensor_id": s_id, "value": value}
+        for batch in iter_reading_batches(sensor_ids, start, end)
+        for ts, s_id, value in batch
+    ]
+    yield json.dumps(rows).encode("utf-8")
+
+
+def parse_json(data):
+    return len(json.loads(data))
+
+
+def parse_csv(data):
+    return data.count(b"\n") - 1
+
+
+def parse_arrow(data):
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(data).read_all().num_rows
+
+
+def parse_parquet(data):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(io.BytesIO(data)).num_rows
+
+
+FORMATS = {
+    "json": (iter_json_chunks, parse_json),
+    "csv": (iter_csv_chunks, parse_csv),
+    "arrow": (iter_arrow_chunks, parse_arrow),
+    "parquet": (iter_parquet_chunks, parse_parquet),
+}
+
+
+def run_benchmark(sensor_ids, days):
+    start = datetime.datetime.utcnow() - datetime.timedelta(days=days) if days else None
+    if not sensor_ids:
+        with rx.session() as session:
+            sensor_ids = list(session.exec(select(Sensor.id)).all())
+    print(f"Exporting {len(sensor_ids)} sensors" + (f", last {days} days" if days else ""))
+    results = []
+    for name, (encode, parse) in FORMATS.items():
+        t0 = time.perf_counter()
+        first_chunk_s = None
+        chunks = []
+        for chunk in encode(sensor_ids, start, None):
+            if first_chunk_s is None and chunk:
+                first_chunk_s = time.perf_counter() - t0
+            chunks.append(chunk)
+        encode_s = time.perf_counter() - t0
+        data = b"".join(chunks)
+        t0 = time.perf_counter()
+        rows = parse(data)
+        parse_s = time.perf_counter() - t0
+        results.append(
+            {
+                "format": name,
+                "rows": rows,
+                "bytes": len(data),
+                "encode_s": round(encode_s, 3),
+                "first_chunk_s": round(first_chunk_s or 0.0, 4),
+                "parse_s": round(parse_s, 3),
+                "rows_per_s": round(rows / max(encode_s + parse_s, 1e-9)),
+            }
+        )
+    for r in results:
+        print(
+            f"{r['format']:>8}: {r['rows']:>10} rows {r['bytes']:>12} B "
+            f"encode {r['encode_s']:>7}s first chunk {r['first_chunk_s']:>7}s "
+            f"parse {r['parse_s']:>7}s -> {r['rows_per_s']:>10} rows/s"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare export throughput: JSON vs CSV vs Arrow IPC vs Parquet"
+    )
+    parser.add_argument(
+        "--sensors", type=str, default="", help="Comma-separated sensor ids (default: all)"
+    )
+    parser.add_argument(
+        "--days", type=int, default=0, help="Only export the last N days (default: all)"
+    )
+    args = parser.parse_args()
+    ids = [int(s) for s in args.sensors.split(",") if s.strip()]
+    run_benchmark(ids, args.days)
@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+import json
+import pickle
+import argparse
+import dataclasses
+
+sys.path.append(os.getcwd())
+from app.database import Parcel, Sensor
+from app.read_models import ParcelView, SensorView
+
+
+def build_models(count):
+    parcels = [
+        Parcel(
+            id=i,
+            name=f"Parcel {i}",
+            location=f"Zone {i % 26}, Valley",
+            crop_type="Corn",
+            size=10.0 + i % 7,
+            farmer_id=1,
+        )
+        for i in range(count)
+    ]
+    sensors = [
+        Sensor(
+            id=i,
+            name=f"Temperature Sensor {i}",
+            type="temperature",
+            parcel_id=i // 3,
+            threshold_low=10.0,
+            threshold_high=35.0,
+        )
+        for i in range(count * 3)
+    ]
+    return parcels, sensors
+
+
+def measure(label, payload, to_json, repeat):
+    """Time pickle round trips and JSON encoding of a state-like payload."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        blob = pickle.dumps(payload)
+    dump_ms = (time.perf_counter() - start) / repeat * 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pickle.loads(blob)
+    load_ms = (time.perf_counter() - start) / repeat * 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encoded = json.dumps(to_json(payload), default=str)
+    json_ms = (time.perf_counter() - start) / repeat * 1000
+    return {
+        "variant": label,
+        "pickle_bytes": len(blob),
+        "pickle_dump_ms": round(dump_ms, 3),
+        "pickle_load_ms": round(load_ms, 3),
+        "json_bytes": len(encoded),
+        "json_ms": round(json_ms, 3),
+    }
+
+
+def run_benchmark(count, repeat):
+    parcels, sensors = build_models(count)
+    before = {"parcels": parcels, "parcel_sensors": sensors}
+    after = {
+        "parcels": [ParcelView.from_model(p) for p in parcels],
+        "parcel_sensors": [SensorView.from_model(s) for s in sensors],
+    }
+    results = [
+        measure(
+            "sqlmodel",
+            before,
+            lambda d: {k: [m.model_dump() for m in v] for k, v in d.items()},
+            repeat,
+        ),
+        measure(
+            "read_model",
+            after,
+            lambda d: {k: [dataclasses.asdict(m) for m in v] for k, v in d.items()},
+            repeat,
+        ),
+    ]
+    for r in results:
+        print(
+            f"{r['variant']:>10}: pickle {r['pickle_bytes']:>9} B "
+            f"dump {r['pickle_dump_ms']:>8} ms load {r['pickle_load_ms']:>8} ms | "
+            f"json {r['json_bytes']:>9} B {r['json_ms']:>8} ms"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare ParcelState payloads: SQLModel instances vs read models"
+    )
+    parser.add_argument("--parcels", type=int, default=2000, help="Parcels in state")
+    parser.add_argument("--repeat", type=int, default=20, help="Iterations per timing")
+    args = parser.parse_args()
+    run_benchmark(args.parcels, args.repeat)
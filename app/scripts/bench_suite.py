@@ -0,0 +1,444 @@
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import datetime
+import platform
+import subprocess
+from types import SimpleNamespace
+
+sys.path.append(os.getcwd())
+BENCH_DB_URL = os.environ.get("BENCH_DB_URL", "sqlite:///bench.db")
+# Point rx.session() at the benchmark database, never the app's own. Older
+# Reflex releases read DB_URL, newer ones REFLEX_DB_URL.
+os.environ["DB_URL"] = os.environ["REFLEX_DB_URL"] = BENCH_DB_URL
+import httpx
+import reflex as rx
+from fastapi import FastAPI
+from sqlalchemy import delete, insert, update
+from sqlmodel import SQLModel, Session, select, func
+from app.database import Alert, Parcel, Sensor, SensorData, User, ensure_schema
+from app.analytics import compute_analytics
+from app.analytics_cache import analytics_cache
+from app.api import api_router
+from app.jobs import job_runner
+from app.seeding import seed_fleet, seed_readings
+from app.states.analytics_state import AnalyticsState
+from app.states.dashboard_state import DashboardState
+
+BENCH_API_KEY = "key_bench_00000"
+
+
+def seed(engine, parcels, sensors_per_parcel, days, interval_minutes, seed_value):
+    """Create one farmer with `parcels` x `sensors_per_parcel` sensors,
+    readings every `interval_minutes` for the `days` up to now, and an open
+    alert on about a tenth of the sensors.
+
+    Everything derives from `seed_value`, so the same parameters always
+    produce the same dataset.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.datetime.utcnow()
+    with Session(engine) as session:
+        user = User(
+            username="bench",
+            email="bench@agrotech.local",
+            password_hash="",
+            api_key=BENCH_API_KEY,
+        )
+        session.add(user)
+        session.commit()
+        sensors = seed_fleet(session, user.id, parcels, sensors_per_parcel)
+        seed_readings(session, sensors, days, interval_minutes, seed_value, end=now)
+        sensor_ids = [s_id for s_id, _ in sensors]
+        session.execute(
+            insert(Alert),
+            [
+                {
+                    "sensor_id": s_id,
+                    "message": "Bench alert",
+                    "level": "warning",
+                    "created_at": now - datetime.timedelta(minutes=i),
+                }
+                for i, s_id in enumerate(
+                    rng.sample(sensor_ids, len(sensor_ids) // 10 + 1)
+                )
+            ],
+        )
+        session.commit()
+
+
+def ingest_checkpoint(engine) -> dict:
+    """Record what the ingest benchmarks change, for `restore_checkpoint`."""
+    with Session(engine) as session:
+        return {
+            "reading_id": session.exec(select(func.max(SensorData.id))).one() or 0,
+            "alert_id": session.exec(select(func.max(Alert.id))).one() or 0,
+            "active_alert_ids": session.exec(
+                select(Alert.id).where(Alert.is_active == True)
+            ).all(),
+            "sensors": [
+                dict(row._mapping)
+                for row in session.exec(
+                    select(
+                        Sensor.id,
+                        Sensor.status,
+                        Sensor.last_reading_time,
+                        Sensor.next_due_at,
+                    )
+                )
+            ],
+        }
+
+
+def restore_checkpoint(engine, checkpoint: dict):
+    """Undo the ingest benchmarks, so every run reads the seeded dataset.
+
+    Deletes the readings and alerts added since the checkpoint, reopens the
+    alerts the ingested readings resolved, and puts back each sensor's status
+    and heartbeat.
+    """
+    with Session(engine) as session:
+        session.execute(
+            delete(SensorData).where(SensorData.id > checkpoint["reading_id"])
+        )
+        session.execute(delete(Alert).where(Alert.id > checkpoint["alert_id"]))
+        for chunk in range(0, len(checkpoint["active_alert_ids"]), 500):
+            session.execute(
+                update(Alert)
+                .where(
+                    Alert.id.in_(checkpoint["active_alert_ids"][chunk : chunk + 500])
+                )
+                .values(is_active=True)
+            )
+        if checkpoint["sensors"]:
+            session.execute(update(Sensor), checkpoint["sensors"])
+        session.commit()
+
+
+def dataset_info(engine) -> dict:
+    with Session(engine) as session:
+        return {
+            "parcels": session.exec(select(func.count(Parcel.id))).one(),
+            "sensors": session.exec(select(func.count(Sensor.id))).one(),
+            "readings": session.exec(select(func.count(SensorData.id))).one(),
+            "alerts": session.exec(select(func.count(Alert.id))).one(),
+        }
+
+
+def summarize(samples: list[float], items: int = 1) -> dict:
+    """Latency statistics in milliseconds, plus throughput for `items` per run."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+    total = sum(ordered)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "per_s": round(len(ordered) * items / total, 1) if total else None,
+    }
+
+
+async def measure(run, repeat: int, warmup: int = 1, items: int = 1) -> dict:
+    """Time `await run(i)` `repeat` times after `warmup` untimed calls."""
+    for i in range(warmup):
+        await run(i)
+    samples = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        await run(warmup + i)
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, items)
+
+
+class StateHarness:
+    """Runs a state's event handlers outside the Reflex runtime.
+
+    Instance attributes stand in for the state's vars; handlers and helper
+    methods are looked up on the state class and bound to the harness, so
+    the timed code is the handler's own. `get_state` returns a state that
+    only carries the signed-in user, and `async with self` is a no-op.
+    """
+
+    def __init__(self, state_cls, user, **fields):
+        self._state_cls = state_cls
+        self._user = user
+        self.__dict__.update(fields)
+
+    def __getattr__(self, name):
+        attr = getattr(self._state_cls, name)
+        fn = getattr(attr, "fn", attr)
+        if callable(fn):
+            return fn.__get__(self)
+        return attr
+
+    async def get_state(self, state_cls):
+        return SimpleNamespace(user=self._user)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def call(self, handler: str, *args):
+        result = getattr(self, handler)(*args)
+        if hasattr(result, "__aiter__"):
+            async for _ in result:
+                pass
+        elif asyncio.iscoroutine(result):
+            await result
+
+
+async def run_benchmarks(args, user) -> dict:
+    api = FastAPI()
+    api.include_router(api_router)
+    transport = httpx.ASGITransport(app=api)
+    headers = {"X-API-Key": BENCH_API_KEY}
+    with Session(rx.model.get_engine()) as session:
+        parcel_ids = session.exec(
+            select(Parcel.id).where(Parcel.farmer_id == user.id).order_by(Parcel.id)
+        ).all()
+        sensor_ids = session.exec(
+            select(Sensor.id)
+            .where(Sensor.parcel_id.in_(parcel_ids))
+            .order_by(Sensor.id)
+        ).all()
+    rng = random.Random(args.seed)
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", headers=headers
+    ) as client:
+
+        async def get(path: str, **params):
+            response = await client.get(path, params=params)
+            response.raise_for_status()
+
+        results["api_sensor_history"] = await measure(
+            lambda i: get(f"/sensors/{sensor_ids[i % len(sensor_ids)]}/data"),
+            args.repeat,
+        )
+        results["api_sensor_history_1000_columnar"] = await measure(
+            lambda i: get(
+                f"/sensors/{sensor_ids[i % len(sensor_ids)]}/data",
+                limit=1000,
+                format="columnar",
+            ),
+            args.repeat,
+        )
+        results["api_list_parcel_sensors"] = await measure(
+            lambda i: get(f"/parcels/{parcel_ids[i % len(parcel_ids)]}/sensors"),
+            args.repeat,
+        )
+        results["api_dashboard"] = await measure(
+            lambda i: get("/dashboard"), args.repeat
+        )
+
+        for time_filter in ("24h", "7d"):
+            dashboard = StateHarness(
+                DashboardState,
+                user,
+                time_filter=time_filter,
+                selected_sensor_type="temperature",
+            )
+            results[f"state_load_dashboard_{time_filter}"] = await measure(
+                lambda i: dashboard.call("load_dashboard_data"), args.repeat
+            )
+
+        end = datetime.datetime.utcnow()
+        start = end - datetime.timedelta(days=min(args.days, 7))
+        analytics = StateHarness(
+            AnalyticsState,
+            user,
+            selected_sensor_ids=list(sensor_ids[:5]),
+            start_date=start.strftime("%Y-%m-%d"),
+            end_date=end.strftime("%Y-%m-%d"),
+            aggregation="raw",
+            operator="none",
+            gap_fill="none",
+            _fetch_seq=0,
+            # The debounce only coalesces clicks and the poll interval only
+            # paces progress updates; leave both out of the timings.
+            _fetch_debounce_s=0,
+            _fetch_poll_s=0.001,
+        )
+        await analytics.call("load_initial_data")
+        analytics.selected_sensor_ids = list(sensor_ids[:5])
+
+        async def fetch_cold(i):
+            analytics_cache.invalidate_sensors(analytics.selected_sensor_ids)
+            await analytics.call("fetch_analytics_data")
+
+        results["state_fetch_analytics_cold"] = await measure(fetch_cold, args.repeat)
+        results["state_fetch_analytics_cached"] = await measure(
+            lambda i: analytics.call("fetch_analytics_data"), args.repeat
+        )
+
+        async def compute(i):
+            analytics_cache.invalidate_sensors(analytics.selected_sensor_ids)
+            job = job_runner.submit(
+                compute_analytics, analytics.selected_sensor_ids, start, end, "raw"
+            )
+            await job_runner.wait(job, poll_interval=0.001)
+
+        results["analytics_compute_7d_raw"] = await measure(compute, args.repeat)
+
+        # Within every seeded sensor type's thresholds: no alerts on ingest.
+        def reading(i: int) -> dict:
+            return {
+                "sensor_id": sensor_ids[i % len(sensor_ids)],
+                "value": round(rng.uniform(30.0, 34.0), 2),
+            }
+
+        async def ingest_single(i):
+            r = reading(i)
+            response = await client.post(
+                f"/sensors/{r['sensor_id']}/data", json={"value": r["value"]}
+            )
+            response.raise_for_status()
+
+        results["api_ingest_single"] = await measure(
+            ingest_single, args.ingest_requests
+        )
+
+        async def ingest_batch(i):
+            payload = [reading(i * args.batch_size + j) for j in range(args.batch_size)]
+            response = await client.post("/sensors/data/batch", json=payload)
+            response.raise_for_status()
+
+        results[f"api_ingest_batch_{args.batch_size}"] = await measure(
+            ingest_batch, args.ingest_batches, items=args.batch_size
+        )
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print p50 changes against a previous run; False if any regressed."""
+    ok = True
+    for name, stats in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before["p50_ms"]:
+            continue
+        change = stats["p50_ms"] / before["p50_ms"] - 1
+        regressed = change > threshold
+        ok = ok and not regressed
+        print(
+            f"  {'REGRESSED' if regressed else 'ok':>9} {name}: "
+            f"{before['p50_ms']} -> {stats['p50_ms']} ms ({change:+.1%})"
+        )
+    return ok
+
+
+def main(args) -> bool:
+    engine = rx.model.get_engine()
+    if args.reseed:
+        SQLModel.metadata.drop_all(engine)
+    ensure_schema(engine)
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.api_key == BENCH_API_KEY)).first()
+    if user is None:
+        print(
+            f"Seeding {args.parcels * args.sensors_per_parcel} sensors x "
+            f"{args.days} days @ {args.interval} min into {BENCH_DB_URL}"
+        )
+        t0 = time.perf_counter()
+        seed(
+            engine,
+            args.parcels,
+            args.sensors_per_parcel,
+            args.days,
+            args.interval,
+            args.seed,
+        )
+        print(f"  seeded in {time.perf_counter() - t0:.1f}s")
+        with Session(engine) as session:
+            user = session.exec(
+                select(User).where(User.api_key == BENCH_API_KEY)
+            ).one()
+    else:
+        print(f"Reusing the dataset in {BENCH_DB_URL} (pass --reseed to rebuild)")
+    checkpoint = ingest_checkpoint(engine)
+    try:
+        results = asyncio.run(run_benchmarks(args, user))
+    finally:
+        restore_checkpoint(engine, checkpoint)
+    report = {
+        "commit": git_commit(),
+        "run_at": datetime.datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "scale": {
+            "parcels": args.parcels,
+            "sensors_per_parcel": args.sensors_per_parcel,
+            "days": args.days,
+            "interval_minutes": args.interval,
+            "seed": args.seed,
+        },
+        "dataset": dataset_info(engine),
+        "results": results,
+    }
+    for name, stats in results.items():
+        print(
+            f"{name:>36}: p50 {stats['p50_ms']:>9} ms  p95 {stats['p95_ms']:>9} ms"
+            f"  {stats['per_s']:>9}/s"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} ({baseline.get('commit') or '?'}):")
+        return compare(results, baseline, args.threshold)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="End-to-end ingest and read-path benchmarks on a seeded database "
+        "(set BENCH_DB_URL to choose it, default sqlite:///bench.db)"
+    )
+    parser.add_argument("--parcels", type=int, default=10)
+    parser.add_argument("--sensors-per-parcel", type=int, default=3)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--interval", type=int, default=15, help="Minutes per reading")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reseed", action="store_true", help="Drop and reseed the benchmark database"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Runs per read benchmark"
+    )
+    parser.add_argument("--ingest-requests", type=int, default=500)
+    parser.add_argument("--ingest-batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results")
+    parser.add_argument(
+        "--compare", type=str, default=None, help="Baseline JSON results to compare"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative p50 slowdown that counts as a regression",
+    )
+    sys.exit(0 if main(parser.parse_args()) else 1)
@@ -0,0 +1,163 @@
+import sys
+import os
+import time
+import random
+import argparse
+import datetime
+
+sys.path.append(os.getcwd())
+from sqlalchemy import insert
+from sqlmodel import Session, create_engine, select, desc
+from app.database import Alert, Parcel, Sensor, User, ensure_schema
+from app.alert_rules import THRESHOLD_ALERT_LEVEL
+from app.queries import parcel_open_alert_count
+
+OPEN_ALERT_INDEXES = ("ix_alert_open_sensor", "ix_alert_open_created")
+
+
+def plan_checks(user_id: int, sensor_id: int) -> list[tuple]:
+    """(name, statement, acceptable indexes) for every hot open-alert query."""
+    is_open = (Alert.is_active == True, Alert.acknowledged == False)
+    return [
+        (
+            "dashboard / alerts page: user's open alerts",
+            select(Alert, Sensor, Parcel)
+            .select_from(Alert)
+            .join(Sensor, Alert.sensor_id == Sensor.id)
+            .join(Parcel, Sensor.parcel_id == Parcel.id)
+            .where(Parcel.farmer_id == user_id, *is_open)
+            .order_by(desc(Alert.created_at)),
+            OPEN_ALERT_INDEXES,
+        ),
+        (
+            "parcel list: open alerts per parcel",
+            select(Parcel.id, parcel_open_alert_count()).where(
+                Parcel.farmer_id == user_id
+            ),
+            OPEN_ALERT_INDEXES,
+        ),
+        (
+            "api dashboard: open alerts of sensors",
+            select(Alert).where(Alert.sensor_id.in_([sensor_id]), *is_open),
+            OPEN_ALERT_INDEXES,
+        ),
+        (
+            "threshold rule seeding",
+            select(Alert.id).where(
+                Alert.sensor_id == sensor_id,
+                Alert.level == THRESHOLD_ALERT_LEVEL,
+                Alert.is_active == True,
+            ),
+            ("ix_alert_active_level_sensor",),
+        ),
+    ]
+
+
+def explain(session: Session, statement) -> str:
+    bind = session.get_bind()
+    sql = str(statement.compile(bind, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if bind.dialect.name == "sqlite" else "EXPLAIN "
+    rows = session.connection().exec_driver_sql(prefix + sql).all()
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+def check_plans(session: Session, user_id: int, sensor_id: int) -> bool:
+    ok = True
+    for name, statement, indexes in plan_checks(user_id, sensor_id):
+        plan = explain(session, statement)
+        t0 = time.perf_counter()
+        session.exec(statement).all()
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        used = [index for index in indexes if index in plan]
+        ok = ok and bool(used)
+        print(f"{'PASS' if used else 'FAIL'} {name} ({elapsed_ms:.2f} ms)")
+        for line in plan.splitlines():
+            print(f"    {line}")
+    return ok
+
+
+def build_scratch_db(history: int, open_alerts: int, seed: int):
+    """In-memory SQLite with a long alert history and a small open set.
+
+    As many alerts again are active but acknowledged, so an index over active
+    alerts would not be as selective as the open-alert ones.
+    """
+    rng = random.Random(seed)
+    engine = create_engine("sqlite://")
+    ensure_schema(engine)
+    now = datetime.datetime.utcnow()
+    with Session(engine) as session:
+        session.execute(
+            insert(User),
+            [
+                {"username": f"u{i}", "email": f"u{i}@example.com", "password_hash": ""}
+                for i in range(20)
+            ],
+        )
+        session.execute(
+            insert(Parcel),
+            [
+                {
+                    "name": f"P{i}",
+                    "size": 1.0,
+                    "crop_type": "Corn",
+                    "location": "Zone A",
+                    "farmer_id": i % 20 + 1,
+                }
+                for i in range(100)
+            ],
+        )
+        session.execute(
+            insert(Sensor),
+            [
+                {"name": f"S{i}", "type": "temperature", "parcel_id": i % 100 + 1}
+                for i in range(1000)
+            ],
+        )
+        session.execute(
+            insert(Alert),
+            [
+                {
+                    "sensor_id": rng.randint(1, 1000),
+                    "message": "history",
+                    "level": THRESHOLD_ALERT_LEVEL,
+                    "is_active": i < 2 * open_alerts,
+                    "acknowledged": (
+                        i >= open_alerts if i < 2 * open_alerts else rng.random() < 0.5
+                    ),
+                    "created_at": now - datetime.timedelta(minutes=i),
+                }
+                for i in range(history + 2 * open_alerts)
+            ],
+        )
+        session.commit()
+        session.connection().exec_driver_sql("ANALYZE")
+    return engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that open-alert queries use the partial alert indexes"
+    )
+    parser.add_argument(
+        "--app-db",
+        action="store_true",
+        help="Explain against the configured database instead of a scratch one",
+    )
+    parser.add_argument("--history", type=int, default=200_000)
+    parser.add_argument("--open", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.app_db:
+        import reflex as rx
+
+        engine = rx.model.get_engine()
+        ensure_schema(engine)
+    else:
+        print(f"Scratch DB: {args.history} historical alerts, {args.open} open")
+        engine = build_scratch_db(args.history, args.open, args.seed)
+    with Session(engine) as session:
+        sensor_id = session.exec(select(Sensor.id).limit(1)).first() or 1
+        user_id = session.exec(select(User.id).limit(1)).first() or 1
+        passed = check_plans(session, user_id, sensor_id)
+    sys.exit(0 if passed else 1)
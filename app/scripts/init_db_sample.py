@@ -1,12 +1,10 @@
 import sys
 import os
-import random
-import math
-import datetime
-from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel import create_engine, Session, select
 
 sys.path.append(os.getcwd())
-from app.database import User, Parcel, Sensor, SensorData, Alert
+from app.database import User, Parcel, Sensor, ensure_schema
+from app.seeding import seed_readings
 import bcrypt
 
 
@@ -14,7 +12,7 @@ def init_db():
     sqlite_file_name = "reflex.db"
     sqlite_url = f"sqlite:///{sqlite_file_name}"
     engine = create_engine(sqlite_url)
-    SQLModel.metadata.create_all(engine)
+    ensure_schema(engine)
     with Session(engine) as session:
         if session.exec(select(User)).first():
             print("Data already exists. Skipping initialization.")
@@ -86,32 +84,15 @@ def init_db():
         session.commit()
         for s in sensors:
             session.refresh(s)
-        now = datetime.datetime.now(datetime.UTC)
         print("Generating sensor readings...")
-        for day in range(30):
-            date = now - datetime.timedelta(days=30 - day)
-            for hour in range(0, 24, 4):
-                timestamp = date.replace(hour=hour, minute=0, second=0)
-                for sensor in sensors:
-                    base_val = 25.0 if sensor.type == "temperature" else 60.0
-                    variation = 5.0 * math.sin(hour / 24 * 2 * 3.14159)
-                    noise = random.uniform(-2.0, 2.0)
-                    value = base_val + variation + noise
-                    data = SensorData(
-                        sensor_id=sensor.id, value=value, timestamp=timestamp
-                    )
-                    session.add(data)
-                    if random.random() < 0.02:
-                        alert = Alert(
-                            sensor_id=sensor.id,
-                            message=f"Abnormal {sensor.type} detected: {value:.1f}",
-                            level="warning",
-                            created_at=timestamp,
-                            is_active=True,
-                            acknowledged=False,
-                        )
-                        session.add(alert)
-        session.commit()
+        seed_readings(
+            session,
+            [(s.id, s.type) for s in sensors],
+            days=30,
+            interval_minutes=240,
+            seed=42,
+            alert_rate=0.02,
+        )
         print("Database initialized successfully with sample data.")
 
 
@@ -0,0 +1,149 @@
+import sys
+import os
+import json
+import asyncio
+import argparse
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.getcwd())
+from app.notifications import (
+    AlertNotice,
+    NotificationDispatcher,
+    Recipient,
+    SmtpSink,
+    WebhookSink,
+)
+
+
+class WebhookStandIn(BaseHTTPRequestHandler):
+    """Prints every POSTed batch; answers 500 to the first `fail_first` posts."""
+
+    fail_first = 0
+    received: list[dict] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if WebhookStandIn.fail_first > 0:
+            WebhookStandIn.fail_first -= 1
+            print(f"[webhook] failing on purpose ({len(body['alerts'])} alerts)")
+            self.send_response(500)
+            self.end_headers()
+            return
+        WebhookStandIn.received.append(body)
+        print(f"[webhook] {self.path}: {len(body['alerts'])} alerts")
+        for alert in body["alerts"]:
+            print(f"    {alert['level']}: {alert['message']}")
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SmtpStandIn:
+    """Minimal SMTP server that accepts any mail and prints it."""
+
+    def __init__(self):
+        self.received: list[str] = []
+
+    async def handle(self, reader, writer):
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 stand-in ESMTP")
+        while line := (await reader.readline()).decode().strip():
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                await reply("250-stand-in")
+                await reply("250 8BITMIME")
+            elif command == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while (data := (await reader.readline()).decode()) not in (".\r\n", ""):
+                    lines.append(data.rstrip("\r\n"))
+                self.received.append("\n".join(lines))
+                print("[smtp] " + "\n       ".join(lines))
+                await reply("250 OK")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("250 OK")
+        writer.close()
+
+
+def start_webhook(port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), WebhookStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def demo(http_port: int, smtp_port: int, alerts: int, users: int):
+    """Push alerts for a few users through the real dispatcher to the stand-ins."""
+    dispatcher = NotificationDispatcher(
+        [
+            # The stand-in listens on loopback, which webhooks normally refuse.
+            WebhookSink(rate_per_minute=600, allowed_hosts=frozenset({"127.0.0.1"})),
+            SmtpSink("127.0.0.1", smtp_port, "alerts@agrotech.local", 600),
+        ],
+        window_s=1.0,
+        recipient_loader=lambda user_id: Recipient(
+            user_id,
+            f"user{user_id}",
+            f"user{user_id}@example.com",
+            f"http://127.0.0.1:{http_port}/hooks/{user_id}",
+        ),
+    )
+    now = datetime.datetime.utcnow()
+    for i in range(alerts):
+        dispatcher.publish(
+            i % users + 1,
+            [AlertNotice(i, "warning", f"Demo alert {i}", now)],
+        )
+    await asyncio.sleep(dispatcher.window_s)
+    await dispatcher.drain()
+
+
+async def main(args):
+    smtp = SmtpStandIn()
+    server = await asyncio.start_server(smtp.handle, "127.0.0.1", args.smtp_port)
+    start_webhook(args.http_port)
+    WebhookStandIn.fail_first = args.fail_first
+    print(
+        f"Webhook stand-in on http://127.0.0.1:{args.http_port}, "
+        f"SMTP stand-in on 127.0.0.1:{args.smtp_port}"
+    )
+    async with server:
+        if args.demo:
+            await demo(args.http_port, args.smtp_port, args.alerts, args.users)
+            print(
+                f"Delivered {len(WebhookStandIn.received)} webhook batches and "
+                f"{len(smtp.received)} emails for {args.alerts} alerts"
+            )
+        else:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local stand-in webhook and SMTP sinks for alert notifications"
+    )
+    parser.add_argument("--http-port", type=int, default=8787)
+    parser.add_argument("--smtp-port", type=int, default=1025)
+    parser.add_argument(
+        "--demo",
+        action="store_true",
+        help="Send demo alerts through the dispatcher and exit",
+    )
+    parser.add_argument("--alerts", type=int, default=50)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument(
+        "--fail-first",
+        type=int,
+        default=0,
+        help="Answer 500 to the first N webhook posts to exercise retries",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import argparse
+from sqlmodel import create_engine, Session, select
+
+sys.path.append(os.getcwd())
+from app.database import User, ensure_schema
+from app.seeding import seed_fleet, seed_readings
+import bcrypt
+
+
+def get_or_create_farmer(session: Session, username: str) -> User:
+    farmer = session.exec(select(User).where(User.username == username)).first()
+    if farmer:
+        return farmer
+    farmer = User(
+        username=username,
+        email=f"{username}@agrotech.com",
+        password_hash=bcrypt.hashpw(b"password123", bcrypt.gensalt()).decode("utf-8"),
+        role="farmer",
+        api_key=f"key_{username}",
+    )
+    session.add(farmer)
+    session.commit()
+    session.refresh(farmer)
+    return farmer
+
+
+def run(args):
+    engine = create_engine(args.db_url)
+    ensure_schema(engine)
+    steps = args.days * 24 * 60 // args.interval
+    sensors_total = args.parcels * args.sensors_per_parcel
+    print(
+        f"Seeding {sensors_total} sensors x {steps} steps "
+        f"({args.days} days @ {args.interval} min) = {sensors_total * steps:,} "
+        f"readings into {args.db_url}"
+    )
+    t0 = time.perf_counter()
+    with Session(engine) as session:
+        farmer = get_or_create_farmer(session, args.farmer)
+        sensors = seed_fleet(session, farmer.id, args.parcels, args.sensors_per_parcel)
+        session.commit()
+        readings, alerts = seed_readings(
+            session,
+            sensors,
+            args.days,
+            args.interval,
+            args.seed,
+            alert_rate=args.alert_rate,
+        )
+    elapsed = time.perf_counter() - t0
+    print(
+        f"Inserted {readings:,} readings and {alerts:,} alerts in {elapsed:.1f}s "
+        f"({readings / elapsed:,.0f} readings/s). Log in as {args.farmer} / "
+        f"password123, API key key_{args.farmer}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bulk-seed parcels, sensors and synthetic readings at scale"
+    )
+    parser.add_argument("--db-url", type=str, default="sqlite:///reflex.db")
+    parser.add_argument("--farmer", type=str, default="farmer_bulk")
+    parser.add_argument("--parcels", type=int, default=100)
+    parser.add_argument("--sensors-per-parcel", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--interval", type=int, default=1, help="Minutes per reading")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--alert-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of readings that also get an open alert",
+    )
+    run(parser.parse_args())
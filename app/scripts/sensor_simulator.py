@@ -1,12 +1,21 @@
-import requests
-import time
+import asyncio
+import csv
+import heapq
 import random
 import math
+import time
 import datetime
 import argparse
 import logging
+from array import array
+from typing import Iterator, Optional
+import httpx
 
 API_BASE_URL = "http://localhost:8000/api"
+PROFILES = ("constant", "ramp", "step", "sine")
+REPORT_INTERVAL_S = 5.0
+REPLAY_BATCH_SIZE = 10000
+REPLAY_REORDER_WINDOW = 1000
 
 
 def get_temperature(hour):
@@ -36,58 +45,491 @@ def get_value(sensor_type, hour):
         return random.uniform(10, 100)
 
 
-def run_simulation(api_key, interval=5):
-    print(f"Starting Agrotech Sensor Simulator...")
-    print(f"Target: {API_BASE_URL}")
-    print(f"Interval: {interval} seconds")
-    headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
+def rate_at(profile: str, elapsed: float, rate: float, ramp_s: float) -> float:
+    """Target readings per second `elapsed` seconds into the run.
+
+    - `constant`: `rate` throughout.
+    - `ramp`: linear from 0 to `rate` over `ramp_s`, then flat.
+    - `step`: 25%, 50%, 75% then 100% of `rate`, one step every `ramp_s / 4`.
+    - `sine`: oscillates between 0 and `rate` with period `ramp_s`.
+    """
+    if profile == "ramp":
+        return rate * min(elapsed / ramp_s, 1.0) if ramp_s > 0 else rate
+    if profile == "step":
+        steps = int(elapsed // (ramp_s / 4)) + 1 if ramp_s > 0 else 4
+        return rate * min(steps, 4) / 4
+    if profile == "sine":
+        return rate * (1 - math.cos(2 * math.pi * elapsed / ramp_s)) / 2
+    return rate
+
+
+class LoadStats:
+    """Request latencies and counters for the whole run and the current window."""
+
+    def __init__(self):
+        self.latencies = array("d")
+        self.window_latencies = array("d")
+        self.requests = 0
+        self.readings = 0
+        self.errors = 0
+        self.lagging = 0
+        self.window_readings = 0
+        self.started = time.perf_counter()
+        self.window_started = self.started
+
+    def record(self, latency_s: float, readings: int, ok: bool):
+        self.requests += 1
+        self.latencies.append(latency_s)
+        self.window_latencies.append(latency_s)
+        if ok:
+            self.readings += readings
+            self.window_readings += readings
+        else:
+            self.errors += 1
+
+    @staticmethod
+    def percentiles(samples) -> dict:
+        if not samples:
+            return {}
+        ordered = sorted(samples)
+        pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+        return {
+            "p50_ms": round(pick(0.50), 2),
+            "p90_ms": round(pick(0.90), 2),
+            "p99_ms": round(pick(0.99), 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+
+    def report_window(self, target_rate: Optional[float] = None):
+        now = time.perf_counter()
+        elapsed = max(now - self.window_started, 1e-9)
+        p = self.percentiles(self.window_latencies)
+        target = f"target {target_rate:8.1f}/s " if target_rate is not None else ""
+        print(
+            f"[{now - self.started:7.1f}s] {target}"
+            f"achieved {self.window_readings / elapsed:8.1f}/s "
+            f"p50 {p.get('p50_ms', 0):7.1f}ms p99 {p.get('p99_ms', 0):7.1f}ms "
+            f"errors {self.errors} behind {self.lagging}"
+        )
+        self.window_latencies = array("d")
+        self.window_readings = 0
+        self.window_started = now
+
+    def summary(self) -> dict:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "duration_s": round(elapsed, 2),
+            "requests": self.requests,
+            "readings": self.readings,
+            "errors": self.errors,
+            "behind_schedule": self.lagging,
+            "readings_per_s": round(self.readings / elapsed, 1),
+            "requests_per_s": round(self.requests / elapsed, 1),
+            **self.percentiles(self.latencies),
+        }
+
+
+async def fetch_sensors(client: httpx.AsyncClient) -> list[dict]:
+    parcels_resp = await client.get("/parcels")
+    parcels_resp.raise_for_status()
+    parcels = parcels_resp.json()
+    sensors = []
+    for parcel in parcels:
+        s_resp = await client.get(f"/parcels/{parcel['id']}/sensors")
+        if s_resp.status_code == 200:
+            sensors.extend(s_resp.json())
+    print(f"Found {len(sensors)} sensors across {len(parcels)} parcels.")
+    return sensors
+
+
+async def post_readings(
+    client: httpx.AsyncClient, readings: list[dict], batch_mode: bool
+) -> bool:
+    if batch_mode:
+        resp = await client.post("/sensors/data/batch", json=readings)
+    else:
+        reading = readings[0]
+        resp = await client.post(
+            f"/sensors/{reading['sensor_id']}/data",
+            json={"value": reading["value"], "timestamp": reading["timestamp"]},
+        )
+    return resp.status_code == 200
+
+
+async def send_worker(
+    client: httpx.AsyncClient,
+    queue: asyncio.Queue,
+    stats: LoadStats,
+    batch_mode: bool,
+):
+    while True:
+        readings = await queue.get()
+        t0 = time.perf_counter()
+        try:
+            ok = await post_readings(client, readings, batch_mode)
+        except httpx.HTTPError as e:
+            logging.debug(f"Request failed: {e}")
+            ok = False
+        stats.record(time.perf_counter() - t0, len(readings), ok)
+        queue.task_done()
+
+
+async def generate_load(
+    queue: asyncio.Queue,
+    stats: LoadStats,
+    sensors: list[dict],
+    virtual_sensors: int,
+    rate: float,
+    profile: str,
+    ramp_s: float,
+    duration_s: Optional[float],
+    batch_size: int,
+):
+    """Open-loop producer: enqueue requests on the rate profile's schedule.
+
+    Virtual sensors report round-robin and map onto the real sensors, so a
+    small database can stand in for a fleet of any size. Requests that
+    cannot be queued because every worker is busy count as behind schedule.
+    """
+    start = last_tick = time.perf_counter()
+    next_report = start + REPORT_INTERVAL_S
+    due = 0.0
+    sent = 0
+    while duration_s is None or time.perf_counter() - start < duration_s:
+        now = time.perf_counter()
+        target = rate_at(profile, now - start, rate, ramp_s)
+        # Accrue by the time that actually passed: sleeps overshoot and queue
+        # puts block, so a fixed per-tick increment would undershoot the rate.
+        due += target * (now - last_tick)
+        last_tick = now
+        hour = datetime.datetime.now().hour
+        timestamp = datetime.datetime.utcnow().isoformat()
+        while due >= batch_size:
+            due -= batch_size
+            readings = []
+            for _ in range(batch_size):
+                virtual_id = sent % virtual_sensors
+                sensor = sensors[virtual_id % len(sensors)]
+                readings.append(
+                    {
+                        "sensor_id": sensor["id"],
+                        "value": get_value(sensor["type"], hour),
+                        "timestamp": timestamp,
+                    }
+                )
+                sent += 1
+            if queue.full():
+                stats.lagging += 1
+            await queue.put(readings)
+        if now >= next_report:
+            stats.report_window(target)
+            next_report += REPORT_INTERVAL_S
+        await asyncio.sleep(0.01)
+
+
+def _parse_timestamp(value) -> datetime.datetime:
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=None)
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).replace(
+        tzinfo=None
+    )
+
+
+def iter_csv_batches(path: str, batch_size: int) -> Iterator[list]:
+    """Read a `timestamp,sensor_id,value` CSV export `batch_size` rows at a time."""
+    with open(path, newline="") as f:
+        batch = []
+        for row in csv.DictReader(f):
+            batch.append(
+                (
+                    _parse_timestamp(row["timestamp"]),
+                    int(row["sensor_id"]),
+                    float(row["value"]),
+                )
+            )
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _arrow_rows(record_batch) -> list:
+    return list(
+        zip(
+            record_batch.column("timestamp").to_pylist(),
+            record_batch.column("sensor_id").to_pylist(),
+            record_batch.column("value").to_pylist(),
+        )
+    )
+
+
+def iter_arrow_batches(path: str, batch_size: int) -> Iterator[list]:
+    """Read an Arrow IPC stream export one record batch at a time."""
+    import pyarrow as pa
+
+    with pa.OSFile(path, "rb") as source, pa.ipc.open_stream(source) as reader:
+        for record_batch in reader:
+            yield _arrow_rows(record_batch)
+
+
+def iter_parquet_batches(path: str, batch_size: int) -> Iterator[list]:
+    """Read a Parquet export `batch_size` rows at a time."""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    for record_batch in parquet.iter_batches(
+        batch_size=batch_size, columns=["timestamp", "sensor_id", "value"]
+    ):
+        yield _arrow_rows(record_batch)
+
+
+def iter_database_batches(
+    url: str,
+    batch_size: int,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Iterator[list]:
+    """Stream readings from another app database through a server-side cursor.
+
+    Uses SQLAlchemy Core against the `sensordata` table so the simulator
+    stays a plain HTTP client without importing the app.
+    """
+    from sqlalchemy import column, create_engine, select, table
+
+    readings = table(
+        "sensordata",
+        column("id"),
+        column("timestamp"),
+        column("sensor_id"),
+        column("value"),
+    )
+    query = select(readings.c.timestamp, readings.c.sensor_id, readings.c.value)
+    if start is not None:
+        query = query.where(readings.c.timestamp >= start)
+    if end is not None:
+        query = query.where(readings.c.timestamp < end)
+    query = query.order_by(readings.c.timestamp, readings.c.id).execution_options(
+        stream_results=True, yield_per=batch_size
+    )
+    engine = create_engine(url)
     try:
-        print("Fetching sensor list...")
-        parcels_resp = requests.get(f"{API_BASE_URL}/parcels", headers=headers)
-        if parcels_resp.status_code != 200:
-            print(f"Error fetching parcels: {parcels_resp.text}")
-            return
-        parcels = parcels_resp.json()
+        with engine.connect() as conn:
+            for batch in conn.execute(query).partitions(batch_size):
+                yield [
+                    (_parse_timestamp(ts), sensor_id, value)
+                    for ts, sensor_id, value in batch
+                ]
+    finally:
+        engine.dispose()
+
+
+def open_replay_source(
+    source: str,
+    batch_size: int = REPLAY_BATCH_SIZE,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Iterator[list]:
+    """Batches of (timestamp, sensor_id, value) from a file export or database URL.
+
+    Files are the CSV, Arrow and Parquet exports of `/api/export/readings.*`;
+    anything containing `://` is treated as a SQLAlchemy database URL.
+    """
+    if "://" in source:
+        return iter_database_batches(source, batch_size, start, end)
+    if source.endswith(".parquet"):
+        batches = iter_parquet_batches(source, batch_size)
+    elif source.endswith(".arrow"):
+        batches = iter_arrow_batches(source, batch_size)
+    else:
+        batches = iter_csv_batches(source, batch_size)
+    return (
+        [
+            row
+            for row in batch
+            if (start is None or row[0] >= start) and (end is None or row[0] < end)
+        ]
+        for batch in batches
+    )
+
+
+async def iter_replay_rows(batches: Iterator[list], reorder_window: int):
+    """Yield rows in timestamp order, tolerating up to `reorder_window` misplaced.
+
+    Batches are read in a worker thread so file and database I/O never stalls
+    the senders. A heap of at most `reorder_window` rows sorts out local
+    disorder (exports are already ordered) while keeping memory bounded
+    however large the source is.
+    """
+    heap: list[tuple] = []
+    seq = 0
+    while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+        for timestamp, sensor_id, value in batch:
+            heapq.heappush(heap, (timestamp, seq, sensor_id, value))
+            seq += 1
+            if len(heap) > reorder_window:
+                timestamp, _, s_id, v = heapq.heappop(heap)
+                yield timestamp, s_id, v
+    while heap:
+        timestamp, _, s_id, v = heapq.heappop(heap)
+        yield timestamp, s_id, v
+
+
+class SensorRemap:
+    """Maps recorded sensor ids onto the target's sensors in first-seen order."""
+
+    def __init__(self, target_ids: list[int]):
+        self.target_ids = target_ids
+        self.mapping: dict[int, int] = {}
+
+    def __call__(self, sensor_id: int) -> int:
+        if sensor_id not in self.mapping:
+            self.mapping[sensor_id] = self.target_ids[
+                len(self.mapping) % len(self.target_ids)
+            ]
+        return self.mapping[sensor_id]
+
+
+async def replay_load(
+    queue: asyncio.Queue,
+    stats: LoadStats,
+    rows,
+    speed: float,
+    batch_size: int,
+    rebase: bool,
+    remap: Optional["SensorRemap"],
+    duration_s: Optional[float],
+) -> int:
+    """Send recorded readings keeping their inter-arrival times.
+
+    Each reading is due `(timestamp - first timestamp) / speed` seconds into
+    the run; a `speed` of 0 sends as fast as the workers allow. Readings due
+    at the same moment share a request in batch mode. With `rebase` the
+    timestamps are shifted so the first reading happens now, otherwise the
+    recorded ones are sent. Returns the number of readings that arrived out of order.
+    """
+    start = time.perf_counter()
+    next_report = start + REPORT_INTERVAL_S
+    first: Optional[datetime.datetime] = None
+    last: Optional[datetime.datetime] = None
+    shift = datetime.timedelta(0)
+    out_of_order = 0
+    pending: list[dict] = []
+
+    async def enqueue():
+        nonlocal pending
+        if queue.full():
+            stats.lagging += 1
+        await queue.put(pending)
+        pending = []
+
+    async for timestamp, sensor_id, value in rows:
+        if first is None:
+            first = timestamp
+            if rebase:
+                shift = datetime.datetime.utcnow() - first
+        if last is not None and timestamp < last:
+            out_of_order += 1
+        last = max(last or timestamp, timestamp)
+        if speed > 0:
+            delay = start + (timestamp - first).total_seconds() / speed
+            delay -= time.perf_counter()
+            if delay > 0:
+                if pending:
+                    await enqueue()
+                await asyncio.sleep(delay)
+        if duration_s is not None and time.perf_counter() - start >= duration_s:
+            break
+        if remap is not None:
+            sensor_id = remap(sensor_id)
+        pending.append(
+            {
+                "sensor_id": sensor_id,
+                "value": value,
+                "timestamp": (timestamp + shift).isoformat(),
+            }
+        )
+        if len(pending) >= batch_size:
+            await enqueue()
+        if time.perf_counter() >= next_report:
+            stats.report_window()
+            next_report += REPORT_INTERVAL_S
+    if pending:
+        await enqueue()
+    return out_of_order
+
+
+async def run_load(args) -> Optional[dict]:
+    headers = {"X-API-Key": args.key}
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.url, headers=headers, limits=limits, timeout=30.0
+    ) as client:
         sensors = []
-        for parcel in parcels:
-            s_resp = requests.get(
-                f"{API_BASE_URL}/parcels/{parcel['id']}/sensors", headers=headers
-            )
-            if s_resp.status_code == 200:
-                p_sensors = s_resp.json()
-                for s in p_sensors:
-                    s["parcel_name"] = parcel["name"]
-                    sensors.append(s)
-        if not sensors:
-            print("No sensors found to simulate.")
-            return
-        print(f"Found {len(sensors)} sensors across {len(parcels)} parcels.")
-        while True:
-            current_hour = datetime.datetime.now().hour
-            for sensor in sensors:
-                value = get_value(sensor["type"], current_hour)
-                payload = {
-                    "value": value,
-                    "timestamp": datetime.datetime.utcnow().isoformat(),
-                }
-                try:
-                    resp = requests.post(
-                        f"{API_BASE_URL}/sensors/{sensor['id']}/data",
-                        json=payload,
-                        headers=headers,
-                    )
-                    status = (
-                        "OK" if resp.status_code == 200 else f"ERR {resp.status_code}"
-                    )
+        if not args.replay or args.remap:
+            sensors = await fetch_sensors(client)
+            if not sensors:
+                print("No sensors found to simulate.")
+                return None
+        batch_mode = args.batch_size > 1
+        mode = f"batches of {args.batch_size}" if batch_mode else "single readings"
+        stats = LoadStats()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+        workers = [
+            asyncio.create_task(send_worker(client, queue, stats, batch_mode))
+            for _ in range(args.concurrency)
+        ]
+        try:
+            if args.replay:
+                speed = f"{args.speed:g}x" if args.speed > 0 else "max speed"
+                print(
+                    f"Replaying {args.replay} at {speed}, "
+                    f"{args.concurrency} connections, {mode}"
+                )
+                rows = iter_replay_rows(
+                    open_replay_source(args.replay, start=args.start, end=args.end),
+                    args.reorder_window,
+                )
+                out_of_order = await replay_load(
+                    queue,
+                    stats,
+                    rows,
+                    args.speed,
+                    args.batch_size,
+                    args.rebase,
+                    SensorRemap([s["id"] for s in sensors]) if args.remap else None,
+                    args.duration,
+                )
+                if out_of_order:
                     print(
-                        f"[{status}] Sensor {sensor['id']} ({sensor['type']}) -> {value}"
+                        f"{out_of_order} readings were further out of order than "
+                        "--reorder-window and were sent late"
                     )
-                except Exception as e:
-                    logging.exception(f"Request failed: {e}")
-            print(f"Sleeping for {interval}s...")
-            time.sleep(interval)
-    except Exception as e:
-        logging.exception(f"Simulation stopped: {e}")
+            else:
+                virtual_sensors = args.virtual_sensors or len(sensors)
+                rate = args.rate or virtual_sensors / args.interval
+                print(
+                    f"Simulating {virtual_sensors} sensors at {rate:.1f} readings/s "
+                    f"({args.profile}), {args.concurrency} connections, {mode}"
+                )
+                await generate_load(
+                    queue,
+                    stats,
+                    sensors,
+                    virtual_sensors,
+                    rate,
+                    args.profile,
+                    args.ramp_seconds,
+                    args.duration,
+                    args.batch_size,
+                )
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return stats.summary()
 
 
 if __name__ == "__main__":
@@ -95,8 +537,82 @@ if __name__ == "__main__":
     parser.add_argument(
         "--key", type=str, default="key_farmer_12345", help="API Key for authentication"
     )
+    parser.add_argument("--url", type=str, default=API_BASE_URL, help="API base URL")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=10,
+        help="Seconds between readings of each sensor when --rate is not given",
+    )
+    parser.add_argument(
+        "--virtual-sensors",
+        type=int,
+        default=0,
+        help="Number of simulated sensors, mapped onto the real ones (default: real)",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=0, help="Target readings per second overall"
+    )
+    parser.add_argument("--profile", choices=PROFILES, default="constant")
+    parser.add_argument(
+        "--ramp-seconds",
+        type=float,
+        default=60,
+        help="Ramp length, step span or sine period of the profile",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=None, help="Stop after N seconds"
+    )
     parser.add_argument(
-        "--interval", type=int, default=10, help="Seconds between readings"
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Readings per request; above 1 uses the batch ingest endpoint",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="Pooled keep-alive connections"
+    )
+    replay = parser.add_argument_group("replay")
+    replay.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        help="Replay a CSV/Arrow/Parquet export or a database URL instead",
+    )
+    replay.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier; 0 replays as fast as possible",
+    )
+    replay.add_argument(
+        "--start", type=_parse_timestamp, default=None, help="Skip readings before"
+    )
+    replay.add_argument(
+        "--end", type=_parse_timestamp, default=None, help="Stop at readings from"
+    )
+    replay.add_argument(
+        "--rebase",
+        action="store_true",
+        help="Shift timestamps so the first reading is sent as now",
+    )
+    replay.add_argument(
+        "--remap",
+        action="store_true",
+        help="Map recorded sensor ids onto the target's sensors",
+    )
+    replay.add_argument(
+        "--reorder-window",
+        type=int,
+        default=REPLAY_REORDER_WINDOW,
+        help="Readings buffered to put a slightly unordered source in order",
     )
     args = parser.parse_args()
-    run_simulation(args.key, args.interval)
\ No newline at end of file
+    try:
+        summary = asyncio.run(run_load(args))
+    except KeyboardInterrupt:
+        summary = None
+    if summary:
+        print("Summary:")
+        for key, value in summary.items():
+            print(f"  {key}: {value}")
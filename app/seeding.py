@@ -0,0 +1,214 @@
+import csv
+import datetime
+import io
+from typing import Iterator, Optional
+import numpy as np
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from app.database import Alert, Parcel, Sensor, SensorData
+
+SEED_CHUNK_ROWS = 200_000
+SEED_COMMIT_ROWS = 2_000_000
+SENSOR_TYPES = ("temperature", "soil_humidity", "luminosity")
+# (base, daily amplitude, uniform noise) of the synthetic readings per type.
+SENSOR_PROFILES = {
+    "temperature": (25.0, 5.0, 2.0),
+    "soil_humidity": (60.0, 5.0, 2.0),
+    "luminosity": (60.0, 5.0, 2.0),
+}
+SENSOR_THRESHOLDS = {
+    "temperature": (10.0, 35.0),
+    "soil_humidity": (30.0, 80.0),
+    "luminosity": (30.0, 80.0),
+}
+
+
+def seed_fleet(
+    session: Session, farmer_id: int, parcels: int, sensors_per_parcel: int
+) -> list[tuple[int, str]]:
+    """Insert `parcels` parcels with `sensors_per_parcel` sensors each.
+
+    Sensor types cycle through `SENSOR_TYPES`. Returns the (id, type) of
+    the new sensors in id order.
+    """
+    parcel_ids = session.execute(
+        insert(Parcel).returning(Parcel.id),
+        [
+            {
+                "name": f"Parcel {i + 1}",
+                "location": f"Zone {chr(ord('A') + i % 26)}",
+                "size": 10.0,
+                "crop_type": "Corn",
+                "farmer_id": farmer_id,
+            }
+            for i in range(parcels)
+        ],
+    ).scalars().all()
+    rows = []
+    for p_id in parcel_ids:
+        for i in range(sensors_per_parcel):
+            s_type = SENSOR_TYPES[i % len(SENSOR_TYPES)]
+            low, high = SENSOR_THRESHOLDS[s_type]
+            rows.append(
+                {
+                    "name": f"{s_type.replace('_', ' ').title()} Sensor {p_id}-{i + 1}",
+                    "type": s_type,
+                    "parcel_id": p_id,
+                    "threshold_low": low,
+                    "threshold_high": high,
+                }
+            )
+    session.execute(insert(Sensor), rows)
+    return session.exec(
+        select(Sensor.id, Sensor.type)
+        .where(Sensor.parcel_id.in_(parcel_ids))
+        .order_by(Sensor.id)
+    ).all()
+
+
+def generate_readings(
+    sensors: list[tuple[int, str]],
+    start: datetime.datetime,
+    steps: int,
+    interval_minutes: int,
+    seed: int,
+    alert_rate: float = 0.0,
+    chunk_rows: int = SEED_CHUNK_ROWS,
+) -> Iterator[tuple]:
+    """Synthetic readings for every sensor at every step, a chunk of steps at a time.
+
+    Values follow a daily sine per sensor type plus uniform noise, computed
+    as one (steps x sensors) array per chunk. Noise and alerts come from
+    separate streams of `seed`, and each chunk draws them in step order, so
+    the output does not depend on `chunk_rows`.
+
+    Yields:
+        tuple: (timestamps, values, alert_mask): datetime64[us] timestamps
+        of the chunk's steps, and (steps x sensors) values and alert flags.
+    """
+    noise_seed, alert_seed = np.random.SeedSequence(seed).spawn(2)
+    noise_rng = np.random.default_rng(noise_seed)
+    alert_rng = np.random.default_rng(alert_seed)
+    profiles = np.array([SENSOR_PROFILES[s_type] for _, s_type in sensors])
+    base, amplitude, noise = profiles[:, 0], profiles[:, 1], profiles[:, 2]
+    step = np.timedelta64(interval_minutes, "m")
+    origin = np.datetime64(start, "us")
+    steps_per_chunk = max(1, chunk_rows // len(sensors))
+    for first in range(0, steps, steps_per_chunk):
+        count = min(steps_per_chunk, steps - first)
+        timestamps = origin + np.arange(first, first + count) * step
+        midnight = timestamps.astype("datetime64[D]")
+        hours = (timestamps - midnight) / np.timedelta64(1, "h")
+        values = base + amplitude * np.sin(hours / 24 * 2 * np.pi)[:, None]
+        values = values + noise * noise_rng.uniform(-1.0, 1.0, values.shape)
+        if alert_rate > 0:
+            alerts = alert_rng.random(values.shape) < alert_rate
+        else:
+            alerts = np.zeros(values.shape, dtype=bool)
+        yield timestamps, values, alerts
+
+
+def _copy_readings(session: Session, rows: list[tuple]) -> bool:
+    """COPY rows into `sensordata` on PostgreSQL; False if the driver can't."""
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    dbapi = session.connection().connection.dbapi_connection
+    sql = "COPY sensordata (timestamp, sensor_id, value) FROM STDIN WITH (FORMAT csv)"
+    with dbapi.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        elif hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            return False
+    return True
+
+
+def write_readings(session: Session, sensor_ids: list[int], timestamps, values):
+    """Bulk-insert one (steps x sensors) chunk without building ORM objects.
+
+    PostgreSQL gets a COPY; other databases a single driver-level
+    executemany. Timestamps go through the column's own bind processor, once
+    per step, so they are stored exactly as SQLAlchemy would store them.
+    """
+    dialect = session.get_bind().dialect
+    column_type = SensorData.__table__.c.timestamp.type.dialect_impl(dialect)
+    process = column_type.bind_processor(dialect)
+    stamps = timestamps.astype(datetime.datetime).tolist()
+    if process is not None:
+        stamps = [process(ts) for ts in stamps]
+    rows = [
+        (ts, s_id, value)
+        for ts, row in zip(stamps, values.tolist())
+        for s_id, value in zip(sensor_ids, row)
+    ]
+    if _copy_readings(session, rows):
+        return
+    placeholder = "?" if dialect.paramstyle == "qmark" else "%s"
+    session.connection().exec_driver_sql(
+        f"INSERT INTO sensordata (timestamp, sensor_id, value) "
+        f"VALUES ({placeholder}, {placeholder}, {placeholder})",
+        rows,
+    )
+
+
+def seed_readings(
+    session: Session,
+    sensors: list[tuple[int, str]],
+    days: int,
+    interval_minutes: int,
+    seed: int,
+    alert_rate: float = 0.0,
+    end: Optional[datetime.datetime] = None,
+    commit_rows: int = SEED_COMMIT_ROWS,
+) -> tuple[int, int]:
+    """Seed `days` of readings every `interval_minutes` up to `end` (default now).
+
+    Steps are aligned to multiples of the interval since midnight. Commits
+    every `commit_rows` readings so the load runs in a few large
+    transactions. With `alert_rate`, that fraction of readings also gets
+    an open warning alert. Returns the number of readings and alerts.
+    """
+    if not sensors:
+        return 0, 0
+    end = end or datetime.datetime.utcnow()
+    step = datetime.timedelta(minutes=interval_minutes)
+    steps = days * 24 * 60 // interval_minutes
+    midnight = end.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = midnight + step * ((end - midnight) // step - steps + 1)
+    sensor_ids = [s_id for s_id, _ in sensors]
+    types = [s_type for _, s_type in sensors]
+    readings = alerts = uncommitted = 0
+    for timestamps, values, alert_mask in generate_readings(
+        sensors, start, steps, interval_minutes, seed, alert_rate
+    ):
+        write_readings(session, sensor_ids, timestamps, values)
+        step_idx, sensor_idx = np.nonzero(alert_mask)
+        if len(step_idx):
+            session.execute(
+                insert(Alert),
+                [
+                    {
+                        "sensor_id": sensor_ids[j],
+                        "message": f"Abnormal {types[j]} detected: {values[i, j]:.1f}",
+                        "level": "warning",
+                        "created_at": timestamps[i].astype(datetime.datetime),
+                        "is_active": True,
+                        "acknowledged": False,
+                    }
+                    for i, j in zip(step_idx.tolist(), sensor_idx.tolist())
+                ],
+            )
+            alerts += len(step_idx)
+        readings += values.size
+        uncommitted += values.size
+        if uncommitted >= commit_rows:
+            session.commit()
+            uncommitted = 0
+    session.commit()
+    return readings, alerts
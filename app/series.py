@@ -0,0 +1,40 @@
+from typing import Any, Iterable, Optional
+
+
+def empty_series(key: str) -> dict:
+    return {"key": key, "index": [], "columns": {}}
+
+
+def make_series(key: str, index: list, columns: dict[str, list]) -> dict:
+    """Columnar chart payload: one index array plus one value array per column.
+
+    Keys are sent once per chart instead of once per point; missing values
+    are `None`. Rows for recharts are rebuilt on the client by
+    `app.components.charts.series_rows`.
+    """
+    return {"key": key, "index": index, "columns": columns}
+
+
+def rows_to_series(rows: Iterable[dict], key: str, columns: list[str]) -> dict:
+    rows = list(rows)
+    return make_series(
+        key,
+        [row[key] for row in rows],
+        {col: [row.get(col) for row in rows] for col in columns},
+    )
+
+
+def series_to_rows(series: Optional[dict]) -> list[dict]:
+    """Expand a columnar series back into row dicts, omitting missing values."""
+    if not series or not series.get("index"):
+        return []
+    key = series["key"]
+    columns = series["columns"].items()
+    rows = []
+    for i, x in enumerate(series["index"]):
+        row: dict[str, Any] = {key: x}
+        for col, values in columns:
+            if values[i] is not None:
+                row[col] = values[i]
+        rows.append(row)
+    return rows
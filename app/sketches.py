@@ -0,0 +1,96 @@
+from typing import Optional
+
+
+class TDigest:
+    """Mergeable streaming quantile sketch (merging t-digest).
+
+    Values are buffered and periodically folded into weighted centroids whose
+    size is bounded by the k-scale `4 * n * q * (1 - q) / compression`, so the
+    tails stay accurate while the memory stays O(compression). Digests of
+    fine buckets can be merged into the digest of a coarser bucket without
+    revisiting the raw values. Exact min and max are tracked alongside.
+    """
+
+    __slots__ = ("compression", "count", "min", "max", "_means", "_weights", "_buffer")
+
+    def __init__(self, compression: float = 50.0):
+        self.compression = compression
+        self.count = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._means: list[float] = []
+        self._weights: list[float] = []
+        self._buffer: list[tuple[float, float]] = []
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) > 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest into this one."""
+        if not other.count:
+            return
+        other._compress()
+        self._buffer.extend(zip(other._means, other._weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self._buffer) > 5 * self.compression:
+            self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        items = sorted(list(zip(self._means, self._weights)) + self._buffer)
+        self._buffer = []
+        means: list[float] = []
+        weights: list[float] = []
+        total = self.count
+        cur_mean, cur_weight = items[0]
+        weight_so_far = 0.0
+        for mean, weight in items[1:]:
+            q = (weight_so_far + cur_weight + weight / 2) / total
+            limit = 4 * total * q * (1 - q) / self.compression
+            if cur_weight + weight <= max(limit, 1.0):
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                means.append(cur_mean)
+                weights.append(cur_weight)
+                weight_so_far += cur_weight
+                cur_mean, cur_weight = mean, weight
+        means.append(cur_mean)
+        weights.append(cur_weight)
+        self._means = means
+        self._weights = weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile `q` (0.0-1.0)."""
+        if not self.count:
+            return None
+        self._compress()
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        target = q * self.count
+        means, weights = self._means, self._weights
+        center = weights[0] / 2
+        if target <= center:
+            return self.min + (means[0] - self.min) * target / center
+        for i in range(len(means) - 1):
+            next_center = center + (weights[i] + weights[i + 1]) / 2
+            if target <= next_center:
+                frac = (target - center) / (next_center - center)
+                return means[i] + (means[i + 1] - means[i]) * frac
+            center = next_center
+        tail = self.count - center
+        if tail <= 0:
+            return self.max
+        return means[-1] + (self.max - means[-1]) * (target - center) / tail
@@ -1,26 +1,81 @@
+import datetime
 import reflex as rx
-from sqlmodel import select, desc, and_
+from typing import Any, Optional
+from sqlmodel import select, desc
+from app.alert_actions import bulk_update_alerts
 from app.database import Alert, Sensor, Parcel
+from app.queries import (
+    HISTORY_LIVE,
+    count_alerts_by_period,
+    fetch_alert_history_page,
+)
+from app.series import empty_series, make_series
 from app.states.auth_state import AuthState
 
+HISTORY_PAGE_SIZE = 50
+
+
+def _parse_date(value: str) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _history_row(row) -> dict:
+    return {
+        "id": row.id,
+        "sensor": row.sensor,
+        "sensor_id": row.sensor_id,
+        "parcel": row.parcel,
+        "parcel_id": row.parcel_id,
+        "message": row.message,
+        "level": row.level,
+        "time": row.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "created_at": row.created_at.isoformat(),
+        "status": row.status,
+        "source": row.source,
+        "key": row.key,
+    }
+
 
 class AlertState(rx.State):
     """State management for the alerts system.
 
     Handles fetching and filtering of system alerts, separating them into
-    active (unacknowledged) and historical lists.
+    active (unacknowledged) and historical lists. Acknowledging or resolving
+    alerts, one or many at a time, is a single set-based update after which
+    the affected rows are moved between the lists in place instead of
+    reloading them.
+
+    History, archived alerts included, is paged by keyset on
+    `(created_at, source, key)` and filtered by level, parcel and date range.
     """
 
     active_alerts: list[dict] = []
     alert_history: list[dict] = []
+    selected_ids: list[int] = []
     filter_type: str = "all"
+    parcel_options: list[dict] = []
+    history_level: str = "all"
+    history_parcel: str = "all"
+    history_start: str = ""
+    history_end: str = ""
+    history_page: int = 1
+    history_has_more: bool = False
+    count_period: str = "day"
+    period_counts: dict[str, Any] = empty_series("period")
+    # Keyset of the first row of each page before the current one; page 1
+    # starts at the top so it has no entry.
+    _page_keys: list[tuple[str, int, int]] = []
 
     @rx.event
     async def load_alerts(self):
         """Fetch and categorize active and historical alerts for the current user.
 
         Populates `active_alerts` with triggered, unacknowledged warnings,
-        and `alert_history` with resolved or acknowledged past alerts.
+        and `alert_history` with the first page of resolved or acknowledged
+        past alerts.
         """
         auth_state = await self.get_state(AuthState)
         if not auth_state.user:
@@ -29,8 +84,9 @@ class AlertState(rx.State):
         with rx.session() as session:
             active_query = (
                 select(Alert, Sensor, Parcel)
-                .join(Sensor)
-                .join(Parcel)
+                .select_from(Alert)
+                .join(Sensor, Alert.sensor_id == Sensor.id)
+                .join(Parcel, Sensor.parcel_id == Parcel.id)
                 .where(
                     Parcel.farmer_id == user_id,
                     Alert.is_active == True,
@@ -45,55 +101,219 @@ class AlertState(rx.State):
                     "sensor": row.Sensor.name,
                     "sensor_id": row.Sensor.id,
                     "parcel": row.Parcel.name,
+                    "parcel_id": row.Parcel.id,
                     "message": row.Alert.message,
                     "level": row.Alert.level,
                     "time": row.Alert.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    "created_at": row.Alert.created_at.isoformat(),
                 }
                 for row in active_results
             ]
-            history_query = (
-                select(Alert, Sensor, Parcel)
-                .join(Sensor)
-                .join(Parcel)
-                .where(
-                    Parcel.farmer_id == user_id,
-                    (Alert.acknowledged == True) | (Alert.is_active == False),
-                )
-                .order_by(desc(Alert.created_at))
-                .limit(50)
-            )
-            history_results = session.exec(history_query).all()
-            self.alert_history = [
-                {
-                    "id": row.Alert.id,
-                    "sensor": row.Sensor.name,
-                    "sensor_id": row.Sensor.id,
-                    "parcel": row.Parcel.name,
-                    "message": row.Alert.message,
-                    "level": row.Alert.level,
-                    "time": row.Alert.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    "status": "Resolved" if not row.Alert.is_active else "Acknowledged",
-                }
-                for row in history_results
+            self.parcel_options = [
+                {"id": str(p_id), "name": name}
+                for p_id, name in session.exec(
+                    select(Parcel.id, Parcel.name)
+                    .where(Parcel.farmer_id == user_id)
+                    .order_by(Parcel.name)
+                ).all()
             ]
+            self.history_page = 1
+            self._page_keys = []
+            self._load_history(session, user_id, None)
+            self._load_counts(session, user_id)
+        self.selected_ids = []
+
+    def _history_filters(self) -> dict:
+        end = _parse_date(self.history_end)
+        return {
+            "level": None if self.history_level == "all" else self.history_level,
+            "parcel_id": (
+                None if self.history_parcel == "all" else int(self.history_parcel)
+            ),
+            "start": _parse_date(self.history_start),
+            "end": end + datetime.timedelta(days=1) if end else None,
+        }
+
+    def _load_history(self, session, user_id: int, before: Optional[tuple]):
+        rows, has_more = fetch_alert_history_page(
+            session,
+            user_id,
+            before=before,
+            page_size=HISTORY_PAGE_SIZE,
+            **self._history_filters(),
+        )
+        self.alert_history = [_history_row(row) for row in rows]
+        self.history_has_more = has_more
+
+    def _load_counts(self, session, user_id: int):
+        counts = count_alerts_by_period(
+            session, user_id, self.count_period, **self._history_filters()
+        )
+        self.period_counts = make_series(
+            "period",
+            [period for period, _ in counts],
+            {"alerts": [count for _, count in counts]},
+        )
 
     @rx.event
-    def acknowledge_alert(self, alert_id: int):
+    async def load_history(self):
+        """Reload the first history page and the period counts for the filters."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
+        self.history_page = 1
+        self._page_keys = []
+        with rx.session() as session:
+            self._load_history(session, auth_state.user.id, None)
+            self._load_counts(session, auth_state.user.id)
+
+    async def _goto_page(self, page: int, before: Optional[tuple[str, int, int]]):
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
+        key = None
+        if before is not None:
+            key = (datetime.datetime.fromisoformat(before[0]), before[1], before[2])
         with rx.session() as session:
-            alert = session.get(Alert, alert_id)
-            if alert:
-                alert.acknowledged = True
-                session.add(alert)
-                session.commit()
-        return [AlertState.load_alerts, rx.toast.success("Alert acknowledged.")]
+            self._load_history(session, auth_state.user.id, key)
+        self.history_page = page
 
     @rx.event
-    def resolve_alert(self, alert_id: int):
+    async def next_history_page(self):
+        if not self.history_has_more or not self.alert_history:
+            return
+        last = self.alert_history[-1]
+        before = (last["created_at"], last["source"], last["key"])
+        self._page_keys = self._page_keys + [before]
+        await self._goto_page(self.history_page + 1, before)
+
+    @rx.event
+    async def prev_history_page(self):
+        if self.history_page <= 1:
+            return
+        self._page_keys = self._page_keys[:-1]
+        before = self._page_keys[-1] if self._page_keys else None
+        await self._goto_page(self.history_page - 1, before)
+
+    @rx.event
+    def set_history_level(self, value: str):
+        self.history_level = value
+        return AlertState.load_history
+
+    @rx.event
+    def set_history_parcel(self, value: str):
+        self.history_parcel = value
+        return AlertState.load_history
+
+    @rx.event
+    def set_history_start(self, value: str):
+        self.history_start = value
+        return AlertState.load_history
+
+    @rx.event
+    def set_history_end(self, value: str):
+        self.history_end = value
+        return AlertState.load_history
+
+    @rx.event
+    def set_count_period(self, value: str):
+        self.count_period = value
+        return AlertState.load_history
+
+    @rx.var
+    def selected_count(self) -> int:
+        return len(self.selected_ids)
+
+    @rx.event
+    def toggle_selected(self, alert_id: int, checked: bool):
+        if checked and alert_id not in self.selected_ids:
+            self.selected_ids = self.selected_ids + [alert_id]
+        elif not checked:
+            self.selected_ids = [i for i in self.selected_ids if i != alert_id]
+
+    @rx.event
+    def toggle_select_all(self):
+        if len(self.selected_ids) == len(self.active_alerts):
+            self.selected_ids = []
+        else:
+            self.selected_ids = [a["id"] for a in self.active_alerts]
+
+    async def _apply(self, action: str, **filters):
+        """Run one bulk update for the current user and refresh the lists in place."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
         with rx.session() as session:
-            alert = session.get(Alert, alert_id)
-            if alert:
-                alert.is_active = False
-                alert.acknowledged = True
-                session.add(alert)
-                session.commit()
-        return [AlertState.load_alerts, rx.toast.success("Alert marked as resolved.")]
\ No newline at end of file
+            changed = bulk_update_alerts(session, auth_state.user.id, action, **filters)
+            session.commit()
+        self._move_to_history(set(changed), action)
+        verb = "acknowledged" if action == "acknowledge" else "marked as resolved"
+        noun = "Alert" if len(changed) == 1 else f"{len(changed)} alerts"
+        return rx.toast.success(f"{noun} {verb}.")
+
+    def _shown_in_history(self, alert: dict) -> bool:
+        """Whether a newly moved alert belongs on the first history page."""
+        filters = self._history_filters()
+        created_at = datetime.datetime.fromisoformat(alert["created_at"])
+        return (
+            self.history_page == 1
+            and filters["level"] in (None, alert["level"])
+            and filters["parcel_id"] in (None, alert["parcel_id"])
+            and (filters["start"] is None or created_at >= filters["start"])
+            and (filters["end"] is None or created_at < filters["end"])
+        )
+
+    def _move_to_history(self, changed: set[int], action: str):
+        status = "Acknowledged" if action == "acknowledge" else "Resolved"
+        moved = [
+            {**a, "status": status, "source": HISTORY_LIVE, "key": a["id"]}
+            for a in self.active_alerts
+            if a["id"] in changed and self._shown_in_history(a)
+        ]
+        self.active_alerts = [a for a in self.active_alerts if a["id"] not in changed]
+        history = [
+            {**a, "status": status} if a["id"] in changed else a
+            for a in self.alert_history
+        ]
+        history = sorted(
+            moved + history,
+            key=lambda a: (a["created_at"], a["source"], a["key"]),
+            reverse=True,
+        )
+        if len(history) > HISTORY_PAGE_SIZE:
+            history = history[:HISTORY_PAGE_SIZE]
+            self.history_has_more = True
+        self.alert_history = history
+        self.selected_ids = [i for i in self.selected_ids if i not in changed]
+
+    @rx.event
+    async def acknowledge_alert(self, alert_id: int):
+        return await self._apply("acknowledge", alert_ids=[alert_id])
+
+    @rx.event
+    async def resolve_alert(self, alert_id: int):
+        return await self._apply("resolve", alert_ids=[alert_id])
+
+    @rx.event
+    async def acknowledge_selected(self):
+        return await self._apply("acknowledge", alert_ids=list(self.selected_ids))
+
+    @rx.event
+    async def resolve_selected(self):
+        return await self._apply("resolve", alert_ids=list(self.selected_ids))
+
+    @rx.event
+    async def resolve_sensor_alerts(self, sensor_id: int):
+        return await self._apply("resolve", sensor_id=sensor_id)
+
+    @rx.event
+    async def resolve_parcel_alerts(self, parcel_id: int):
+        return await self._apply("resolve", parcel_id=parcel_id)
+
+    @rx.event
+    async def acknowledge_all(self):
+        return await self._apply("acknowledge")
+
+    @rx.event
+    async def resolve_all(self):
+        return await self._apply("resolve")
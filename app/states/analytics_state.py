@@ -1,14 +1,32 @@
 import reflex as rx
+import asyncio
 import datetime
-import csv
-import json
-import io
 import logging
+import uuid
 from sqlmodel import select, and_
 from typing import Any, Optional
+from app.analytics import build_csv_export, build_json_export, compute_analytics
+from app.analytics_cache import analytics_cache, analytics_cache_key
+from app.series import empty_series, series_to_rows
 from app.database import Parcel, Sensor, SensorData, User
+from app.jobs import JobQueueFull, job_runner
 from app.states.auth_state import AuthState
 
+FETCH_DEBOUNCE_SECONDS = 0.35
+FETCH_POLL_SECONDS = 0.2
+MAX_COMPARE_SENSORS = 50
+CHART_SENSOR_LIMIT = 5
+CORRELATION_ROWS = 25
+SERVER_BUSY_MESSAGE = "The server is busy, please try again shortly."
+
+
+def _format_lag(lag_s: int) -> str:
+    if lag_s == 0:
+        return "0"
+    if abs(lag_s) < 3600:
+        return f"{lag_s // 60:+d} min"
+    return f"{lag_s / 3600:+.1f} h"
+
 
 class AnalyticsState(rx.State):
     """State management for the data analytics and visualization page.
@@ -24,9 +42,19 @@ class AnalyticsState(rx.State):
     end_date: str = ""
     chart_type: str = "line"
     aggregation: str = "raw"
-    chart_data: list[dict] = []
+    operator: str = "none"
+    gap_fill: str = "none"
+    chart_series: dict[str, Any] = empty_series("name")
+    has_chart_data: bool = False
     sensor_stats: list[dict] = []
+    correlations: list[dict] = []
     is_loading: bool = False
+    job_id: str = ""
+    job_progress: int = 0
+    _fetch_seq: int = 0
+    # Pacing of `fetch_analytics_data`; the benchmark suite turns both down.
+    _fetch_debounce_s: float = FETCH_DEBOUNCE_SECONDS
+    _fetch_poll_s: float = FETCH_POLL_SECONDS
     colors: list[str] = ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6"]
 
     @rx.var
@@ -41,10 +69,27 @@ class AnalyticsState(rx.State):
                         "name": f"{sensor['parcel_name']} - {sensor['name']}",
                         "color": self.colors[idx % len(self.colors)],
                         "data_key": f"sensor_{s_id}",
+                        "min_key": f"sensor_{s_id}_min",
+                        "p10_key": f"sensor_{s_id}_p10",
+                        "p90_key": f"sensor_{s_id}_p90",
+                        "max_key": f"sensor_{s_id}_max",
                     }
                 )
         return legend
 
+    @rx.var
+    def chart_legend(self) -> list[dict]:
+        """Sensors drawn on the chart; the rest only feed stats and correlations."""
+        return self.current_sensors_legend[:CHART_SENSOR_LIMIT]
+
+    @rx.var
+    def chart_is_truncated(self) -> bool:
+        return len(self.selected_sensor_ids) > CHART_SENSOR_LIMIT
+
+    @rx.var
+    def is_band_mode(self) -> bool:
+        return self.aggregation.endswith("_bands")
+
     @rx.event
     async def load_initial_data(self):
         """Load available sensors and default data."""
@@ -72,7 +117,7 @@ class AnalyticsState(rx.State):
             ]
             if not self.selected_sensor_ids and self.available_sensors:
                 self.selected_sensor_ids = [self.available_sensors[0]["id"]]
-        await self.fetch_analytics_data()
+        return AnalyticsState.fetch_analytics_data
 
     @rx.event
     def set_preset_dates(self, preset: str):
@@ -90,164 +135,252 @@ class AnalyticsState(rx.State):
         self.start_date = start.strftime("%Y-%m-%d")
 
     @rx.event
-    async def set_range_preset(self, value: str):
+    def set_range_preset(self, value: str):
         self.date_range_preset = value
         if value != "custom":
             self.set_preset_dates(value)
-        await self.fetch_analytics_data()
+        return AnalyticsState.fetch_analytics_data
 
     @rx.event
-    async def set_custom_start_date(self, value: str):
+    def set_custom_start_date(self, value: str):
         self.start_date = value
         self.date_range_preset = "custom"
-        await self.fetch_analytics_data()
+        return AnalyticsState.fetch_analytics_data
 
     @rx.event
-    async def set_custom_end_date(self, value: str):
+    def set_custom_end_date(self, value: str):
         self.end_date = value
         self.date_range_preset = "custom"
-        await self.fetch_analytics_data()
+        return AnalyticsState.fetch_analytics_data
 
     @rx.event
-    async def toggle_sensor(self, sensor_id: int, checked: bool):
+    def toggle_sensor(self, sensor_id: int, checked: bool):
         if checked:
-            if len(self.selected_sensor_ids) >= 5:
-                return rx.toast.warning("Max 5 sensors can be compared at once.")
+            if len(self.selected_sensor_ids) >= MAX_COMPARE_SENSORS:
+                return rx.toast.warning(
+                    f"Max {MAX_COMPARE_SENSORS} sensors can be compared at once."
+                )
             if sensor_id not in self.selected_sensor_ids:
                 self.selected_sensor_ids.append(sensor_id)
         elif sensor_id in self.selected_sensor_ids:
             self.selected_sensor_ids.remove(sensor_id)
-        await self.fetch_analytics_data()
+        return AnalyticsState.fetch_analytics_data
 
     @rx.event
     def set_chart_type_val(self, value: str):
         self.chart_type = value
 
     @rx.event
-    async def set_aggregation_val(self, value: str):
+    def set_aggregation_val(self, value: str):
         self.aggregation = value
-        await self.fetch_analytics_data()
+        return AnalyticsState.fetch_analytics_data
+
+    @rx.event
+    def set_operator_val(self, value: str):
+        self.operator = value
+        return AnalyticsState.fetch_analytics_data
 
     @rx.event
+    def set_gap_fill_val(self, value: str):
+        self.gap_fill = value
+        return AnalyticsState.fetch_analytics_data
+
+    @rx.event(background=True)
     async def fetch_analytics_data(self):
         """Fetch historical sensor data and process it for visualization.
 
-        Retrieves data from the database based on selected sensors and date range,
-        then aggregates it (raw, hourly, or daily) to populate the chart.
+        The query and aggregation run on the shared job runner; this background
+        event only polls the job, so the client's event queue stays responsive
+        and `job_progress` shows how far the computation is.
+
+        Requests are coalesced: each call waits for a short debounce window and
+        gives up if a newer call arrived meanwhile, and a running job is
+        cancelled as soon as a newer request supersedes it. Only the latest
+        parameter set is ever computed and applied.
         """
-        self.is_loading = True
-        yield
-        if not self.selected_sensor_ids or not self.start_date or (not self.end_date):
-            self.chart_data = []
-            self.sensor_stats = []
-            self.is_loading = False
-            return
+        async with self:
+            self._fetch_seq += 1
+            seq = self._fetch_seq
+            self.is_loading = True
+            debounce_s = self._fetch_debounce_s
+            poll_s = self._fetch_poll_s
+        await asyncio.sleep(debounce_s)
+        async with self:
+            if self._fetch_seq != seq:
+                return
+            sensor_ids = list(self.selected_sensor_ids)
+            start_date = self.start_date
+            end_date = self.end_date
+            aggregation = self.aggregation
+            operator = self.operator
+            gap_fill = self.gap_fill
+            if not sensor_ids or not start_date or (not end_date):
+                self.chart_series = empty_series("name")
+                self.has_chart_data = False
+                self.sensor_stats = []
+                self.correlations = []
+                self.is_loading = False
+                return
         try:
-            start_dt = datetime.datetime.strptime(self.start_date, "%Y-%m-%d")
+            start_dt = datetime.datetime.strptime(start_date, "%Y-%m-%d")
             end_dt = datetime.datetime.strptime(
-                self.end_date, "%Y-%m-%d"
+                end_date, "%Y-%m-%d"
             ) + datetime.timedelta(days=1)
         except ValueError as e:
             logging.exception(f"Error parsing dates: {e}")
-            self.is_loading = False
+            async with self:
+                self.is_loading = False
             yield rx.toast.error("Invalid date format")
             return
-        with rx.session() as session:
-            query = (
-                select(SensorData)
-                .where(
-                    SensorData.sensor_id.in_(self.selected_sensor_ids),
-                    SensorData.timestamp >= start_dt,
-                    SensorData.timestamp < end_dt,
-                )
-                .order_by(SensorData.timestamp)
+        cache_key = analytics_cache_key(
+            sensor_ids, start_dt, end_dt, aggregation, operator, gap_fill
+        )
+        cached = analytics_cache.get(cache_key)
+        if cached is not None:
+            async with self:
+                if self._fetch_seq != seq:
+                    return
+                self._apply_analytics(sensor_ids, cached)
+                skipped = self._skipped_message(cached)
+            if skipped:
+                yield rx.toast.info(skipped)
+            return
+        submitter = uuid.uuid4().hex
+        try:
+            job = job_runner.submit(
+                compute_analytics,
+                sensor_ids,
+                start_dt,
+                end_dt,
+                aggregation,
+                operator,
+                gap_fill,
+                key=("analytics", analytics_cache.generation) + cache_key,
+                submitter=submitter,
             )
-            raw_data = session.exec(query).all()
-        buckets = {}
-        sensor_values = {s_id: [] for s_id in self.selected_sensor_ids}
-        for record in raw_data:
-            ts = record.timestamp
-            val = record.value
-            s_id = record.sensor_id
-            if self.aggregation == "hour":
-                key = ts.strftime("%Y-%m-%d %H:00")
-            elif self.aggregation == "day":
-                key = ts.strftime("%Y-%m-%d")
+        except JobQueueFull:
+            async with self:
+                self.is_loading = False
+            yield rx.toast.warning(SERVER_BUSY_MESSAGE)
+            return
+        async with self:
+            self.job_progress = 0
+            self.job_id = job.id
+        while not job.done:
+            await asyncio.sleep(poll_s)
+            async with self:
+                if self._fetch_seq != seq:
+                    job_runner.cancel(job.id, submitter)
+                    return
+                self.job_progress = int(job.progress * 100)
+        async with self:
+            if self._fetch_seq != seq:
+                return
+            self.job_id = ""
+            skipped = ""
+            if job.status == "done":
+                self._apply_analytics(sensor_ids, job.result)
+                skipped = self._skipped_message(job.result)
             else:
-                key = ts.strftime("%Y-%m-%d %H:%M:%S")
-            if key not in buckets:
-                buckets[key] = {"timestamp": key, "original_ts": ts}
-            if f"values_{s_id}" not in buckets[key]:
-                buckets[key][f"values_{s_id}"] = []
-            buckets[key][f"values_{s_id}"].append(val)
-            sensor_values[s_id].append(val)
-        final_data = []
-        sorted_keys = sorted(buckets.keys())
-        for key in sorted_keys:
-            item = {"name": key}
-            bucket = buckets[key]
-            for s_id in self.selected_sensor_ids:
-                vals = bucket.get(f"values_{s_id}", [])
-                if vals:
-                    avg_val = sum(vals) / len(vals)
-                    item[f"sensor_{s_id}"] = round(avg_val, 2)
-            final_data.append(item)
-        self.chart_data = final_data
-        stats = []
-        for s_id in self.selected_sensor_ids:
-            vals = sensor_values[s_id]
-            sensor_info = next(
-                (s for s in self.available_sensors if s["id"] == s_id), None
-            )
-            if vals and sensor_info:
-                stats.append(
-                    {
-                        "name": sensor_info["name"],
-                        "parcel": sensor_info["parcel_name"],
-                        "type": sensor_info["type"],
-                        "min": round(min(vals), 2),
-                        "max": round(max(vals), 2),
-                        "avg": round(sum(vals) / len(vals), 2),
-                        "count": len(vals),
-                    }
-                )
-        self.sensor_stats = stats
+                self.is_loading = False
+        if skipped:
+            yield rx.toast.info(skipped)
+        if job.status == "failed":
+            yield rx.toast.error("Could not load analytics data.")
+
+    def _skipped_message(self, result: dict) -> str:
+        """Name the selected sensors the operator was not applied to, if any."""
+        sensors = {s["id"]: s["name"] for s in self.available_sensors}
+        names = [sensors[s_id] for s_id in result["skipped"] if s_id in sensors]
+        if not names:
+            return ""
+        return (
+            "Growing degree days only apply to temperature sensors; skipped "
+            f"{', '.join(names)}."
+        )
+
+    def _apply_analytics(self, sensor_ids: list[int], result: dict):
+        """Copy a computed (possibly cached and shared) result into state."""
+        self.chart_series = result["chart"]
+        self.has_chart_data = bool(result["chart"]["index"])
+        sensors = {s["id"]: s for s in self.available_sensors}
+        self.sensor_stats = [
+            {
+                "name": sensors[s_id]["name"],
+                "parcel": sensors[s_id]["parcel_name"],
+                "type": sensors[s_id]["type"],
+                **result["stats"][s_id],
+            }
+            for s_id in sensor_ids
+            if s_id in result["stats"] and s_id in sensors
+        ]
+        self.correlations = [
+            {
+                "a": sensors[pair["a"]]["name"],
+                "b": sensors[pair["b"]]["name"],
+                "pearson": pair["pearson"],
+                "spearman": pair["spearman"],
+                "lag": _format_lag(pair["lag_s"]),
+                "lag_r": pair["lag_r"],
+                "overlap": pair["overlap"],
+            }
+            for pair in result["correlation"]
+            if pair["a"] in sensors and pair["b"] in sensors
+        ][:CORRELATION_ROWS]
         self.is_loading = False
 
     @rx.event
-    def download_csv(self):
+    def cancel_fetch(self):
+        """Cancel the pending or running analytics fetch, keeping the previous chart.
+
+        The fetch's poll loop sees the bumped sequence and cancels its job.
+        """
+        self._fetch_seq += 1
+        self.job_id = ""
+        self.is_loading = False
+
+    @rx.event(background=True)
+    async def download_csv(self):
         """Generate and download CSV export."""
-        if not self.chart_data:
-            return rx.toast.error("No data to export.")
-        output = io.StringIO()
-        writer = csv.writer(output)
-        headers = ["Timestamp"]
-        for item in self.current_sensors_legend:
-            headers.append(item["name"])
-        writer.writerow(headers)
-        for row in self.chart_data:
-            csv_row = [row["name"]]
-            for item in self.current_sensors_legend:
-                key = item["data_key"]
-                csv_row.append(row.get(key, ""))
-            writer.writerow(csv_row)
-        return rx.download(
-            data=output.getvalue(),
-            filename=f"sensor_data_{self.start_date}_to_{self.end_date}.csv",
-        )
+        async with self:
+            legend = [dict(item) for item in self.current_sensors_legend]
+            rows = series_to_rows(self.chart_series)
+            filename = f"sensor_data_{self.start_date}_to_{self.end_date}.csv"
+        if not rows:
+            yield rx.toast.error("No data to export.")
+            return
+        try:
+            job = job_runner.submit(build_csv_export, legend, rows)
+        except JobQueueFull:
+            yield rx.toast.warning(SERVER_BUSY_MESSAGE)
+            return
+        job = await job_runner.wait(job)
+        if job.status != "done":
+            yield rx.toast.error("Export failed.")
+            return
+        yield rx.download(data=job.result, filename=filename)
 
-    @rx.event
-    def download_json(self):
+    @rx.event(background=True)
+    async def download_json(self):
         """Generate and download JSON export."""
-        if not self.chart_data:
-            return rx.toast.error("No data to export.")
-        data_export = {
-            "period": {"start": self.start_date, "end": self.end_date},
-            "sensors": [s["name"] for s in self.current_sensors_legend],
-            "data": self.chart_data,
-            "statistics": self.sensor_stats,
-        }
-        return rx.download(
-            data=json.dumps(data_export, indent=2),
-            filename=f"sensor_data_{self.start_date}_to_{self.end_date}.json",
-        )
\ No newline at end of file
+        async with self:
+            data_export = {
+                "period": {"start": self.start_date, "end": self.end_date},
+                "sensors": [s["name"] for s in self.current_sensors_legend],
+                "data": series_to_rows(self.chart_series),
+                "statistics": [dict(stat) for stat in self.sensor_stats],
+            }
+            filename = f"sensor_data_{self.start_date}_to_{self.end_date}.json"
+        if not data_export["data"]:
+            yield rx.toast.error("No data to export.")
+            return
+        try:
+            job = job_runner.submit(build_json_export, data_export)
+        except JobQueueFull:
+            yield rx.toast.warning(SERVER_BUSY_MESSAGE)
+            return
+        job = await job_runner.wait(job)
+        if job.status != "done":
+            yield rx.toast.error("Export failed.")
+            return
+        yield rx.download(data=job.result, filename=filename)
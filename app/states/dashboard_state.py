@@ -2,8 +2,10 @@ import reflex as rx
 import datetime
 from sqlmodel import select, func, desc
 from typing import Any, Optional
+from app.alert_actions import bulk_update_alerts
 from app.database import Parcel, Sensor, SensorData, Alert
 from app.states.auth_state import AuthState
+from app.series import empty_series, make_series
 
 
 class DashboardState(rx.State):
@@ -18,7 +20,8 @@ class DashboardState(rx.State):
     active_alerts_count: int = 0
     active_alerts: list[dict[str, str | int | bool]] = []
     recent_readings: list[dict[str, str | float | int]] = []
-    chart_data: list[dict[str, str | float | int]] = []
+    chart_series: dict[str, Any] = empty_series("time")
+    has_chart_data: bool = False
     time_filter: str = "24h"
     selected_sensor_type: str = "temperature"
     is_loading: bool = False
@@ -73,8 +76,9 @@ class DashboardState(rx.State):
             self.active_alerts_count = len(self.active_alerts)
             readings_query = (
                 select(SensorData, Sensor, Parcel)
-                .join(Sensor)
-                .join(Parcel)
+                .select_from(SensorData)
+                .join(Sensor, SensorData.sensor_id == Sensor.id)
+                .join(Parcel, Sensor.parcel_id == Parcel.id)
                 .where(Parcel.farmer_id == user_id)
                 .order_by(desc(SensorData.timestamp))
                 .limit(10)
@@ -115,21 +119,15 @@ class DashboardState(rx.State):
             .order_by(SensorData.timestamp)
         )
         data_points = session.exec(query).all()
-        formatted_data = []
-        if data_points:
-            step = max(1, len(data_points) // 50)
-            for i in range(0, len(data_points), step):
-                point = data_points[i]
-                formatted_data.append(
-                    {
-                        "time": point.timestamp.strftime(
-                            "%H:%M" if self.time_filter == "24h" else "%m-%d"
-                        ),
-                        "value": round(point.value, 1),
-                        "full_date": point.timestamp.strftime("%Y-%m-%d %H:%M"),
-                    }
-                )
-        self.chart_data = formatted_data
+        step = max(1, len(data_points) // 50)
+        sampled = data_points[::step]
+        time_format = "%H:%M" if self.time_filter == "24h" else "%m-%d"
+        self.chart_series = make_series(
+            "time",
+            [point.timestamp.strftime(time_format) for point in sampled],
+            {"value": [round(point.value, 1) for point in sampled]},
+        )
+        self.has_chart_data = bool(sampled)
 
     @rx.event
     async def set_time_filter(self, value: str):
@@ -141,12 +139,25 @@ class DashboardState(rx.State):
         self.selected_sensor_type = value
         await self.load_dashboard_data()
 
-    @rx.event
-    def acknowledge_alert(self, alert_id: int):
+    async def _acknowledge(self, alert_ids: Optional[list[int]] = None):
+        """Acknowledge alerts in one update and drop them from the list in place."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
         with rx.session() as session:
-            alert = session.get(Alert, alert_id)
-            if alert:
-                alert.acknowledged = True
-                session.add(alert)
-                session.commit()
-        return DashboardState.load_dashboard_data
\ No newline at end of file
+            changed = set(
+                bulk_update_alerts(
+                    session, auth_state.user.id, "acknowledge", alert_ids=alert_ids
+                )
+            )
+            session.commit()
+        self.active_alerts = [a for a in self.active_alerts if a["id"] not in changed]
+        self.active_alerts_count = len(self.active_alerts)
+
+    @rx.event
+    async def acknowledge_alert(self, alert_id: int):
+        await self._acknowledge([alert_id])
+
+    @rx.event
+    async def acknowledge_all_alerts(self):
+        await self._acknowledge()
@@ -1,8 +1,24 @@
 import reflex as rx
+import asyncio
+import datetime
 import logging
 from sqlmodel import select
 from typing import Optional
 from app.database import Parcel, Sensor, User
+from app.read_models import ParcelView, SensorView
+from app.queries import fetch_parcel_page
+from app.analytics_cache import analytics_cache
+from app.alert_rules import alert_engine
+from app.anomaly import anomaly_detector
+from app.composite_rules import composite_engine
+from app.heartbeat import next_due
+from app.cascade import (
+    count_dependent_rows,
+    delete_parcel_rows,
+    delete_sensors,
+    iter_delete_dependents,
+    parcel_sensor_ids,
+)
 from app.states.auth_state import AuthState
 
 
@@ -13,27 +29,93 @@ class ParcelState(rx.State):
     loading list views, details views, and form submissions.
     """
 
-    parcels: list[Parcel] = []
-    current_parcel: Optional[Parcel] = None
-    parcel_sensors: list[Sensor] = []
+    parcels: list[ParcelView] = []
+    total_parcels: int = 0
+    page: int = 1
+    page_size: int = 24
+    search_query: str = ""
+    sort_by: str = "name"
+    sort_desc: bool = False
+    current_parcel: Optional[ParcelView] = None
+    parcel_sensors: list[SensorView] = []
     is_parcel_modal_open: bool = False
     is_sensor_modal_open: bool = False
-    editing_parcel: Optional[Parcel] = None
-    editing_sensor: Optional[Sensor] = None
+    editing_parcel: Optional[ParcelView] = None
+    editing_sensor: Optional[SensorView] = None
     delete_parcel_id: Optional[int] = None
     delete_sensor_id: Optional[int] = None
     is_delete_parcel_dialog_open: bool = False
     is_delete_sensor_dialog_open: bool = False
+    is_deleting: bool = False
+    delete_progress: int = 0
+
+    @rx.var
+    def total_pages(self) -> int:
+        return max(1, -(-self.total_parcels // self.page_size))
+
+    @rx.var
+    def page_start(self) -> int:
+        return (self.page - 1) * self.page_size + 1 if self.total_parcels else 0
+
+    @rx.var
+    def page_end(self) -> int:
+        return min(self.page * self.page_size, self.total_parcels)
 
     @rx.event
     async def load_parcels(self):
-        """Load all parcels for the current user."""
+        """Load the current page of parcels for the current user.
+
+        Filtering, sorting and paging happen in the database; only the rows
+        shown on the page are kept in state.
+        """
         auth_state = await self.get_state(AuthState)
         if not auth_state.user:
             return
         with rx.session() as session:
-            statement = select(Parcel).where(Parcel.farmer_id == auth_state.user.id)
-            self.parcels = session.exec(statement).all()
+            rows, total = fetch_parcel_page(
+                session,
+                auth_state.user.id,
+                search=self.search_query,
+                sort_by=self.sort_by,
+                descending=self.sort_desc,
+                page=self.page,
+                page_size=self.page_size,
+            )
+        self.total_parcels = total
+        self.parcels = [ParcelView.from_row(r) for r in rows]
+        if not rows and self.page > 1:
+            self.page = self.total_pages
+            return ParcelState.load_parcels
+
+    @rx.event
+    def set_search_query(self, value: str):
+        self.search_query = value
+        self.page = 1
+        return ParcelState.load_parcels
+
+    @rx.event
+    def set_sort_by(self, value: str):
+        self.sort_by = value
+        self.page = 1
+        return ParcelState.load_parcels
+
+    @rx.event
+    def toggle_sort_direction(self):
+        self.sort_desc = not self.sort_desc
+        self.page = 1
+        return ParcelState.load_parcels
+
+    @rx.event
+    def next_page(self):
+        if self.page < self.total_pages:
+            self.page += 1
+            return ParcelState.load_parcels
+
+    @rx.event
+    def prev_page(self):
+        if self.page > 1:
+            self.page -= 1
+            return ParcelState.load_parcels
 
     @rx.event
     async def load_parcel_detail(self):
@@ -53,9 +135,13 @@ class ParcelState(rx.State):
                 auth_state.user and parcel.farmer_id != auth_state.user.id
             ):
                 return rx.toast.error("Parcel not found or access denied")
-            self.current_parcel = parcel
-            statement = select(Sensor).where(Sensor.parcel_id == parcel_id)
-            self.parcel_sensors = session.exec(statement).all()
+            self.current_parcel = ParcelView.from_model(parcel)
+            statement = select(*SensorView.columns()).where(
+                Sensor.parcel_id == parcel_id
+            )
+            self.parcel_sensors = [
+                SensorView.from_row(r) for r in session.exec(statement)
+            ]
 
     @rx.event
     def open_add_parcel_modal(self):
@@ -63,8 +149,8 @@ class ParcelState(rx.State):
         self.is_parcel_modal_open = True
 
     @rx.event
-    def open_edit_parcel_modal(self, parcel: Parcel):
-        self.editing_parcel = parcel
+    def open_edit_parcel_modal(self, parcel_id: int):
+        self.editing_parcel = next((p for p in self.parcels if p.id == parcel_id), None)
         self.is_parcel_modal_open = True
 
     @rx.event
@@ -135,22 +221,67 @@ class ParcelState(rx.State):
         self.delete_parcel_id = None
         self.is_delete_parcel_dialog_open = False
 
-    @rx.event
-    def delete_parcel(self):
-        if not self.delete_parcel_id:
+    async def _delete_dependents(self, sensor_ids):
+        """Remove readings and alerts in batches on a worker thread.
+
+        The event loop only polls the thread and publishes progress to the UI.
+        """
+        progress = [0]
+
+        def run():
+            with rx.session() as session:
+                total = count_dependent_rows(session, sensor_ids)
+                for deleted in iter_delete_dependents(session, sensor_ids):
+                    progress[0] = min(99, deleted * 100 // max(total, 1))
+
+        task = asyncio.ensure_future(asyncio.to_thread(run))
+        while not task.done():
+            await asyncio.wait({task}, timeout=0.2)
+            async with self:
+                self.delete_progress = progress[0]
+        await task
+
+    @rx.event(background=True)
+    async def delete_parcel(self):
+        """Delete the selected parcel with its sensors, readings and alerts.
+
+        Runs as a background task so batches of deletes don't block the
+        client's event queue; `delete_progress` reports the percentage done.
+        """
+        async with self:
+            parcel_id = self.delete_parcel_id
+            if not parcel_id or self.is_deleting:
+                return
+            self.is_delete_parcel_dialog_open = False
+            self.is_deleting = True
+            self.delete_progress = 0
+            auth_state = await self.get_state(AuthState)
+            user_id = auth_state.user.id if auth_state.user else None
+        with rx.session() as session:
+            parcel = session.get(Parcel, parcel_id)
+            owned = parcel is not None and parcel.farmer_id == user_id
+            if owned:
+                sensor_ids = session.exec(parcel_sensor_ids(parcel_id)).all()
+        if not owned:
+            async with self:
+                self.is_deleting = False
+                self.delete_parcel_id = None
+            yield rx.toast.error("Parcel not found or access denied")
             return
+        analytics_cache.invalidate_sensors(sensor_ids)
+        for sensor_id in sensor_ids:
+            anomaly_detector.forget(sensor_id)
+            alert_engine.forget(sensor_id)
+        await self._delete_dependents(parcel_sensor_ids(parcel_id))
         with rx.session() as session:
-            parcel = session.get(Parcel, self.delete_parcel_id)
-            if parcel:
-                statement = select(Sensor).where(Sensor.parcel_id == parcel.id)
-                sensors = session.exec(statement).all()
-                for s in sensors:
-                    session.delete(s)
-                session.delete(parcel)
-                session.commit()
-        self.is_delete_parcel_dialog_open = False
-        self.delete_parcel_id = None
-        return [ParcelState.load_parcels, rx.toast.success("Parcel deleted.")]
+            delete_parcel_rows(session, parcel_id)
+        composite_engine.forget_parcel(parcel_id)
+        async with self:
+            self.is_deleting = False
+            self.delete_progress = 100
+            self.delete_parcel_id = None
+        yield ParcelState.load_parcels
+        yield rx.toast.success("Parcel deleted.")
 
     @rx.event
     def open_add_sensor_modal(self):
@@ -158,8 +289,10 @@ class ParcelState(rx.State):
         self.is_sensor_modal_open = True
 
     @rx.event
-    def open_edit_sensor_modal(self, sensor: Sensor):
-        self.editing_sensor = sensor
+    def open_edit_sensor_modal(self, sensor_id: int):
+        self.editing_sensor = next(
+            (s for s in self.parcel_sensors if s.id == sensor_id), None
+        )
         self.is_sensor_modal_open = True
 
     @rx.event
@@ -175,21 +308,51 @@ class ParcelState(rx.State):
         sensor_type = form_data.get("type")
         threshold_low_str = form_data.get("threshold_low")
         threshold_high_str = form_data.get("threshold_high")
+        interval_str = form_data.get("expected_interval_min")
+        hysteresis_str = form_data.get("alert_hysteresis")
+        duration_str = form_data.get("alert_duration_min")
+        cooldown_str = form_data.get("alert_cooldown_min")
         if not name or not sensor_type:
             yield rx.toast.error("Name and Type are required.")
             return
         threshold_low = float(threshold_low_str) if threshold_low_str else 0.0
         threshold_high = float(threshold_high_str) if threshold_high_str else 100.0
+        expected_interval_s = int(float(interval_str) * 60) if interval_str else 900
+        if expected_interval_s <= 0:
+            yield rx.toast.error("Reporting interval must be positive.")
+            return
+        alert_hysteresis = float(hysteresis_str) if hysteresis_str else 0.0
+        alert_duration_s = int(float(duration_str) * 60) if duration_str else 0
+        alert_cooldown_s = int(float(cooldown_str) * 60) if cooldown_str else 0
+        if min(alert_hysteresis, alert_duration_s, alert_cooldown_s) < 0:
+            yield rx.toast.error("Alert settings can't be negative.")
+            return
+        if alert_hysteresis and alert_hysteresis * 2 >= threshold_high - threshold_low:
+            yield rx.toast.error("Hysteresis must be under half the threshold band.")
+            return
         with rx.session() as session:
             if self.editing_sensor:
                 sensor = session.get(Sensor, self.editing_sensor.id)
                 if sensor:
+                    retyped = sensor.type != sensor_type
                     sensor.name = name
                     sensor.type = sensor_type
                     sensor.threshold_low = threshold_low
                     sensor.threshold_high = threshold_high
+                    sensor.expected_interval_s = expected_interval_s
+                    sensor.alert_hysteresis = alert_hysteresis
+                    sensor.alert_duration_s = alert_duration_s
+                    sensor.alert_cooldown_s = alert_cooldown_s
+                    if sensor.status != "offline":
+                        sensor.next_due_at = next_due(
+                            sensor.last_reading_time or datetime.datetime.utcnow(),
+                            expected_interval_s,
+                        )
                     session.add(sensor)
                     session.commit()
+                    alert_engine.invalidate(sensor.id)
+                    if retyped:
+                        composite_engine.forget_sensor(sensor.id)
                     self.close_sensor_modal()
                     yield rx.toast.success("Sensor updated.")
             else:
@@ -200,6 +363,13 @@ class ParcelState(rx.State):
                     status="active",
                     threshold_low=threshold_low,
                     threshold_high=threshold_high,
+                    expected_interval_s=expected_interval_s,
+                    alert_hysteresis=alert_hysteresis,
+                    alert_duration_s=alert_duration_s,
+                    alert_cooldown_s=alert_cooldown_s,
+                    next_due_at=next_due(
+                        datetime.datetime.utcnow(), expected_interval_s
+                    ),
                 )
                 session.add(new_sensor)
                 session.commit()
@@ -217,15 +387,40 @@ class ParcelState(rx.State):
         self.delete_sensor_id = None
         self.is_delete_sensor_dialog_open = False
 
-    @rx.event
-    def delete_sensor(self):
-        if not self.delete_sensor_id:
+    @rx.event(background=True)
+    async def delete_sensor(self):
+        """Delete the selected sensor together with its readings and alerts."""
+        async with self:
+            sensor_id = self.delete_sensor_id
+            if not sensor_id or self.is_deleting:
+                return
+            self.is_delete_sensor_dialog_open = False
+            self.is_deleting = True
+            self.delete_progress = 0
+            auth_state = await self.get_state(AuthState)
+            user_id = auth_state.user.id if auth_state.user else None
+        with rx.session() as session:
+            owner_id = session.exec(
+                select(Parcel.farmer_id)
+                .join(Sensor, Sensor.parcel_id == Parcel.id)
+                .where(Sensor.id == sensor_id)
+            ).first()
+        if owner_id is None or owner_id != user_id:
+            async with self:
+                self.is_deleting = False
+                self.delete_sensor_id = None
+            yield rx.toast.error("Sensor not found or access denied")
             return
+        analytics_cache.invalidate_sensors([sensor_id])
+        anomaly_detector.forget(sensor_id)
+        alert_engine.forget(sensor_id)
+        composite_engine.forget_sensor(sensor_id)
+        await self._delete_dependents([sensor_id])
         with rx.session() as session:
-            sensor = session.get(Sensor, self.delete_sensor_id)
-            if sensor:
-                session.delete(sensor)
-                session.commit()
-        self.is_delete_sensor_dialog_open = False
-        self.delete_sensor_id = None
-        return [ParcelState.load_parcel_detail, rx.toast.success("Sensor deleted.")]
\ No newline at end of file
+            delete_sensors(session, [sensor_id])
+        async with self:
+            self.is_deleting = False
+            self.delete_progress = 100
+            self.delete_sensor_id = None
+        yield ParcelState.load_parcel_detail
+        yield rx.toast.success("Sensor deleted.")
\ No newline at end of file
@@ -1,9 +1,11 @@
 import reflex as rx
+import asyncio
 import bcrypt
 import random
 import string
 from sqlmodel import select
 from app.database import User
+from app.notifications import webhook_url_error
 from app.states.auth_state import AuthState
 
 
@@ -12,6 +14,7 @@ class SettingsState(rx.State):
 
     active_tab: str = "profile"
     notifications_enabled: bool = True
+    webhook_url: str = ""
     new_password: str = ""
     confirm_password: str = ""
 
@@ -19,12 +22,57 @@ class SettingsState(rx.State):
     def set_active_tab_val(self, val: str):
         """Set the currently active tab in the settings page."""
         self.active_tab = val
+        if val == "notifications":
+            return SettingsState.load_notification_settings
 
     @rx.event
-    def toggle_notifications(self, val: bool):
+    async def load_notification_settings(self):
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
+        with rx.session() as session:
+            user = session.get(User, auth_state.user.id)
+            if user:
+                self.notifications_enabled = user.notifications_enabled
+                self.webhook_url = user.webhook_url or ""
+
+    @rx.event
+    async def toggle_notifications(self, val: bool):
+        """Turn alert notifications (email and webhook) on or off for the user."""
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
+        with rx.session() as session:
+            user = session.get(User, auth_state.user.id)
+            if user:
+                user.notifications_enabled = val
+                session.add(user)
+                session.commit()
         self.notifications_enabled = val
         yield rx.toast.success(f"Notifications {('enabled' if val else 'disabled')}")
 
+    @rx.event
+    def set_webhook_url(self, val: str):
+        self.webhook_url = val
+
+    @rx.event
+    async def save_webhook_url(self):
+        url = self.webhook_url.strip()
+        error = url and await asyncio.to_thread(webhook_url_error, url)
+        if error:
+            yield rx.toast.error(error)
+            return
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.user:
+            return
+        with rx.session() as session:
+            user = session.get(User, auth_state.user.id)
+            if user:
+                user.webhook_url = url or None
+                session.add(user)
+                session.commit()
+                yield rx.toast.success("Webhook saved")
+
     @rx.event
     async def regenerate_api_key(self):
         """Regenerate the user's unique API key.
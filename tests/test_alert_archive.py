@@ -0,0 +1,70 @@
+import datetime
+import pytest
+from sqlmodel import Session, create_engine, select
+from app.alert_archive import ALERT_RETENTION_DAYS, archive_resolved_alerts
+from app.database import Alert, AlertArchive, Parcel, Sensor, User, ensure_schema
+from app.queries import fetch_alert_history_page
+
+NOW = datetime.datetime(2026, 1, 1)
+OLD = NOW - datetime.timedelta(days=ALERT_RETENTION_DAYS + 1)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    ensure_schema(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def ids(session):
+    user = User(username="t", email="t@example.com", password_hash="")
+    session.add(user)
+    session.commit()
+    parcel = Parcel(
+        name="P", size=1.0, crop_type="Corn", location="Zone A", farmer_id=user.id
+    )
+    session.add(parcel)
+    session.commit()
+    sensor = Sensor(name="T", type="temperature", parcel_id=parcel.id)
+    session.add(sensor)
+    session.commit()
+    return user.id, sensor.id
+
+
+def add_resolved_alert(session, sensor_id, message):
+    alert = Alert(sensor_id=sensor_id, message=message, is_active=False, created_at=OLD)
+    session.add(alert)
+    session.commit()
+    return alert.id
+
+
+def test_archiving_again_after_alert_ids_are_reused(session, ids):
+    user_id, sensor_id = ids
+    first = add_resolved_alert(session, sensor_id, "first")
+    assert archive_resolved_alerts(session, NOW) == 1
+    second = add_resolved_alert(session, sensor_id, "second")
+    assert second == first
+    assert archive_resolved_alerts(session, NOW) == 1
+    archived = session.exec(
+        select(AlertArchive.alert_id, AlertArchive.message).order_by(AlertArchive.id)
+    ).all()
+    assert archived == [(first, "first"), (second, "second")]
+
+
+def test_history_pages_through_rows_sharing_an_alert_id(session, ids):
+    user_id, sensor_id = ids
+    add_resolved_alert(session, sensor_id, "archived")
+    archive_resolved_alerts(session, NOW)
+    add_resolved_alert(session, sensor_id, "live")
+    seen, before = [], None
+    while True:
+        rows, has_more = fetch_alert_history_page(
+            session, user_id, before=before, page_size=1
+        )
+        seen += [row.message for row in rows]
+        if not has_more:
+            break
+        before = (rows[-1].created_at, rows[-1].source, rows[-1].key)
+    assert seen == ["live", "archived"]
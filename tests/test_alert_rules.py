@@ -0,0 +1,78 @@
+import datetime
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from app.alert_rules import THRESHOLD_ALERT_LEVEL, AlertRuleEngine, ThresholdRule
+from app.database import Alert, Sensor
+
+START = datetime.datetime(2026, 6, 1)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def make_sensor(**settings) -> Sensor:
+    return Sensor(
+        id=1,
+        name="T",
+        type="temperature",
+        parcel_id=1,
+        threshold_low=0.0,
+        threshold_high=10.0,
+        **settings,
+    )
+
+
+def run(session, sensor, readings):
+    """Feed `(minutes, value)` readings and return the non-empty outcomes."""
+    engine = AlertRuleEngine()
+    outcomes = []
+    for minutes, value in readings:
+        outcome = engine.evaluate(
+            session, sensor, value, START + datetime.timedelta(minutes=minutes)
+        )
+        if outcome.open_message is not None:
+            outcomes.append((minutes, "open"))
+        elif outcome.resolve:
+            outcomes.append((minutes, "resolve"))
+    return outcomes
+
+
+def test_alert_clears_only_inside_the_hysteresis_band(session):
+    sensor = make_sensor(alert_hysteresis=1.0)
+    readings = [(0, 11.0), (1, 9.5), (2, 10.5), (3, 8.5), (4, 11.0)]
+    assert run(session, sensor, readings) == [(0, "open"), (3, "resolve"), (4, "open")]
+
+
+def test_alert_waits_for_the_breach_duration(session):
+    sensor = make_sensor(alert_duration_s=600)
+    readings = [(0, 11.0), (5, 11.0), (6, 5.0), (8, 11.0), (17, 11.0), (18, 11.0)]
+    assert run(session, sensor, readings) == [(18, "open")]
+
+
+def test_cooldown_suppresses_reopening_after_a_resolve(session):
+    sensor = make_sensor(alert_cooldown_s=3600)
+    readings = [(0, 11.0), (1, 5.0), (2, 11.0), (30, -1.0), (61, 11.0)]
+    assert run(session, sensor, readings) == [(0, "open"), (1, "resolve"), (61, "open")]
+
+
+def test_open_alert_in_the_database_is_resolved_not_duplicated(session):
+    session.add(Alert(sensor_id=1, message="High", level=THRESHOLD_ALERT_LEVEL))
+    session.commit()
+    sensor = make_sensor()
+    assert run(session, sensor, [(0, 11.0), (1, 5.0)]) == [(1, "resolve")]
+
+
+def test_hysteresis_wider_than_the_band_falls_back_to_a_quarter():
+    rule = ThresholdRule.compile(make_sensor(alert_hysteresis=6.0))
+    assert rule.hysteresis == 2.5
+    assert rule.cleared(5.0)
@@ -0,0 +1,103 @@
+import datetime
+import math
+import numpy as np
+import pytest
+import reflex as rx
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+from app.analytics import EWMA_TIME_CONSTANT_S, _ewma_batch, compute_analytics
+from app.database import Parcel, Sensor, SensorData, User, ensure_schema
+from app.jobs import Job
+
+START = datetime.datetime(2026, 5, 1)
+
+
+def reference_ewma(rows):
+    smoothed = {}
+    out = []
+    for s_id, val, ts in rows:
+        prev = smoothed.get(s_id)
+        if prev is not None:
+            elapsed = (ts - prev[1]).total_seconds()
+            alpha = 1 - math.exp(-max(elapsed, 0.0) / EWMA_TIME_CONSTANT_S)
+            val = prev[0] + alpha * (val - prev[0])
+        smoothed[s_id] = (val, ts)
+        out.append((s_id, val, ts))
+    return out
+
+
+def test_ewma_matches_the_per_point_recurrence():
+    rng = np.random.default_rng(7)
+    # Irregular steps, ties and month-long gaps, across batch boundaries.
+    steps = rng.choice([0, 60, 900, 3600, 30 * 86400], size=3000)
+    stamps = [START + datetime.timedelta(seconds=int(s)) for s in np.cumsum(steps)]
+    rows = [(i % 3 + 1, float(rng.normal(20, 5)), ts) for i, ts in enumerate(stamps)]
+    stream = [(*row, (row[2] - START).total_seconds()) for row in rows]
+    last = {}
+    actual = []
+    for i in range(0, len(stream), 700):
+        actual += _ewma_batch(stream[i : i + 700], last)
+    expected = reference_ewma(rows)
+    assert [r[::2] for r in actual] == [r[::2] for r in expected]
+    np.testing.assert_allclose(
+        [r[1] for r in actual], [r[1] for r in expected], rtol=1e-9
+    )
+
+
+@pytest.fixture
+def sensors(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    ensure_schema(engine)
+    monkeypatch.setattr(rx, "session", lambda: Session(engine))
+    with Session(engine) as session:
+        user = User(username="t", email="t@example.com", password_hash="")
+        session.add(user)
+        session.commit()
+        parcel = Parcel(
+            name="P", size=1.0, crop_type="Corn", location="Zone A", farmer_id=user.id
+        )
+        session.add(parcel)
+        session.commit()
+        temperature = Sensor(name="T", type="temperature", parcel_id=parcel.id)
+        humidity = Sensor(name="H", type="soil_humidity", parcel_id=parcel.id)
+        session.add_all([temperature, humidity])
+        session.commit()
+        for hour in range(48):
+            ts = START + datetime.timedelta(hours=hour)
+            session.add(SensorData(sensor_id=temperature.id, value=20.0, timestamp=ts))
+            session.add(SensorData(sensor_id=humidity.id, value=60.0, timestamp=ts))
+        session.commit()
+        return temperature.id, humidity.id
+
+
+def test_ewma_query_smooths_each_sensor(sensors):
+    temperature, humidity = sensors
+    result = compute_analytics(
+        Job(id="ewma"),
+        [temperature, humidity],
+        START,
+        START + datetime.timedelta(days=2),
+        "hour",
+        "ewma",
+    )
+    assert result["stats"][temperature]["avg"] == 20.0
+    assert result["stats"][humidity]["avg"] == 60.0
+
+
+def test_growing_degree_days_skip_non_temperature_sensors(sensors):
+    temperature, humidity = sensors
+    result = compute_analytics(
+        Job(id="gdd"),
+        [temperature, humidity],
+        START,
+        START + datetime.timedelta(days=2),
+        "day",
+        "gdd",
+    )
+    assert result["skipped"] == [humidity]
+    assert list(result["stats"]) == [temperature]
+    assert result["stats"][temperature]["max"] == 20.0
@@ -0,0 +1,79 @@
+import datetime
+from app.anomaly import (
+    FLATLINE_READINGS,
+    LEVEL_TIME_CONSTANT_S,
+    SPIKE_COOLDOWN_READINGS,
+    WARMUP_READINGS,
+    AnomalyDetector,
+    SensorBaseline,
+)
+
+START = datetime.datetime(2026, 1, 1)
+
+
+def feed(baseline, values, start=0, step_s=60):
+    return [
+        baseline.observe(value, START + datetime.timedelta(seconds=i * step_s))
+        for i, value in enumerate(values, start)
+    ]
+
+
+def noisy(n):
+    return [20.0 + (i % 5) * 0.1 for i in range(n)]
+
+
+def test_flatline_is_raised_once_and_cleared_when_the_value_moves():
+    baseline = SensorBaseline()
+    outcomes = feed(baseline, [5.0] * (FLATLINE_READINGS * 3))
+    raised = [o.anomaly.level for o in outcomes if o.anomaly]
+    assert raised == ["flatline"]
+    assert not any(o.cleared for o in outcomes)
+    (outcome,) = feed(baseline, [6.0], start=FLATLINE_READINGS * 3)
+    assert outcome.cleared == ("flatline",)
+    assert baseline.active == frozenset()
+
+
+def test_spike_is_raised_once_and_cleared_after_the_cooldown():
+    baseline = SensorBaseline()
+    feed(baseline, noisy(WARMUP_READINGS * 2))
+    start = WARMUP_READINGS * 2
+    outcomes = feed(baseline, [100.0, 100.0], start=start)
+    assert [o.anomaly.level for o in outcomes if o.anomaly] == ["spike"]
+    outcomes = feed(baseline, noisy(SPIKE_COOLDOWN_READINGS), start=start + 2)
+    assert [o.cleared for o in outcomes] == [()] * (SPIKE_COOLDOWN_READINGS - 1) + [
+        ("spike",)
+    ]
+    assert not any(o.anomaly for o in outcomes)
+
+
+def test_drift_clears_once_the_level_stops_moving():
+    baseline = SensorBaseline()
+    hourly = 3600
+    days = int(LEVEL_TIME_CONSTANT_S // hourly)
+    outcomes = feed(baseline, noisy(days * 2), step_s=hourly)
+    outcomes += feed(baseline, [30.0] * days * 6, start=days * 2, step_s=hourly)
+    # The constant plateau is a flatline too; only drift matters here.
+    raised = [o.anomaly.level for o in outcomes if o.anomaly]
+    cleared = [level for o in outcomes for level in o.cleared]
+    assert raised.count("drift") == cleared.count("drift") >= 1
+    assert "drift" not in baseline.active
+
+
+def test_detector_resumes_open_anomalies_instead_of_raising_them_again():
+    detector = AnomalyDetector()
+    loads = []
+
+    def load_active():
+        loads.append(1)
+        return ["flatline"]
+
+    outcomes = [
+        detector.observe(
+            1, 5.0, START + datetime.timedelta(minutes=i), load_active=load_active
+        )
+        for i in range(FLATLINE_READINGS * 2)
+    ]
+    assert loads == [1]
+    assert not any(o.anomaly for o in outcomes)
+    outcome = detector.observe(1, 6.0, START + datetime.timedelta(hours=2))
+    assert outcome.cleared == ("flatline",)
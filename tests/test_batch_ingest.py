@@ -0,0 +1,141 @@
+import pytest
+import reflex as rx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine, select
+from app.alert_rules import THRESHOLD_ALERT_LEVEL, alert_engine
+from app.anomaly import FLATLINE_READINGS, anomaly_detector
+from app.api import api_router
+from app.database import Alert, Parcel, Sensor, SensorData, User, ensure_schema
+
+API_KEY = "key_test"
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    ensure_schema(engine)
+    monkeypatch.setattr(rx, "session", lambda: Session(engine))
+    return engine
+
+
+@pytest.fixture
+def sensor_id(engine):
+    with Session(engine) as session:
+        user = User(
+            username="t", email="t@example.com", password_hash="", api_key=API_KEY
+        )
+        session.add(user)
+        session.commit()
+        parcel = Parcel(
+            name="P", size=1.0, crop_type="Corn", location="Zone A", farmer_id=user.id
+        )
+        session.add(parcel)
+        session.commit()
+        sensor = Sensor(
+            name="T",
+            type="temperature",
+            parcel_id=parcel.id,
+            threshold_low=0.0,
+            threshold_high=10.0,
+        )
+        session.add(sensor)
+        session.commit()
+        alert_engine.forget(sensor.id)
+        anomaly_detector.forget(sensor.id)
+        yield sensor.id
+        alert_engine.forget(sensor.id)
+        anomaly_detector.forget(sensor.id)
+
+
+@pytest.fixture
+def client():
+    api = FastAPI()
+    api.include_router(api_router)
+    return TestClient(api, headers={"X-API-Key": API_KEY})
+
+
+def threshold_alerts(engine, sensor_id, level=THRESHOLD_ALERT_LEVEL):
+    with Session(engine) as session:
+        return session.exec(
+            select(Alert.is_active).where(
+                Alert.sensor_id == sensor_id, Alert.level == level
+            )
+        ).all()
+
+
+def test_alert_opened_and_cleared_in_one_batch_is_resolved(engine, sensor_id, client):
+    response = client.post(
+        "/sensors/data/batch",
+        json=[
+            {"sensor_id": sensor_id, "value": 50.0},
+            {"sensor_id": sensor_id, "value": 5.0},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 2
+    assert threshold_alerts(engine, sensor_id) == [False]
+
+
+def test_alert_left_open_by_a_batch_resolves_on_a_later_reading(
+    engine, sensor_id, client
+):
+    client.post("/sensors/data/batch", json=[{"sensor_id": sensor_id, "value": 50.0}])
+    assert threshold_alerts(engine, sensor_id) == [True]
+    client.post(f"/sensors/{sensor_id}/data", json={"value": 5.0})
+    assert threshold_alerts(engine, sensor_id) == [False]
+
+
+def test_late_reading_does_not_move_heartbeat_backwards(engine, sensor_id, client):
+    client.post(f"/sensors/{sensor_id}/data", json={"value": 5.0})
+    with Session(engine) as session:
+        before = session.get(Sensor, sensor_id)
+    client.post(
+        "/sensors/data/batch",
+        json=[
+            {"sensor_id": sensor_id, "value": 5.0, "timestamp": "2020-01-01T00:00:00"}
+        ],
+    )
+    with Session(engine) as session:
+        after = session.get(Sensor, sensor_id)
+    assert after.last_reading_time == before.last_reading_time
+    assert after.next_due_at >= before.next_due_at
+
+
+def test_readings_for_other_users_sensors_are_rejected(engine, sensor_id):
+    with Session(engine) as session:
+        session.add(
+            User(username="o", email="o@example.com", password_hash="", api_key="key_o")
+        )
+        session.commit()
+    api = FastAPI()
+    api.include_router(api_router)
+    other = TestClient(api, headers={"X-API-Key": "key_o"})
+    response = other.post(
+        "/sensors/data/batch", json=[{"sensor_id": sensor_id, "value": 50.0}]
+    )
+    assert response.json()["accepted"] == 0
+    assert response.json()["rejected"] == 1
+    assert threshold_alerts(engine, sensor_id) == []
+    with Session(engine) as session:
+        assert session.exec(select(SensorData)).all() == []
+
+
+def test_stuck_sensor_raises_one_flatline_alert_until_it_moves(
+    engine, sensor_id, client
+):
+    stuck = [{"sensor_id": sensor_id, "value": 5.0}] * (FLATLINE_READINGS * 2)
+    client.post("/sensors/data/batch", json=stuck)
+    client.post("/sensors/data/batch", json=stuck)
+    assert threshold_alerts(engine, sensor_id, "flatline") == [True]
+    # A restart forgets the detector; the open alert is still not duplicated.
+    anomaly_detector.forget(sensor_id)
+    client.post("/sensors/data/batch", json=stuck)
+    assert threshold_alerts(engine, sensor_id, "flatline") == [True]
+    client.post(f"/sensors/{sensor_id}/data", json={"value": 6.0})
+    assert threshold_alerts(engine, sensor_id, "flatline") == [False]
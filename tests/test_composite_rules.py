@@ -0,0 +1,65 @@
+import datetime
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from app.composite_rules import CompositeRuleEngine
+from app.database import CompositeRule, Sensor
+
+START = datetime.datetime(2026, 6, 1)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            CompositeRule(
+                parcel_id=1,
+                name="Heat stress",
+                conditions=[
+                    {"sensor_type": "soil_humidity", "op": "<", "value": 30},
+                    {"sensor_type": "temperature", "op": ">", "value": 32},
+                ],
+                duration_s=1200,
+            )
+        )
+        session.commit()
+        yield session
+
+
+HUMIDITY = Sensor(id=1, name="H", type="soil_humidity", parcel_id=1)
+TEMPERATURE = Sensor(id=2, name="T", type="temperature", parcel_id=1)
+
+
+def evaluate(engine, session, sensor, value, minutes):
+    outcomes = engine.evaluate(
+        session, sensor, value, START + datetime.timedelta(minutes=minutes)
+    )
+    return ["open" if outcome.open_message else "resolve" for outcome in outcomes]
+
+
+def test_rule_opens_after_its_duration_and_resolves(session):
+    engine = CompositeRuleEngine()
+    assert evaluate(engine, session, TEMPERATURE, 35.0, 0) == []
+    assert evaluate(engine, session, HUMIDITY, 20.0, 1) == []
+    assert evaluate(engine, session, HUMIDITY, 20.0, 15) == []
+    assert evaluate(engine, session, TEMPERATURE, 35.0, 21) == ["open"]
+    assert evaluate(engine, session, TEMPERATURE, 35.0, 25) == []
+    assert evaluate(engine, session, HUMIDITY, 40.0, 26) == ["resolve"]
+
+
+def test_forgotten_sensor_no_longer_satisfies_type_conditions(session):
+    engine = CompositeRuleEngine()
+    evaluate(engine, session, TEMPERATURE, 35.0, 0)
+    evaluate(engine, session, HUMIDITY, 20.0, 1)
+    # Deleted, or retyped so it no longer counts as a temperature sensor.
+    engine.forget_sensor(TEMPERATURE.id)
+    assert evaluate(engine, session, HUMIDITY, 20.0, 30) == []
+    retyped = Sensor(id=2, name="T", type="luminosity", parcel_id=1)
+    assert evaluate(engine, session, retyped, 35.0, 31) == []
+    assert evaluate(engine, session, HUMIDITY, 20.0, 60) == []
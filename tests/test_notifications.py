@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.notifications import (
+    AlertNotice,
+    NotificationDispatcher,
+    PermanentDeliveryError,
+    Recipient,
+    Sink,
+    WebhookSink,
+)
+
+NOTICE = AlertNotice(1, "warning", "Too hot", datetime.datetime(2026, 1, 1))
+RECIPIENT = Recipient(1, "t", "t@example.com", "http://hooks.example.com/1")
+
+
+class RecordingSink(Sink):
+    name = "recording"
+
+    def __init__(self, error=None):
+        super().__init__(rate_per_minute=6000)
+        self.error = error
+        self.calls = 0
+
+    def address(self, recipient):
+        return recipient.webhook_url
+
+    async def send(self, address, recipient, notices):
+        self.calls += 1
+        if self.error:
+            raise self.error
+
+
+def dispatcher(sink, **kwargs):
+    return NotificationDispatcher(
+        [sink], window_s=0, recipient_loader=lambda user_id: RECIPIENT, **kwargs
+    )
+
+
+def test_permanent_failures_are_not_retried():
+    sink = RecordingSink(PermanentDeliveryError("refused"))
+    notifier = dispatcher(sink)
+    notifier.publish(1, [NOTICE])
+    asyncio.run(notifier.drain())
+    assert sink.calls == 1
+
+
+@pytest.fixture
+def webhook_status():
+    class Handler(BaseHTTPRequestHandler):
+        status = 204
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(Handler.status)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield Handler, f"http://127.0.0.1:{server.server_port}/hook"
+    server.shutdown()
+
+
+def test_webhook_client_errors_are_permanent(webhook_status):
+    handler, url = webhook_status
+    sink = WebhookSink(600, allowed_hosts=frozenset({"127.0.0.1"}))
+    handler.status = 404
+    with pytest.raises(PermanentDeliveryError):
+        asyncio.run(sink.send(url, RECIPIENT, [NOTICE]))
+    for status in (429, 503):
+        handler.status = status
+        with pytest.raises(requests.HTTPError):
+            asyncio.run(sink.send(url, RECIPIENT, [NOTICE]))
+
+
+def test_webhook_refuses_loopback_unless_allowed(webhook_status):
+    _, url = webhook_status
+    with pytest.raises(PermanentDeliveryError):
+        asyncio.run(WebhookSink(600).send(url, RECIPIENT, [NOTICE]))
+    sink = WebhookSink(600, allowed_hosts=frozenset({"127.0.0.1"}))
+    asyncio.run(sink.send(url, RECIPIENT, [NOTICE]))
+
+
+def test_queue_limit_counts_notices_until_delivered():
+    release = asyncio.Event()
+
+    class SlowSink(RecordingSink):
+        async def send(self, address, recipient, notices):
+            await release.wait()
+            await super().send(address, recipient, notices)
+
+    async def scenario():
+        sink = SlowSink()
+        notifier = dispatcher(sink, max_queue=2)
+        notifier.publish(1, [NOTICE, NOTICE])
+        await notifier.flush(force=True)
+        await asyncio.sleep(0.05)
+        notifier.publish(1, [NOTICE])
+        await notifier.flush(force=True)
+        release.set()
+        await notifier.drain()
+        notifier.publish(1, [NOTICE])
+        await notifier.drain()
+        return sink.calls
+
+    assert asyncio.run(scenario()) == 2
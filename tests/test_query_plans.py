@@ -0,0 +1,11 @@
+from sqlmodel import Session, select
+from app.database import Sensor, User
+from app.scripts.check_query_plans import build_scratch_db, check_plans
+
+
+def test_open_alert_queries_use_the_partial_indexes():
+    engine = build_scratch_db(history=20_000, open_alerts=50, seed=42)
+    with Session(engine) as session:
+        sensor_id = session.exec(select(Sensor.id).limit(1)).first()
+        user_id = session.exec(select(User.id).limit(1)).first()
+        assert check_plans(session, user_id, sensor_id)